@@ -1,12 +1,15 @@
 """SQLAlchemy ORM models for internal storage."""
 
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
 from sqlalchemy import (
     Boolean,
+    Date,
     DateTime,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -59,12 +62,21 @@ class QueryHistory(Base):
     explain_plan: Mapped[str | None] = mapped_column(Text, nullable=True)
     # Full JSON response from Claude stored as text
     llm_response: Mapped[str | None] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    # Literal-stripped statement hash (services.sql_normalizer) for grouping
+    fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Denormalized from llm_response / explain_plan so groups aggregate in SQL
+    suggestion_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    execution_time_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), index=True)
 
     connection: Mapped["DBConnection | None"] = relationship(
         "DBConnection", back_populates="query_history"
     )
 
+    __table_args__ = (
+        Index("ix_query_history_fingerprint_created_at", "fingerprint", "created_at"),
+    )
+
 
 class AnalyticsLog(Base):
     """Anonymous analytics record for product improvement (hosted mode).
@@ -82,7 +94,7 @@ class AnalyticsLog(Base):
     bottleneck_count: Mapped[int] = mapped_column(Integer, default=0)
     statistics_count: Mapped[int] = mapped_column(Integer, default=0)
     configuration_count: Mapped[int] = mapped_column(Integer, default=0)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), index=True)
 
 
 def _short_id() -> str:
@@ -112,8 +124,134 @@ class LLMConfig(Base):
     provider: Mapped[str] = mapped_column(String(50), nullable=False)  # gemini | kimi | openrouter
     encrypted_api_key: Mapped[str] = mapped_column(Text, nullable=False)
     model: Mapped[str | None] = mapped_column(String(255), nullable=True)  # legacy, unused
-    is_active: Mapped[bool] = mapped_column(Boolean, default=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now(), onupdate=func.now()
     )
+
+
+class AnalysisCacheEntry(Base):
+    """Cached LLM analysis keyed by dialect, SQL fingerprint, prompt context and model."""
+
+    __tablename__ = "analysis_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String(255), nullable=False)
+    # AnalysisResult JSON as produced by the LLM call that filled the entry
+    result_json: Mapped[str] = mapped_column(Text, nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    last_used_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), index=True)
+
+
+class AnalysisJob(Base):
+    """Background analysis submitted with ``async=true`` (state shared by all API workers)."""
+
+    __tablename__ = "analysis_jobs"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
+    # queued | running | succeeded | failed | cancelled
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued", index=True)
+    result_json: Mapped[str | None] = mapped_column(Text, nullable=True)  # AnalysisResult JSON
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class WorkloadReport(Base):
+    """Top statements of a connection's workload, ranked by total time, with their analyses."""
+
+    __tablename__ = "workload_reports"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
+    connection_id: Mapped[str | None] = mapped_column(
+        String(36), ForeignKey("db_connections.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+    source: Mapped[str] = mapped_column(String(50), nullable=False)  # e.g. "pg_stat_statements"
+    statements_sampled: Mapped[int] = mapped_column(Integer, default=0)
+    total_exec_time_ms: Mapped[float] = mapped_column(Float, default=0.0)
+    # JSON list of WorkloadReportEntry
+    entries_json: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+
+class DailyAnalysisRollup(Base):
+    """Per-day analysis totals, maintained as history rows are written."""
+
+    __tablename__ = "daily_analysis_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    analysis_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    suggestion_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    high_impact_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class DailyCategoryRollup(Base):
+    """Per-day suggestion counts by category (indexes, rewrites, …)."""
+
+    __tablename__ = "daily_category_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    category: Mapped[str] = mapped_column(String(50), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class DailyTableRollup(Base):
+    """Per-day count of analyses that touched each table."""
+
+    __tablename__ = "daily_table_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    table_name: Mapped[str] = mapped_column(String(255), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class Suggestion(Base):
+    """One suggestion from an analysis, split out of ``QueryHistory.llm_response`` for filtering."""
+
+    __tablename__ = "suggestions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    query_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("query_history.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    # indexes | rewrites | materialized_views | bottlenecks | statistics | configuration
+    category: Mapped[str] = mapped_column(String(30), nullable=False)
+    estimated_impact: Mapped[str] = mapped_column(String(10), nullable=False)
+    index_type: Mapped[str | None] = mapped_column(String(30), nullable=True)
+    root_cause: Mapped[str | None] = mapped_column(String(30), nullable=True)
+    sql: Mapped[str | None] = mapped_column(Text, nullable=True)
+    explanation: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    # Comma-separated tables the suggestion's SQL touches (the query's tables if it has none)
+    tables: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_suggestions_category_impact_created_at", "category", "estimated_impact", "created_at"),
+    )
+
+
+class QueryTable(Base):
+    """Junction of analyzed queries and the tables they reference."""
+
+    __tablename__ = "query_tables"
+
+    query_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("query_history.id", ondelete="CASCADE"), primary_key=True
+    )
+    table_name: Mapped[str] = mapped_column(String(255), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_query_tables_table_name_query_id", "table_name", "query_id"),
+    )
+
+
+class SchemaMigration(Base):
+    """Data migrations already applied to this internal store (see core.migrations)."""
+
+    __tablename__ = "schema_migrations"
+
+    version: Mapped[str] = mapped_column(String(100), primary_key=True)
+    applied_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
@@ -1,7 +1,7 @@
 """Pydantic request/response schemas."""
 
 from datetime import datetime
-from typing import Literal
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -45,6 +45,29 @@ class ConnectionTestResult(BaseModel):
     message: str
 
 
+class ConnectorPoolStats(BaseModel):
+    connection_id: str
+    size: int
+    idle: int
+    in_use: int
+    max_size: int
+    checkouts: int
+    waits: int
+    creates: int
+    discards: int
+    evictions: int
+    timeouts: int
+
+
+class SchemaCacheStats(BaseModel):
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+    stale: int
+    evictions: int
+
+
 # ─────────────────────────────  Analysis  ────────────────────────────────────
 
 class ClientExplainResult(BaseModel):
@@ -71,6 +94,9 @@ class AnalyzeRequest(BaseModel):
     client_explain: ClientExplainResult | None = None
     client_table_schemas: list[ClientTableSchema] | None = None
     client_db_type: str | None = None
+    # Result cache: "prefer" reuses a cached analysis, "bypass" forces a fresh
+    # LLM call, "only" never calls the LLM (404 on a miss)
+    cache: Literal["bypass", "prefer", "only"] = "prefer"
 
     @field_validator("sql")
     @classmethod
@@ -107,6 +133,125 @@ class AnalysisResult(BaseModel):
     explain_plan: str | None = None
     explain_error: str | None = None
     tables_analyzed: list[str] = []
+    cache_hit: bool = False
+    model: str | None = None  # model that produced the analysis (a standby's when one answered)
+    degraded: bool = False  # placeholder for an empty or non-JSON LLM response; never cached
+
+
+class BatchAnalyzeRequest(BaseModel):
+    queries: list[str] = Field(..., min_length=1)
+    connection_id: str | None = None
+    model: str | None = None
+    cache: Literal["bypass", "prefer", "only"] = "prefer"
+
+    @field_validator("queries")
+    @classmethod
+    def strip_queries(cls, v: list[str]) -> list[str]:
+        queries = [q.strip() for q in v]
+        if not all(queries):
+            raise ValueError("queries must not contain empty statements")
+        return queries
+
+
+class WorkloadReportRequest(BaseModel):
+    connection_id: str
+    top_k: int = Field(10, ge=1, le=50)
+    model: str | None = None
+    cache: Literal["bypass", "prefer", "only"] = "prefer"
+
+
+class WorkloadStatement(BaseModel):
+    statement_id: str
+    query: str
+    calls: int
+    total_exec_time_ms: float
+    mean_exec_time_ms: float
+    rows: int
+    shared_blks_hit: int = 0
+    shared_blks_read: int = 0
+    shared_blks_dirtied: int = 0
+    shared_blks_written: int = 0
+    rows_examined: int = 0
+    no_index_used: int = 0
+    tmp_disk_tables: int = 0
+    sample_query: str | None = None
+    share_of_total: float = 0.0   # fraction of the sampled workload's total time
+
+
+class WorkloadReportEntry(BaseModel):
+    rank: int
+    statement: WorkloadStatement
+    analysis: AnalysisResult | None = None
+    error: str | None = None
+
+
+class WorkloadReportSummary(BaseModel):
+    id: str
+    connection_id: str | None
+    source: str
+    statements_sampled: int
+    total_exec_time_ms: float
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class WorkloadReportResponse(WorkloadReportSummary):
+    entries: list[WorkloadReportEntry] = []
+
+
+class LogFingerprint(BaseModel):
+    fingerprint: str
+    sql: str                          # slowest captured example
+    count: int
+    total_duration_ms: float
+    mean_duration_ms: float
+    max_duration_ms: float
+    plan_duration_ms: float | None = None
+    # Ready-to-send /analyze body; carries the captured plan as client_explain
+    analyze_request: AnalyzeRequest
+
+
+class LogIngestResult(BaseModel):
+    format: Literal["postgres", "postgres_csv", "mysql_slow"]
+    db_type: str
+    statements: int
+    fingerprints: int
+    dropped: int                      # statements beyond the fingerprint cap
+    entries: list[LogFingerprint] = []
+
+
+class AnalysisJobStatus(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    queue_wait_ms: float | None = None
+    result: AnalysisResult | None = None
+    error: str | None = None
+
+
+class AnalysisJobQueueStats(BaseModel):
+    workers: int
+    queue_depth: int        # jobs waiting in this API worker's queue
+    running: int            # jobs running in this API worker
+    queued_total: int       # queued jobs across all API workers (from the DB)
+    running_total: int
+    submitted: int
+    succeeded: int
+    failed: int
+    cancelled: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class SQLParseCacheStats(BaseModel):
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+    evictions: int
 
 
 # ─────────────────────────────  Comparison  ──────────────────────────────────
@@ -215,6 +360,50 @@ class ProviderInfo(BaseModel):
     models: list[str]
 
 
+class ProviderLatency(BaseModel):
+    """Recent successful-call latency of one provider/model in this worker."""
+    label: str
+    samples: int
+    p50_s: float
+    p90_s: float
+    p99_s: float
+    hedge_delay_s: float
+
+
+class ProviderHealth(BaseModel):
+    """Recent call outcomes and circuit-breaker state of one provider/model in this worker."""
+    label: str
+    calls: int
+    error_rate: float
+    empty_rate: float
+    state: Literal["closed", "open", "half_open"]
+    consecutive_failures: int
+    last_error: str | None = None
+    p50_s: float | None = None
+
+
+class ProviderUsage(BaseModel):
+    """Token usage of one provider/model since this worker started."""
+    label: str
+    calls: int
+    input_tokens: int
+    output_tokens: int
+    cached_tokens: int
+    cache_write_tokens: int
+    cache_hit_ratio: float
+
+
+class ProviderQuota(BaseModel):
+    """LLM call scheduling state of one provider API key in this worker."""
+    key: str
+    queued: int
+    admitted: int
+    rate_limited: int
+    paused_s: float
+    requests_available: float | None = None
+    tokens_available: float | None = None
+
+
 # ─────────────────────────────  Share Links  ─────────────────────────────────
 
 class ShareLinkCreate(BaseModel):
@@ -246,11 +435,48 @@ class QueryHistoryItem(BaseModel):
     sql_query: str
     llm_response: str | None = None
     schema_ddl: str | None = None
+    fingerprint: str | None = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
 
 
+class QueryHistoryGroup(BaseModel):
+    """History rows sharing one literal-stripped fingerprint."""
+    fingerprint: str
+    analysis_count: int
+    last_seen: datetime
+    total_suggestions: int
+    latest_id: str
+    latest_sql: str
+    latest_connection_id: str | None = None
+    latest_execution_time_ms: float | None = None  # from the most recent stored plan
+    latest_suggestion_count: int = 0
+
+
+class SuggestionRecord(BaseModel):
+    """A stored suggestion, as returned by the filter endpoint."""
+    id: int
+    query_id: str
+    category: str
+    estimated_impact: str
+    index_type: str | None = None
+    root_cause: str | None = None
+    sql: str | None = None
+    explanation: str = ""
+    tables: list[str] = []
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+    @field_validator("tables", mode="before")
+    @classmethod
+    def split_tables(cls, v: Any) -> Any:
+        if isinstance(v, str):
+            return [t for t in v.split(",") if t]
+        return v
+
+
 # ─────────────────────────────  Dashboard Stats  ─────────────────────────────
 
 class QueryByDate(BaseModel):
@@ -1,37 +1,71 @@
 """Query analysis endpoint — the core of the application."""
 
+import asyncio
+import hashlib
+import io
 import json
 import logging
 import uuid
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+import anyio.to_thread
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
 from slowapi import Limiter
 from sqlalchemy.orm import Session
 
 from api.dependencies import get_real_ip, require_api_key
-from api.models.orm import AnalyticsLog, LLMConfig, QueryHistory
+from api.routes.llm_settings import PROVIDERS as LLM_PROVIDERS
+from api.models.orm import AnalysisJob, AnalyticsLog, QueryHistory, QueryTable, WorkloadReport
 from api.models.schemas import (
+    AnalysisJobQueueStats,
+    AnalysisJobStatus,
     AnalysisResult,
     AnalyzeRequest,
-    CategoryCount,
+    BatchAnalyzeRequest,
+    ClientExplainResult,
     CompareRequest,
     CompareResult,
     DashboardStats,
-    QueryByDate,
+    LogFingerprint,
+    LogIngestResult,
+    QueryHistoryGroup,
     QueryHistoryItem,
-    RecentAnalysis,
     SimulateIndexRequest,
     SimulateIndexResult,
-    TableCount,
+    SQLParseCacheStats,
+    SuggestionRecord,
+    WorkloadReportEntry,
+    WorkloadReportRequest,
+    WorkloadReportResponse,
+    WorkloadReportSummary,
+    WorkloadStatement,
 )
+from core.concurrency import run_db_work
 from core.config import settings
-from core.database import get_db
-from core.encryption import decrypt
+from core.database import SessionLocal, get_db
 from services.connection_manager import ConnectionManager
-from services.llm_analyzer import LLMAnalyzer
+from services.connector_pool import ConnectorPool
+from services import analysis_cache
+from services.job_queue import QueueFullError, analysis_jobs
+from services.log_parser import DB_TYPES as LOG_DB_TYPES, LogAggregator, aggregate_log
+from services.llm_analyzer import LLMAnalyzer, looks_like_json
+from services.llm_config_cache import get_active_config, get_standby_configs
 from services.llm_providers import get_provider
+from services.llm_providers.base import BaseLLMProvider
+from services.llm_providers.hedged import HedgedProvider
+from services.llm_providers.routed import RoutedProvider
+from services.llm_scheduler import Priority, llm_priority
 from services.query_comparator import compare_queries
-from services.query_introspector import QueryIntrospectionResult, QueryIntrospector
+from services.history_rollups import dashboard_stats, record_analysis
+from services.query_history import find_suggestions, history_groups, history_row, index_rows
+from services.query_introspector import QueryIntrospectionResult, QueryIntrospector, extract_table_names
+from services.schema_cache import schema_cache
+from services.single_flight import SingleFlight
+from services.sql_normalizer import parse_cache_snapshot
+from services.workload_advisor import rank_workload, report_response, save_report
 
 logger = logging.getLogger(__name__)
 _analyze_deps = [] if settings.hosted_mode else [Depends(require_api_key)]
@@ -39,6 +73,13 @@ router = APIRouter(prefix="/analyze", tags=["analyze"], dependencies=_analyze_de
 
 limiter = Limiter(key_func=get_real_ip)
 
+_inflight = SingleFlight()
+# Sessions for coalesced analyses, which outlive the request that started them
+_flight_session_factory: Callable[[], Session] = SessionLocal
+
+# Model a standby LLM config is hedged / routed to (stored configs carry no model)
+_PROVIDER_DEFAULT_MODELS = {p.name: p.default_model for p in LLM_PROVIDERS}
+
 
 _analyze_rate = settings.hosted_rate_limit if settings.hosted_mode else settings.rate_limit
 
@@ -48,22 +89,38 @@ def _safe_detail(public_msg: str, exc: Exception) -> str:
     return public_msg if settings.hosted_mode else f"{public_msg}: {exc}"
 
 
-@router.post("", response_model=AnalysisResult)
-@limiter.limit(_analyze_rate)
-def analyze_query(
-    request: Request,
-    body: AnalyzeRequest,
-    db: Session = Depends(get_db),
-):
-    # Basic length guard
-    if len(body.sql) > settings.max_query_length:
+def _check_query_length(sql: str) -> None:
+    if len(sql) > settings.max_query_length:
         raise HTTPException(
             status_code=400,
             detail=f"Query exceeds maximum allowed length of {settings.max_query_length} characters.",
         )
 
-    query_id = str(uuid.uuid4())
 
+def _introspect_live(
+    pool: ConnectorPool, connection_id: str, db_type: str, sql: str
+) -> QueryIntrospectionResult | None:
+    """EXPLAIN + schema context from pooled sessions; None if the database is unreachable."""
+    try:
+        with (
+            pool.connection() as connector,
+            # Optional second session so the catalog fetch overlaps EXPLAIN
+            pool.connection(block=False) as catalog_connector,
+        ):
+            introspector = QueryIntrospector(
+                connector,
+                connection_id=connection_id,
+                catalog_connector=catalog_connector,
+                db_type=db_type,
+            )
+            return introspector.introspect(sql)
+    except Exception as exc:
+        logger.warning("DB introspection failed: %s — proceeding without live data", exc)
+        return None
+
+
+def _build_introspection(body: AnalyzeRequest, db: Session) -> QueryIntrospectionResult:
+    """Gather EXPLAIN + schema context from a live connection, the client, or neither."""
     # ── Live DB introspection (optional) ─────────────────────────────────────
     conn_record = None
     introspection: QueryIntrospectionResult | None = None
@@ -74,16 +131,12 @@ def analyze_query(
         if not conn_record:
             raise HTTPException(status_code=404, detail="Connection not found")
 
-        try:
-            connector = manager.open_connector(body.connection_id)
-            try:
-                introspector = QueryIntrospector(connector)
-                introspection = introspector.introspect(body.sql)
-                introspection.db_type = conn_record.db_type
-            finally:
-                connector.close()
-        except Exception as exc:
-            logger.warning("DB introspection failed: %s — proceeding without live data", exc)
+        introspection = _introspect_live(
+            manager.connection_pool(body.connection_id),
+            body.connection_id,
+            conn_record.db_type,
+            body.sql,
+        )
 
     # ── Client-provided introspection (Playground mode) ─────────────────────
     if introspection is None and body.client_explain is not None:
@@ -135,48 +188,85 @@ def analyze_query(
 
     # Build a minimal introspection object when no live DB is available
     if introspection is None:
-        from services.query_introspector import extract_table_names
-
         introspection = QueryIntrospectionResult(
             sql=body.sql,
             explain=None,
             table_schemas=[],
-            table_names=extract_table_names(body.sql),
+            table_names=extract_table_names(body.sql, conn_record.db_type if conn_record else None),
             db_type=conn_record.db_type if conn_record else None,
         )
 
-    # ── Resolve LLM provider ────────────────────────────────────────────────
+    return introspection
+
+
+def _resolve_provider(body: AnalyzeRequest, db: Session) -> BaseLLMProvider | None:
     provider_override = None
     if settings.hosted_mode:
         # Hosted: always use env-configured provider/model — ignore user overrides
         pass
     else:
-        # Self-hosted: DB config takes priority over .env
-        active_config = db.query(LLMConfig).filter(LLMConfig.is_active.is_(True)).first()
+        # Self-hosted: DB config takes priority over .env (cached, decrypted once)
+        active_config = get_active_config(db)
         if active_config:
             try:
-                api_key = decrypt(active_config.encrypted_api_key)
                 provider_override = get_provider(
                     provider_name=active_config.provider,
-                    api_key=api_key,
+                    api_key=active_config.api_key,
                     model=body.model,  # model chosen at analysis time
                 )
             except Exception as exc:
-                logger.warning("Failed to load active LLM config %s: %s — falling back to .env", active_config.id, exc)
+                logger.warning("Failed to load active LLM config %s: %s — falling back to .env", active_config.config_id, exc)
 
-    # ── LLM Analysis ─────────────────────────────────────────────────────────
-    try:
-        analyzer = LLMAnalyzer()
-        result = analyzer.analyze(introspection, query_id=query_id, provider_override=provider_override)
-    except Exception as exc:
-        logger.exception("LLM analysis failed: %s", exc)
-        raise HTTPException(status_code=502, detail=_safe_detail("Analysis failed. Please try again", exc))
+        if settings.llm_hedge_enabled:
+            provider_override = _with_standbys(provider_override, db)
+        elif settings.llm_routing_enabled:
+            provider_override = _routed(provider_override, db)
 
-    # ── Attach EXPLAIN error if query execution failed ──────────────────────
-    if introspection.explain_error:
-        result.explain_error = introspection.explain_error
+    return provider_override
 
-    # ── Persist ────────────────────────────────────────────────────────────────
+
+def _standby_providers(db: Session, limit: int | None = None) -> list[BaseLLMProvider]:
+    standbys: list[BaseLLMProvider] = []
+    for config in get_standby_configs(db)[:limit]:
+        try:
+            standbys.append(get_provider(
+                provider_name=config.provider,
+                api_key=config.api_key,
+                model=config.model or _PROVIDER_DEFAULT_MODELS.get(config.provider),
+            ))
+        except Exception as exc:
+            logger.warning("Skipping standby LLM config %s: %s", config.config_id, exc)
+    return standbys
+
+
+def _with_standbys(primary: BaseLLMProvider | None, db: Session) -> BaseLLMProvider | None:
+    """Wrap the resolved provider so slow calls are hedged onto stored standby configs."""
+    standbys = _standby_providers(db, settings.llm_hedge_max_standbys)
+    if not standbys:
+        return primary
+    return HedgedProvider(primary or get_provider(), standbys, accept=looks_like_json)
+
+
+def _routed(primary: BaseLLMProvider | None, db: Session) -> BaseLLMProvider | None:
+    """Route across the active and every standby config, with retries and circuit breakers."""
+    candidates = _standby_providers(db)
+    if primary is None:
+        try:
+            primary = get_provider()
+        except Exception as exc:
+            logger.warning("No usable .env LLM provider to route to: %s", exc)
+    if primary is not None:
+        candidates.insert(0, primary)
+    return RoutedProvider(candidates, accept=looks_like_json) if candidates else None
+
+
+def _persist_result(
+    db: Session,
+    body: AnalyzeRequest,
+    query_id: str,
+    introspection: QueryIntrospectionResult,
+    result: AnalysisResult,
+) -> None:
     if settings.hosted_mode:
         # Hosted: store only suggestion counts — no query content
         try:
@@ -195,39 +285,660 @@ def analyze_query(
     else:
         # Self-hosted: write to user-visible query history
         try:
-            history = QueryHistory(
-                id=query_id,
-                connection_id=body.connection_id,
-                sql_query=body.sql,
-                explain_plan=introspection.explain.raw_plan if introspection.explain else None,
-                llm_response=result.model_dump_json(),
+            explain = introspection.explain
+            history = history_row(
+                query_id,
+                body.connection_id,
+                body.sql,
+                introspection.db_type,
+                explain.raw_plan if explain else None,
+                explain.execution_time_ms if explain else None,
+                result,
             )
             db.add(history)
+            db.add_all(index_rows(query_id, result, introspection.table_names, introspection.db_type))
+            record_analysis(db, datetime.utcnow().date(), result, introspection.table_names)
             db.commit()
         except Exception as exc:
+            db.rollback()
             logger.warning("Failed to persist query history: %s", exc)
 
+
+def _prepare_analysis(
+    body: AnalyzeRequest, db: Session
+) -> tuple[QueryIntrospectionResult, BaseLLMProvider | None]:
+    """Blocking pre-LLM phase: introspection plus provider resolution."""
+    return _build_introspection(body, db), _resolve_provider(body, db)
+
+
+def _from_cache(cached: AnalysisResult, introspection: QueryIntrospectionResult) -> AnalysisResult:
+    return cached.model_copy(update={
+        "cache_hit": True,
+        "explain_plan": introspection.explain.raw_plan if introspection.explain else None,
+        "explain_error": None,
+    })
+
+
+def _cache_result(
+    db: Session, introspection: QueryIntrospectionResult, key: str, model: str, result: AnalysisResult
+) -> None:
+    """Cache ``result`` under the model that wrote it — a hedged or routed call may
+    have been answered by a standby rather than the requested ``model``."""
+    answered = result.model or model
+    if answered != model:
+        key = analysis_cache.cache_key(introspection, answered)
+    analysis_cache.store(db, key, answered, result)
+
+
+async def _analyze_introspected(
+    body: AnalyzeRequest,
+    db: Session,
+    introspection: QueryIntrospectionResult,
+    provider_override: BaseLLMProvider | None,
+    *,
+    db_call: Callable[..., Awaitable[Any]] = run_db_work,
+    llm_slot: asyncio.Semaphore | None = None,
+) -> AnalysisResult:
+    """Cache lookup + LLM call for an introspected query, without persisting anything.
+
+    ``db_call`` runs internal-store work (batch requests pass one that
+    serializes access to their shared session); ``llm_slot`` caps concurrent
+    LLM calls.
+    """
+    try:
+        analyzer = LLMAnalyzer()
+        model = analyzer.model_label(provider_override)
+        key = analysis_cache.cache_key(introspection, model)
+
+        cached = None
+        if body.cache != "bypass":
+            cached = await db_call(analysis_cache.lookup, db, key)
+
+        if cached is not None:
+            return _from_cache(cached, introspection)
+        if body.cache == "only":
+            raise HTTPException(status_code=404, detail="No cached analysis for this query")
+
+        async with llm_slot or nullcontext():
+            result = await analyzer.aanalyze(
+                introspection, query_id=str(uuid.uuid4()), provider_override=provider_override
+            )
+        if not result.degraded:
+            await db_call(_cache_result, db, introspection, key, model, result)
+        return result
+    except HTTPException:
+        raise
+    except Exception as exc:
+        logger.exception("LLM analysis failed: %s", exc)
+        raise HTTPException(status_code=502, detail=_safe_detail("Analysis failed. Please try again", exc))
+
+
+async def _run_analysis(
+    body: AnalyzeRequest, db: Session
+) -> tuple[QueryIntrospectionResult, AnalysisResult]:
+    """Introspection + cache lookup + LLM call, without persisting anything."""
+    # DB work runs on bounded worker threads; the LLM round trip is awaited
+    # so a slow provider only costs a coroutine, not a threadpool worker.
+    introspection, provider_override = await run_db_work(_prepare_analysis, body, db)
+
+    # ── LLM Analysis (served from the result cache when possible) ──────────
+    result = await _analyze_introspected(body, db, introspection, provider_override)
+    return introspection, result
+
+
+async def _run_shared_analysis(body: AnalyzeRequest) -> tuple[QueryIntrospectionResult, AnalysisResult]:
+    """``_run_analysis`` on a session owned by the flight, not by the leader's request:
+    the shielded task keeps running for followers after the leader disconnects."""
+    db = _flight_session_factory()
+    try:
+        return await _run_analysis(body, db)
+    finally:
+        await run_db_work(db.close)
+
+
+async def _analyze(body: AnalyzeRequest, db: Session) -> AnalysisResult:
+    """Full /analyze pipeline: (coalesced) analysis, then persistence under a fresh query id."""
+    query_id = str(uuid.uuid4())
+
+    if body.connection_id:
+        # Identical concurrent requests against a live DB share one EXPLAIN + LLM run. Keyed on
+        # the exact text: other literals mean another plan, and the result is stored under body.sql
+        sql_hash = hashlib.sha256(body.sql.encode()).hexdigest()
+        flight_key = (body.connection_id, sql_hash, body.model, body.cache)
+        introspection, shared = await _inflight.run(flight_key, lambda: _run_shared_analysis(body))
+    else:
+        introspection, shared = await _run_analysis(body, db)
+    result = shared.model_copy(update={"query_id": query_id})
+
+    # ── Attach EXPLAIN error if query execution failed ──────────────────────
+    if introspection.explain_error:
+        result.explain_error = introspection.explain_error
+
+    # ── Persist ────────────────────────────────────────────────────────────────
+    await run_db_work(_persist_result, db, body, query_id, introspection, result)
+
     return result
 
 
+def _job_status(job: AnalysisJob) -> AnalysisJobStatus:
+    queue_wait_ms = None
+    if job.started_at and job.created_at:
+        queue_wait_ms = (job.started_at - job.created_at).total_seconds() * 1000
+    return AnalysisJobStatus(
+        job_id=job.id,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        queue_wait_ms=queue_wait_ms,
+        result=AnalysisResult.model_validate_json(job.result_json) if job.result_json else None,
+        error=job.error,
+    )
+
+
+@router.post(
+    "",
+    response_model=AnalysisResult,
+    responses={202: {"model": AnalysisJobStatus, "description": "Queued (async=true)"}},
+)
+@limiter.limit(_analyze_rate)
+async def analyze_query(
+    request: Request,
+    body: AnalyzeRequest,
+    run_async: bool = Query(False, alias="async", description="Queue the analysis and return a job id"),
+    db: Session = Depends(get_db),
+):
+    # Basic length guard
+    _check_query_length(body.sql)
+
+    if not run_async:
+        return await _analyze(body, db)
+
+    if settings.hosted_mode:
+        # Job results are stored server-side, which hosted mode avoids
+        raise HTTPException(status_code=400, detail="Background analysis is not available in hosted mode")
+
+    try:
+        job = await analysis_jobs.submit(db, lambda job_db: _analyze(body, job_db))
+    except QueueFullError as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "5"})
+    return JSONResponse(status_code=202, content=_job_status(job).model_dump(mode="json"))
+
+
+@router.get("/jobs/stats", response_model=AnalysisJobQueueStats)
+def get_job_stats(db: Session = Depends(get_db)):
+    """Queue depth, running jobs and queue-wait times for background analyses."""
+    return analysis_jobs.snapshot(db)
+
+
+@router.get("/jobs/{job_id}", response_model=AnalysisJobStatus)
+def get_job(job_id: str, db: Session = Depends(get_db)):
+    job = db.get(AnalysisJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_status(job)
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=AnalysisJobStatus)
+def cancel_job(job_id: str, db: Session = Depends(get_db)):
+    job = analysis_jobs.cancel(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "cancelled":
+        raise HTTPException(status_code=409, detail=f"Job is already {job.status}")
+    return _job_status(job)
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+_RESULT_SECTIONS = ("bottlenecks", "indexes", "statistics", "rewrites", "materialized_views", "configuration")
+
+
+@router.post("/stream")
+@limiter.limit(_analyze_rate)
+async def analyze_query_stream(
+    request: Request,
+    body: AnalyzeRequest,
+    db: Session = Depends(get_db),
+):
+    """Server-Sent Events variant of /analyze.
+
+    Emits ``progress`` events during introspection, a ``summary`` event and one
+    ``suggestion`` event per item as soon as the model closes it, then the full
+    ``result`` (or an ``error``) as the final event.
+    """
+    _check_query_length(body.sql)
+
+    query_id = str(uuid.uuid4())
+
+    async def events():
+        try:
+            yield _sse("progress", {"stage": "introspecting"})
+            introspection, provider_override = await run_db_work(_prepare_analysis, body, db)
+            yield _sse("progress", {
+                "stage": "introspected",
+                "tables": introspection.table_names,
+                "has_plan": introspection.explain is not None,
+                "explain_error": introspection.explain_error,
+            })
+
+            analyzer = LLMAnalyzer()
+            model = analyzer.model_label(provider_override)
+            key = analysis_cache.cache_key(introspection, model)
+
+            cached = None
+            if body.cache != "bypass":
+                cached = await run_db_work(analysis_cache.lookup, db, key)
+
+            if cached is not None:
+                result = _from_cache(cached, introspection)
+                yield _sse("progress", {"stage": "cache_hit"})
+                yield _sse("summary", {"summary": result.summary})
+                for section in _RESULT_SECTIONS:
+                    for item in getattr(result, section):
+                        yield _sse("suggestion", {"category": section, "item": item.model_dump()})
+            elif body.cache == "only":
+                raise HTTPException(status_code=404, detail="No cached analysis for this query")
+            else:
+                yield _sse("progress", {"stage": "generating", "model": model})
+                result = None
+                async for section, value in analyzer.astream(
+                    introspection, query_id=query_id, provider_override=provider_override
+                ):
+                    if section == "result":
+                        result = value
+                    elif section == "summary":
+                        yield _sse("summary", {"summary": value})
+                    else:
+                        yield _sse("suggestion", {"category": section, "item": value.model_dump()})
+                if result is None:
+                    raise HTTPException(status_code=502, detail="The model stream ended without a result")
+                if not result.degraded:
+                    await run_db_work(_cache_result, db, introspection, key, model, result)
+
+            result = result.model_copy(update={"query_id": query_id})
+            if introspection.explain_error:
+                result.explain_error = introspection.explain_error
+            await run_db_work(_persist_result, db, body, query_id, introspection, result)
+
+            yield _sse("result", result.model_dump(mode="json"))
+        except HTTPException as exc:
+            yield _sse("error", {"status_code": exc.status_code, "detail": exc.detail})
+        except Exception as exc:
+            logger.exception("Streaming analysis failed: %s", exc)
+            yield _sse("error", {
+                "status_code": 502,
+                "detail": _safe_detail("Analysis failed. Please try again", exc),
+            })
+        finally:
+            # The dependency's own cleanup runs before the body is streamed
+            db.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _warm_schema_cache(pool: ConnectorPool, connection_id: str, db_type: str, sqls: list[str]) -> None:
+    """One catalog round trip for every table the batch references."""
+    tables = sorted({t for sql in sqls for t in extract_table_names(sql, db_type)})
+    if not tables:
+        return
+    try:
+        with pool.connection() as connector:
+            schema_cache.get_schemas(connection_id, connector, tables)
+    except Exception as exc:
+        logger.warning("Batch schema prefetch failed: %s", exc)
+
+
+def _prepare_batch(
+    body: BatchAnalyzeRequest, db: Session
+) -> tuple[ConnectorPool | None, str | None, BaseLLMProvider | None]:
+    """Resolve everything that needs the request's DB session once, up front."""
+    pool, db_type = None, None
+    if body.connection_id:
+        manager = ConnectionManager(db)
+        conn_record = manager.get(body.connection_id)
+        if not conn_record:
+            raise HTTPException(status_code=404, detail="Connection not found")
+        pool, db_type = manager.connection_pool(body.connection_id), conn_record.db_type
+        _warm_schema_cache(pool, body.connection_id, db_type, body.queries)
+    provider_override = _resolve_provider(AnalyzeRequest(sql=body.queries[0], model=body.model), db)
+    return pool, db_type, provider_override
+
+
+async def _analyze_many(
+    body: BatchAnalyzeRequest,
+    db: Session,
+    pool: ConnectorPool | None,
+    db_type: str | None,
+    provider_override: BaseLLMProvider | None,
+) -> AsyncIterator[tuple[int, AnalysisResult | BaseException]]:
+    """Analyze and persist every statement of a batch; yields (index, result or error) as each finishes."""
+    # Each statement holds up to two pooled sessions while introspecting
+    introspect_slot = asyncio.Semaphore(max(1, settings.connector_pool_max_size))
+    llm_slot = asyncio.Semaphore(max(1, settings.batch_llm_concurrency))
+    db_lock = asyncio.Lock()  # the request session must not be used from two threads at once
+
+    async def locked_db(func, *args):
+        async with db_lock:
+            return await run_db_work(func, *args)
+
+    async def analyze_one(sql: str) -> AnalysisResult:
+        query = AnalyzeRequest(sql=sql, connection_id=body.connection_id, model=body.model, cache=body.cache)
+        introspection = None
+        if pool is not None:
+            async with introspect_slot:
+                introspection = await run_db_work(_introspect_live, pool, body.connection_id, db_type, sql)
+        if introspection is None:
+            introspection = QueryIntrospectionResult(
+                sql=sql,
+                explain=None,
+                table_schemas=[],
+                table_names=extract_table_names(sql, db_type),
+                db_type=db_type,
+            )
+
+        # Batch and workload statements queue behind interactive analyses for LLM quota
+        with llm_priority(Priority.BATCH):
+            result = await _analyze_introspected(
+                query, db, introspection, provider_override, db_call=locked_db, llm_slot=llm_slot
+            )
+        query_id = str(uuid.uuid4())
+        result = result.model_copy(update={"query_id": query_id})
+        if introspection.explain_error:
+            result.explain_error = introspection.explain_error
+        await locked_db(_persist_result, db, query, query_id, introspection, result)
+        return result
+
+    tasks = {asyncio.ensure_future(analyze_one(sql)): i for i, sql in enumerate(body.queries)}
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled():
+                    outcome = HTTPException(status_code=503, detail="Analysis was cancelled before it finished")
+                elif task.exception() is not None:
+                    outcome = task.exception()
+                else:
+                    outcome = task.result()
+                yield tasks[task], outcome
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _error_payload(index: int, exc: BaseException) -> dict:
+    if isinstance(exc, HTTPException):
+        return {"index": index, "status_code": exc.status_code, "detail": exc.detail}
+    logger.error("Batch query %d failed: %s", index, exc)
+    return {
+        "index": index,
+        "status_code": 502,
+        "detail": _safe_detail("Analysis failed. Please try again", exc),
+    }
+
+
+@router.post("/batch")
+@limiter.limit(_analyze_rate)  # the whole batch is one rate-limit unit
+async def analyze_batch(
+    request: Request,
+    body: BatchAnalyzeRequest,
+    db: Session = Depends(get_db),
+):
+    """Analyze many statements against one connection; results stream back as SSE.
+
+    Introspection runs with bounded parallelism on the connection's pooled
+    sessions after a single shared schema fetch, and LLM calls are capped at
+    ``batch_llm_concurrency``. Emits one ``result`` or ``error`` event per
+    statement (tagged with its ``index``) as it finishes, then ``done``.
+    """
+    if len(body.queries) > settings.batch_max_queries:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch exceeds maximum of {settings.batch_max_queries} queries.",
+        )
+    for sql in body.queries:
+        _check_query_length(sql)
+
+    pool, db_type, provider_override = await run_db_work(_prepare_batch, body, db)
+
+    async def events():
+        succeeded = failed = 0
+        try:
+            async for index, outcome in _analyze_many(body, db, pool, db_type, provider_override):
+                if isinstance(outcome, BaseException):
+                    failed += 1
+                    yield _sse("error", _error_payload(index, outcome))
+                else:
+                    succeeded += 1
+                    yield _sse("result", {"index": index, "result": outcome.model_dump(mode="json")})
+            yield _sse("done", {"total": len(body.queries), "succeeded": succeeded, "failed": failed})
+        finally:
+            # The dependency's own cleanup runs before the body is streamed
+            db.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ── Log ingestion ─────────────────────────────────────────────────────────────
+
+def _aggregate_upload(file: UploadFile, log_format: str) -> tuple[str, LogAggregator]:
+    # newline="" keeps quoted multi-line csvlog fields intact for the csv module
+    text = io.TextIOWrapper(file.file, encoding="utf-8", errors="replace", newline="")
+    try:
+        return aggregate_log(text, log_format, settings.log_ingest_max_fingerprints)
+    finally:
+        text.detach()
+
+
+@router.post("/logs", response_model=LogIngestResult)
+@limiter.limit(_analyze_rate)
+async def ingest_log(
+    request: Request,
+    file: UploadFile = File(...),
+    log_format: Literal["auto", "postgres", "postgres_csv", "mysql_slow"] = Query("auto", alias="format"),
+    top_k: int = Query(20, ge=1, le=200),
+):
+    """Aggregate a PostgreSQL (stderr/csvlog, incl. auto_explain) or MySQL slow log per fingerprint.
+
+    The upload is parsed as a stream. Each returned entry carries an
+    ``analyze_request`` that replays its worst captured plan through
+    ``POST /analyze`` via ``client_explain``, like playground mode.
+    """
+    detected, aggregator = await anyio.to_thread.run_sync(_aggregate_upload, file, log_format)
+    db_type = LOG_DB_TYPES[detected]
+
+    entries = []
+    for agg in aggregator.top(top_k):
+        client_explain = None
+        if agg.plan:
+            client_explain = ClientExplainResult(raw_plan=agg.plan, execution_time_ms=agg.plan_duration_ms)
+        entries.append(LogFingerprint(
+            fingerprint=agg.fingerprint,
+            sql=agg.sql,
+            count=agg.count,
+            total_duration_ms=agg.total_duration_ms,
+            mean_duration_ms=agg.total_duration_ms / agg.count,
+            max_duration_ms=agg.max_duration_ms,
+            plan_duration_ms=agg.plan_duration_ms,
+            analyze_request=AnalyzeRequest(
+                sql=agg.sql,
+                client_explain=client_explain,
+                client_table_schemas=[] if client_explain else None,
+                client_db_type=db_type,
+            ),
+        ))
+
+    return LogIngestResult(
+        format=detected,
+        db_type=db_type,
+        statements=aggregator.statements,
+        fingerprints=len(aggregator.entries),
+        dropped=aggregator.dropped,
+        entries=entries,
+    )
+
+
+# ── Workload advisor ──────────────────────────────────────────────────────────
+
+_WORKLOAD_SOURCES = {
+    "postgresql": "pg_stat_statements",
+    "mysql": "performance_schema",
+}
+
+
+def _collect_workload(
+    body: WorkloadReportRequest, db: Session
+) -> tuple[str, list[WorkloadStatement], int, float]:
+    """Read the connection's statement statistics and pick the top-K by total time."""
+    manager = ConnectionManager(db)
+    conn_record = manager.get(body.connection_id)
+    if not conn_record:
+        raise HTTPException(status_code=404, detail="Connection not found")
+    source = _WORKLOAD_SOURCES.get(conn_record.db_type)
+    if source is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Workload reports are not supported for {conn_record.db_type} connections",
+        )
+
+    try:
+        with manager.pooled_connector(body.connection_id) as connector:
+            stats = connector.get_statement_stats(settings.workload_sample_size)
+    except (RuntimeError, NotImplementedError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except Exception as exc:
+        logger.exception("Workload collection failed: %s", exc)
+        raise HTTPException(status_code=502, detail=_safe_detail("Could not read workload statistics", exc))
+
+    top, total_ms = rank_workload(stats, body.top_k)
+    return source, top, len(stats), total_ms
+
+
+@router.post("/workload", response_model=WorkloadReportResponse)
+@limiter.limit(_analyze_rate)
+async def create_workload_report(
+    request: Request,
+    body: WorkloadReportRequest,
+    db: Session = Depends(get_db),
+):
+    """Rank the connection's recorded statements by total time and analyze the top-K."""
+    if settings.hosted_mode:
+        raise HTTPException(status_code=400, detail="Workload reports are not available in hosted mode")
+
+    source, top, sampled, total_ms = await run_db_work(_collect_workload, body, db)
+
+    entries = [WorkloadReportEntry(rank=i + 1, statement=stmt) for i, stmt in enumerate(top)]
+    if top:
+        batch = BatchAnalyzeRequest(
+            # A literal sample can be EXPLAIN ANALYZEd; a normalized digest cannot
+            queries=[stmt.sample_query or stmt.query for stmt in top],
+            connection_id=body.connection_id,
+            model=body.model,
+            cache=body.cache,
+        )
+        pool, db_type, provider_override = await run_db_work(_prepare_batch, batch, db)
+        async for index, outcome in _analyze_many(batch, db, pool, db_type, provider_override):
+            if isinstance(outcome, BaseException):
+                entries[index].error = _error_payload(index, outcome)["detail"]
+            else:
+                entries[index].analysis = outcome
+
+    report = await run_db_work(
+        save_report, db, body.connection_id, source, sampled, total_ms, entries
+    )
+    return report_response(report)
+
+
+@router.get("/workload", response_model=list[WorkloadReportSummary])
+def list_workload_reports(
+    connection_id: str | None = None,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+):
+    query = db.query(WorkloadReport)
+    if connection_id:
+        query = query.filter(WorkloadReport.connection_id == connection_id)
+    return query.order_by(WorkloadReport.created_at.desc()).limit(limit).all()
+
+
+@router.get("/workload/{report_id}", response_model=WorkloadReportResponse)
+def get_workload_report(report_id: str, db: Session = Depends(get_db)):
+    report = db.get(WorkloadReport, report_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Workload report not found")
+    return report_response(report)
+
+
 @router.get("/history", response_model=list[QueryHistoryItem])
 def get_history(
     limit: int = 50,
+    table: str | None = None,
     db: Session = Depends(get_db),
 ):
     if settings.hosted_mode:
         return []
-    rows = (
-        db.query(QueryHistory)
-        .order_by(QueryHistory.created_at.desc())
-        .limit(limit)
-        .all()
+    query = db.query(QueryHistory)
+    if table:
+        query = query.join(QueryTable, QueryTable.query_id == QueryHistory.id).filter(
+            QueryTable.table_name == table.lower()
+        )
+    return query.order_by(QueryHistory.created_at.desc()).limit(limit).all()
+
+
+@router.get("/suggestions", response_model=list[SuggestionRecord])
+def get_suggestions(
+    category: str | None = None,
+    impact: str | None = None,
+    table: str | None = None,
+    index_type: str | None = None,
+    root_cause: str | None = None,
+    connection_id: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """Stored suggestions filtered by category, impact, table and type, newest first."""
+    if settings.hosted_mode:
+        return []
+    return find_suggestions(
+        db,
+        category=category,
+        impact=impact,
+        table=table,
+        index_type=index_type,
+        root_cause=root_cause,
+        connection_id=connection_id,
+        limit=limit,
+        offset=offset,
     )
-    return rows
+
+
+@router.get("/history/groups", response_model=list[QueryHistoryGroup])
+def get_history_groups(
+    limit: int = Query(50, ge=1, le=500),
+    connection_id: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """History collapsed per fingerprint, most recently seen first."""
+    if settings.hosted_mode:
+        return []
+    return history_groups(db, limit, connection_id)
 
 
 @router.get("/stats", response_model=DashboardStats)
 def get_stats(db: Session = Depends(get_db)):
+    """Dashboard statistics over all history, read from the daily rollups."""
     if settings.hosted_mode:
         return DashboardStats(
             total_queries=0,
@@ -239,146 +950,40 @@ def get_stats(db: Session = Depends(get_db)):
             queries_by_date=[],
             recent_analyses=[],
         )
-    """Dashboard statistics: totals, per-day counts, and recent analyses."""
-    from datetime import datetime, timedelta
-    from sqlalchemy import func
-
-    # Total queries
-    total_queries = db.query(func.count(QueryHistory.id)).scalar() or 0
-
-    # Queries by date (last 30 days)
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    date_rows = (
-        db.query(
-            func.date(QueryHistory.created_at).label("date"),
-            func.count(QueryHistory.id).label("count"),
-        )
-        .filter(QueryHistory.created_at >= thirty_days_ago)
-        .group_by(func.date(QueryHistory.created_at))
-        .order_by(func.date(QueryHistory.created_at))
-        .all()
-    )
-    queries_by_date = [QueryByDate(date=str(row.date), count=row.count) for row in date_rows]
-
-    # Recent analyses (last 5) + aggregated stats from last 200
-    recent_rows = (
-        db.query(QueryHistory)
-        .order_by(QueryHistory.created_at.desc())
-        .limit(200)
-        .all()
-    )
+    return dashboard_stats(db)
 
-    total_suggestions = 0
-    high_impact_count = 0
-    category_counts: dict[str, int] = {}
-    table_freq: dict[str, int] = {}
-    analysis_dates: set[str] = set()
-    recent_analyses: list[RecentAnalysis] = []
 
-    suggestion_keys = ("indexes", "rewrites", "materialized_views", "bottlenecks", "statistics")
-
-    for i, row in enumerate(recent_rows):
-        suggestion_count = 0
-        if row.llm_response:
-            try:
-                data = json.loads(row.llm_response)
-                for key in suggestion_keys:
-                    items = data.get(key, [])
-                    count = len(items)
-                    suggestion_count += count
-                    category_counts[key] = category_counts.get(key, 0) + count
-                    for item in items:
-                        if isinstance(item, dict) and item.get("estimated_impact") == "high":
-                            high_impact_count += 1
-                # configuration is separate (ConfigurationItem)
-                config_items = data.get("configuration", [])
-                config_count = len(config_items)
-                suggestion_count += config_count
-                category_counts["configuration"] = category_counts.get("configuration", 0) + config_count
-                for item in config_items:
-                    if isinstance(item, dict) and item.get("estimated_impact") == "high":
-                        high_impact_count += 1
-                # Track tables
-                for t in data.get("tables_analyzed", []):
-                    table_freq[t] = table_freq.get(t, 0) + 1
-            except (json.JSONDecodeError, TypeError):
-                pass
-        total_suggestions += suggestion_count
-
-        # Track analysis dates for streak
-        if row.created_at:
-            analysis_dates.add(row.created_at.strftime("%Y-%m-%d"))
-
-        if i < 5:
-            recent_analyses.append(
-                RecentAnalysis(
-                    id=row.id,
-                    sql_query=row.sql_query,
-                    suggestion_count=suggestion_count,
-                    created_at=row.created_at,
-                    llm_response=row.llm_response,
-                )
-            )
-
-    # Compute streak (consecutive days from today backwards)
-    streak_days = 0
-    if analysis_dates:
-        today = datetime.utcnow().date()
-        d = today
-        while d.strftime("%Y-%m-%d") in analysis_dates:
-            streak_days += 1
-            d -= timedelta(days=1)
-
-    # Top categories sorted by count
-    top_categories = sorted(
-        [CategoryCount(category=k, count=v) for k, v in category_counts.items()],
-        key=lambda x: x.count,
-        reverse=True,
-    )
-
-    # Most analyzed tables (top 5)
-    most_analyzed_tables = sorted(
-        [TableCount(table_name=k, count=v) for k, v in table_freq.items()],
-        key=lambda x: x.count,
-        reverse=True,
-    )[:5]
-
-    return DashboardStats(
-        total_queries=total_queries,
-        total_suggestions=total_suggestions,
-        high_impact_count=high_impact_count,
-        streak_days=streak_days,
-        top_categories=top_categories,
-        most_analyzed_tables=most_analyzed_tables,
-        queries_by_date=queries_by_date,
-        recent_analyses=recent_analyses,
-    )
+@router.get("/parse-cache-stats", response_model=SQLParseCacheStats)
+def get_parse_cache_stats():
+    """Size and hit / miss counters of the in-process SQL parse cache."""
+    return SQLParseCacheStats(**parse_cache_snapshot())
 
 
 @router.post("/compare", response_model=CompareResult)
 @limiter.limit(_analyze_rate)
-def compare_rewrites(
+async def compare_rewrites(
     request: Request,
     body: CompareRequest,
     db: Session = Depends(get_db),
 ):
     """Compare original and rewritten SQL by executing both and diffing results."""
+    return await run_db_work(_compare_rewrites, body, db)
+
+
+def _compare_rewrites(body: CompareRequest, db: Session) -> CompareResult:
     manager = ConnectionManager(db)
     conn_record = manager.get(body.connection_id)
     if not conn_record:
         raise HTTPException(status_code=404, detail="Connection not found")
 
     try:
-        connector = manager.open_connector(body.connection_id)
-        try:
+        with manager.pooled_connector(body.connection_id) as connector:
             result = compare_queries(
                 connector=connector,
                 original_sql=body.original_sql,
                 rewritten_sql=body.rewritten_sql,
                 row_limit=body.row_limit,
             )
-        finally:
-            connector.close()
     except HTTPException:
         raise
     except Exception as exc:
@@ -390,7 +995,7 @@ def compare_rewrites(
 
 @router.post("/simulate-index", response_model=SimulateIndexResult)
 @limiter.limit(_analyze_rate)
-def simulate_index(
+async def simulate_index(
     request: Request,
     body: SimulateIndexRequest,
     db: Session = Depends(get_db),
@@ -401,6 +1006,10 @@ def simulate_index(
     the planner's cost estimate with the index, then cleans up.
     No real index is created — this only affects the planner within the session.
     """
+    return await run_db_work(_simulate_index, body, db)
+
+
+def _simulate_index(body: SimulateIndexRequest, db: Session) -> SimulateIndexResult:
     from services.index_simulator import IndexSimulator
 
     manager = ConnectionManager(db)
@@ -8,10 +8,14 @@ from api.models.schemas import (
     ConnectionResponse,
     ConnectionTestResult,
     ConnectionUpdate,
+    ConnectorPoolStats,
+    SchemaCacheStats,
 )
 from api.dependencies import require_api_key
 from core.database import get_db
 from services.connection_manager import ConnectionManager
+from services.connector_pool import pool_stats
+from services.schema_cache import schema_cache
 
 router = APIRouter(prefix="/connections", tags=["connections"], dependencies=[Depends(require_api_key)])
 
@@ -33,6 +37,21 @@ def list_connections(manager: ConnectionManager = Depends(_manager)):
     return manager.list_all()
 
 
+@router.get("/pool-stats", response_model=list[ConnectorPoolStats])
+def get_pool_stats():
+    """Checkout / wait / create counters for every live connector pool."""
+    return [
+        ConnectorPoolStats(connection_id=cid, **stats)
+        for cid, stats in pool_stats().items()
+    ]
+
+
+@router.get("/schema-cache-stats", response_model=SchemaCacheStats)
+def get_schema_cache_stats():
+    """Hit / miss counters for the table schema cache."""
+    return SchemaCacheStats(**schema_cache.snapshot())
+
+
 @router.get("/{connection_id}", response_model=ConnectionResponse)
 def get_connection(
     connection_id: str,
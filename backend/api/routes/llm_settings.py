@@ -11,10 +11,19 @@ from api.models.schemas import (
     LLMConfigCreate,
     LLMConfigResponse,
     LLMConfigUpdate,
+    ProviderHealth,
     ProviderInfo,
+    ProviderLatency,
+    ProviderQuota,
+    ProviderUsage,
 )
 from core.database import get_db
 from core.encryption import decrypt, encrypt
+from services.llm_config_cache import invalidate_active_config
+from services.llm_health import llm_health
+from services.llm_latency import hedge_delay, llm_latency
+from services.llm_scheduler import llm_scheduler
+from services.llm_usage import llm_usage
 
 logger = logging.getLogger(__name__)
 
@@ -173,6 +182,36 @@ def list_providers():
     return PROVIDERS
 
 
+@router.get("/latency", response_model=list[ProviderLatency])
+def provider_latency():
+    """Latency history behind the hedge delay (see llm_hedge_* settings)."""
+    return [
+        ProviderLatency(label=label, hedge_delay_s=hedge_delay(label), **stats)
+        for label, stats in sorted(llm_latency.snapshot().items())
+    ]
+
+
+@router.get("/health", response_model=list[ProviderHealth])
+def provider_health():
+    """Error / empty-response rates and circuit state used to route analyses."""
+    return [
+        ProviderHealth(label=label, p50_s=llm_latency.quantile(label, 0.5), **stats)
+        for label, stats in sorted(llm_health.snapshot().items())
+    ]
+
+
+@router.get("/quotas", response_model=list[ProviderQuota])
+def provider_quotas():
+    """Per-API-key request / token budgets and 429 pauses of the LLM call scheduler."""
+    return [ProviderQuota(key=key, **stats) for key, stats in sorted(llm_scheduler.snapshot().items())]
+
+
+@router.get("/usage", response_model=list[ProviderUsage])
+def provider_usage():
+    """Prompt / output token totals per provider/model, with prompt-cache hits."""
+    return [ProviderUsage(label=label, **totals) for label, totals in sorted(llm_usage.snapshot().items())]
+
+
 @router.post("", response_model=LLMConfigResponse, status_code=201)
 def create_llm_config(body: LLMConfigCreate, db: Session = Depends(get_db)):
     config = LLMConfig(
@@ -184,6 +223,7 @@ def create_llm_config(body: LLMConfigCreate, db: Session = Depends(get_db)):
     db.add(config)
     db.commit()
     db.refresh(config)
+    invalidate_active_config()
     logger.info("Created LLM config %s (%s)", config.id, config.provider)
     return _to_response(config)
 
@@ -215,6 +255,7 @@ def update_llm_config(
 
     db.commit()
     db.refresh(config)
+    invalidate_active_config()
     return _to_response(config)
 
 
@@ -225,6 +266,7 @@ def delete_llm_config(config_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="LLM config not found")
     db.delete(config)
     db.commit()
+    invalidate_active_config()
 
 
 @router.post("/{config_id}/activate", response_model=LLMConfigResponse)
@@ -238,5 +280,6 @@ def activate_llm_config(config_id: str, db: Session = Depends(get_db)):
     config.is_active = True
     db.commit()
     db.refresh(config)
+    invalidate_active_config()
     logger.info("Activated LLM config %s (%s)", config.id, config.provider)
     return _to_response(config)
@@ -53,6 +53,25 @@ class ExplainResult:
     execution_time_ms: float | None
 
 
+@dataclass
+class StatementStat:
+    """Cumulative runtime statistics for one normalized statement."""
+    statement_id: str        # pg_stat_statements queryid / performance_schema digest
+    query: str               # normalized text as recorded by the server
+    calls: int
+    total_exec_time_ms: float
+    mean_exec_time_ms: float
+    rows: int
+    shared_blks_hit: int = 0
+    shared_blks_read: int = 0
+    shared_blks_dirtied: int = 0
+    shared_blks_written: int = 0
+    rows_examined: int = 0
+    no_index_used: int = 0           # executions that did a full scan (MySQL)
+    tmp_disk_tables: int = 0         # on-disk temporary tables created (MySQL)
+    sample_query: str | None = None  # a recent execution with real literals, if recorded
+
+
 class BaseConnector(ABC):
     """Read-only database connector interface."""
 
@@ -68,6 +87,34 @@ class BaseConnector(ABC):
     def get_table_schema(self, table_name: str, schema: str | None = None) -> TableSchema:
         """Return full schema + stats for a single table."""
 
+    def get_table_schemas(
+        self, table_names: list[str], schema: str | None = None
+    ) -> list[TableSchema]:
+        """Return schema + stats for several tables.
+
+        Connectors override this with set-based catalog queries so the cost
+        does not grow with the number of tables; the default loops.
+        """
+        return [self.get_table_schema(t, schema) for t in table_names]
+
+    def get_table_versions(
+        self, table_names: list[str], schema: str | None = None
+    ) -> dict[str, str] | None:
+        """Return a cheap change token per existing table, or None if unsupported.
+
+        Tokens change whenever the table is rewritten, re-analyzed or its
+        definition changes, so cached schemas can be validated in one query.
+        Tables that do not exist are omitted.
+        """
+        return None
+
+    def get_statement_stats(self, limit: int) -> list[StatementStat]:
+        """Return the ``limit`` statements with the highest total execution time.
+
+        Raises NotImplementedError if the database has no statement statistics.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not expose statement statistics")
+
     @abstractmethod
     def get_existing_indexes(self, table_names: list[str]) -> list[IndexInfo]:
         """Return all indexes that cover the given tables."""
@@ -76,6 +123,13 @@ class BaseConnector(ABC):
     def execute_limited(self, sql: str, limit: int, timeout_ms: int) -> list[tuple]:
         """Execute a query with LIMIT and return raw rows for result comparison."""
 
+    def reset(self) -> None:
+        """Roll back any open transaction so the session can be reused.
+
+        Pooled connectors call this on check-in. Raises if the underlying
+        connection is no longer usable.
+        """
+
     @abstractmethod
     def close(self) -> None:
         """Release the underlying connection."""
@@ -10,11 +10,31 @@ from connectors.base import (
     ColumnStat,
     ExplainResult,
     IndexInfo,
+    StatementStat,
     TableSchema,
 )
 
 logger = logging.getLogger(__name__)
 
+# Timer columns in performance_schema are in picoseconds
+_PS_PER_MS = 1_000_000_000
+
+_DIGEST_SUMMARY_SQL = """
+    SELECT DIGEST                       AS digest,
+           DIGEST_TEXT                  AS digest_text,
+           COUNT_STAR                   AS calls,
+           SUM_TIMER_WAIT               AS sum_timer_wait,
+           SUM_ROWS_SENT                AS rows_sent,
+           SUM_ROWS_EXAMINED            AS rows_examined,
+           SUM_NO_INDEX_USED            AS no_index_used,
+           SUM_CREATED_TMP_DISK_TABLES  AS tmp_disk_tables
+    FROM performance_schema.events_statements_summary_by_digest
+    WHERE SCHEMA_NAME = DATABASE()
+      AND DIGEST IS NOT NULL
+    ORDER BY SUM_TIMER_WAIT DESC
+    LIMIT %s
+"""
+
 
 class MySQLConnector(BaseConnector):
     def __init__(
@@ -96,6 +116,118 @@ class MySQLConnector(BaseConnector):
             column_stats=col_stats,
         )
 
+    def get_table_schemas(
+        self, table_names: list[str], schema: str | None = None
+    ) -> list[TableSchema]:
+        """Fetch columns, row counts, indexes and histograms for all tables at once.
+
+        Uses ``IN (...)`` over information_schema (``STATISTICS`` instead of a
+        ``SHOW INDEX`` per table), so the round-trip count is constant.
+        """
+        if not table_names:
+            return []
+        db = schema or self._conn.database
+        tables = list(table_names)
+        placeholders = ", ".join(["%s"] * len(tables))
+        params = (db, *tables)
+
+        columns: dict[str, list[dict]] = {}
+        row_counts: dict[str, int] = {}
+        cur = self._conn.cursor(dictionary=True)
+        cur.execute(
+            f"""
+            SELECT t.TABLE_NAME     AS table_name,
+                   t.TABLE_ROWS     AS table_rows,
+                   c.COLUMN_NAME    AS column_name,
+                   c.COLUMN_TYPE    AS data_type,
+                   c.IS_NULLABLE    AS is_nullable,
+                   c.COLUMN_DEFAULT AS column_default
+            FROM information_schema.TABLES t
+            LEFT JOIN information_schema.COLUMNS c
+                   ON c.TABLE_SCHEMA = t.TABLE_SCHEMA AND c.TABLE_NAME = t.TABLE_NAME
+            WHERE t.TABLE_SCHEMA = %s AND t.TABLE_NAME IN ({placeholders})
+            ORDER BY t.TABLE_NAME, c.ORDINAL_POSITION
+            """,
+            params,
+        )
+        for row in cur.fetchall():
+            table = row.pop("table_name").lower()
+            table_rows = row.pop("table_rows")
+            row_counts[table] = int(table_rows) if table_rows is not None else 0
+            cols = columns.setdefault(table, [])
+            if row["column_name"] is not None:
+                cols.append(row)
+
+        cur.execute(
+            f"""
+            SELECT TABLE_NAME  AS Table_name,
+                   INDEX_NAME  AS Key_name,
+                   NON_UNIQUE  AS Non_unique,
+                   INDEX_TYPE  AS Index_type,
+                   COLUMN_NAME AS Column_name
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders})
+            ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+            """,
+            params,
+        )
+        index_rows: dict[str, list[dict]] = {}
+        for row in cur.fetchall():
+            index_rows.setdefault(row["Table_name"].lower(), []).append(row)
+        cur.close()
+
+        col_stats = self._fetch_column_stats_bulk(tables, db, placeholders)
+
+        return [
+            TableSchema(
+                table_name=table,
+                columns=columns.get(table.lower(), []),
+                row_count=row_counts.get(table.lower(), 0),
+                indexes=_group_index_rows(index_rows.get(table.lower(), []), table),
+                column_stats=col_stats.get(table.lower(), []),
+            )
+            for table in tables
+        ]
+
+    def get_table_versions(
+        self, table_names: list[str], schema: str | None = None
+    ) -> dict[str, str] | None:
+        """information_schema.TABLES CREATE_TIME / UPDATE_TIME per table."""
+        if not table_names:
+            return {}
+        placeholders = ", ".join(["%s"] * len(table_names))
+        sql = f"""
+            SELECT TABLE_NAME, CREATE_TIME, UPDATE_TIME
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders})
+        """
+        cur = self._conn.cursor()
+        cur.execute(sql, (schema or self._conn.database, *table_names))
+        rows = cur.fetchall()
+        cur.close()
+        return {str(name).lower(): f"{created}|{updated}" for name, created, updated in rows}
+
+    def get_statement_stats(self, limit: int) -> list[StatementStat]:
+        """Top digests from performance_schema, ranked by total wait time.
+
+        Each digest gets a representative literal sample from
+        ``events_statements_history_long`` when that consumer is enabled.
+        """
+        try:
+            cur = self._conn.cursor(dictionary=True)
+            cur.execute(_DIGEST_SUMMARY_SQL, (limit,))
+            rows = cur.fetchall()
+            cur.close()
+        except mysql.connector.Error as exc:
+            self._conn.rollback()
+            raise RuntimeError(f"Could not read performance_schema digests: {exc}") from exc
+
+        stats = [_statement_stat_from_digest(row) for row in rows]
+        samples = self._fetch_digest_samples(rows)
+        for stat in stats:
+            stat.sample_query = samples.get(stat.statement_id)
+        return stats
+
     def get_existing_indexes(self, table_names: list[str]) -> list[IndexInfo]:
         all_indexes: list[IndexInfo] = []
         db = self._conn.database
@@ -118,6 +250,9 @@ class MySQLConnector(BaseConnector):
         finally:
             self._conn.rollback()
 
+    def reset(self) -> None:
+        self._conn.rollback()
+
     def close(self) -> None:
         try:
             self._conn.close()
@@ -162,33 +297,7 @@ class MySQLConnector(BaseConnector):
         cur.execute(sql)
         rows = cur.fetchall()
         cur.close()
-
-        # Group by index name
-        index_map: dict[str, dict] = {}
-        for row in rows:
-            name = row["Key_name"]
-            if name not in index_map:
-                index_map[name] = {
-                    "index_name": name,
-                    "table_name": table,
-                    "is_unique": not row["Non_unique"],
-                    "index_type": row["Index_type"].lower(),
-                    "columns": [],
-                    "definition": "",
-                }
-            index_map[name]["columns"].append(row["Column_name"])
-
-        return [
-            IndexInfo(
-                index_name=v["index_name"],
-                table_name=v["table_name"],
-                columns=v["columns"],
-                is_unique=v["is_unique"],
-                index_type=v["index_type"],
-                definition=v["definition"],
-            )
-            for v in index_map.values()
-        ]
+        return _group_index_rows(rows, table)
 
     def _fetch_column_stats(self, table: str, db: str) -> list[ColumnStat]:
         """MySQL doesn't expose pg_stats equivalents easily; return basic histogram info."""
@@ -218,3 +327,126 @@ class MySQLConnector(BaseConnector):
             # COLUMN_STATISTICS requires MySQL 8+; silently skip on older versions
             pass
         return stats
+
+    def _fetch_digest_samples(self, digest_rows: list[dict]) -> dict[str, str]:
+        """digest → representative SQL text; empty if history_long is unavailable."""
+        if not digest_rows:
+            return {}
+        digests = [row["digest"] for row in digest_rows]
+        placeholders = ", ".join(["%s"] * len(digests))
+        try:
+            cur = self._conn.cursor(dictionary=True)
+            cur.execute("SELECT @@performance_schema_max_sql_text_length AS max_len")
+            max_len = cur.fetchone()["max_len"]
+            cur.execute(
+                f"""
+                SELECT DIGEST AS digest, SQL_TEXT AS sql_text, TIMER_WAIT AS timer_wait
+                FROM performance_schema.events_statements_history_long
+                WHERE DIGEST IN ({placeholders}) AND SQL_TEXT IS NOT NULL
+                """,
+                digests,
+            )
+            sample_rows = cur.fetchall()
+            cur.close()
+        except mysql.connector.Error as exc:
+            logger.info("No statement samples from events_statements_history_long: %s", exc)
+            self._conn.rollback()
+            return {}
+        return _pick_samples(digest_rows, sample_rows, int(max_len) if max_len else None)
+
+    def _fetch_column_stats_bulk(
+        self, tables: list[str], db: str, placeholders: str
+    ) -> dict[str, list[ColumnStat]]:
+        sql = f"""
+            SELECT TABLE_NAME, COLUMN_NAME
+            FROM information_schema.COLUMN_STATISTICS
+            WHERE SCHEMA_NAME = %s AND TABLE_NAME IN ({placeholders})
+        """
+        stats: dict[str, list[ColumnStat]] = {}
+        try:
+            cur = self._conn.cursor(dictionary=True)
+            cur.execute(sql, (db, *tables))
+            rows = cur.fetchall()
+            cur.close()
+            for row in rows:
+                stats.setdefault(row["TABLE_NAME"].lower(), []).append(
+                    ColumnStat(
+                        column_name=row["COLUMN_NAME"],
+                        null_frac=0.0,
+                        avg_width=0,
+                        n_distinct=-1.0,
+                    )
+                )
+        except Exception:
+            # COLUMN_STATISTICS requires MySQL 8+; silently skip on older versions
+            pass
+        return stats
+
+
+def _statement_stat_from_digest(row: dict) -> StatementStat:
+    calls = int(row["calls"] or 0)
+    total_ms = int(row["sum_timer_wait"] or 0) / _PS_PER_MS
+    return StatementStat(
+        statement_id=row["digest"],
+        query=row["digest_text"] or "",
+        calls=calls,
+        total_exec_time_ms=total_ms,
+        mean_exec_time_ms=total_ms / calls if calls else 0.0,
+        rows=int(row["rows_sent"] or 0),
+        rows_examined=int(row["rows_examined"] or 0),
+        no_index_used=int(row["no_index_used"] or 0),
+        tmp_disk_tables=int(row["tmp_disk_tables"] or 0),
+    )
+
+
+def _pick_samples(
+    digest_rows: list[dict], sample_rows: list[dict], max_text_length: int | None
+) -> dict[str, str]:
+    """Per digest, the recorded execution whose wait time is closest to the digest's mean.
+
+    Samples cut off at ``performance_schema_max_sql_text_length`` are skipped.
+    """
+    mean_wait = {
+        row["digest"]: int(row["sum_timer_wait"] or 0) / max(1, int(row["calls"] or 0))
+        for row in digest_rows
+    }
+    best: dict[str, tuple[float, str]] = {}
+    for row in sample_rows:
+        digest, text = row["digest"], row["sql_text"]
+        if digest not in mean_wait or not text:
+            continue
+        if max_text_length and len(text.encode()) >= max_text_length:
+            continue
+        distance = abs(int(row["timer_wait"] or 0) - mean_wait[digest])
+        if digest not in best or distance < best[digest][0]:
+            best[digest] = (distance, text)
+    return {digest: text for digest, (_, text) in best.items()}
+
+
+def _group_index_rows(rows: list[dict], table: str) -> list[IndexInfo]:
+    """Fold SHOW INDEX-shaped rows (one per indexed column) into IndexInfo objects."""
+    index_map: dict[str, dict] = {}
+    for row in rows:
+        name = row["Key_name"]
+        if name not in index_map:
+            index_map[name] = {
+                "index_name": name,
+                "table_name": table,
+                "is_unique": not row["Non_unique"],
+                "index_type": row["Index_type"].lower(),
+                "columns": [],
+                "definition": "",
+            }
+        index_map[name]["columns"].append(row["Column_name"])
+
+    return [
+        IndexInfo(
+            index_name=v["index_name"],
+            table_name=v["table_name"],
+            columns=v["columns"],
+            is_unique=v["is_unique"],
+            index_type=v["index_type"],
+            definition=v["definition"],
+        )
+        for v in index_map.values()
+    ]
@@ -12,11 +12,128 @@ from connectors.base import (
     ColumnStat,
     ExplainResult,
     IndexInfo,
+    StatementStat,
     TableSchema,
 )
 
 logger = logging.getLogger(__name__)
 
+# One row per requested relation, with columns / indexes / pg_stats folded
+# into JSON arrays so any number of tables costs a single round trip.
+_BULK_SCHEMA_SQL = """
+    SELECT
+        c.relname               AS table_name,
+        c.reltuples::bigint     AS row_count,
+        COALESCE((
+            SELECT json_agg(json_build_object(
+                'column_name',    col.column_name,
+                'data_type',      col.data_type,
+                'is_nullable',    col.is_nullable,
+                'column_default', col.column_default
+            ) ORDER BY col.ordinal_position)
+            FROM information_schema.columns col
+            WHERE col.table_schema = n.nspname AND col.table_name = c.relname
+        ), '[]'::json)          AS columns,
+        COALESCE((
+            SELECT json_agg(json_build_object(
+                'index_name', i.relname,
+                'is_unique',  ix.indisunique,
+                'index_type', am.amname,
+                'definition', pg_get_indexdef(ix.indexrelid),
+                'columns',    (
+                    SELECT array_agg(a.attname ORDER BY k.ordinality)
+                    FROM unnest(ix.indkey) WITH ORDINALITY AS k(attnum, ordinality)
+                    JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = k.attnum
+                )
+            ))
+            FROM pg_index ix
+            JOIN pg_class i  ON i.oid  = ix.indexrelid
+            JOIN pg_am    am ON am.oid = i.relam
+            WHERE ix.indrelid = c.oid
+        ), '[]'::json)          AS indexes,
+        COALESCE((
+            SELECT json_agg(json_build_object(
+                'column_name',       s.attname,
+                'null_frac',         s.null_frac,
+                'avg_width',         s.avg_width,
+                'n_distinct',        s.n_distinct,
+                'most_common_vals',  s.most_common_vals::text,
+                'most_common_freqs', s.most_common_freqs
+            ))
+            FROM pg_stats s
+            WHERE s.schemaname = n.nspname AND s.tablename = c.relname
+        ), '[]'::json)          AS column_stats
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = %s
+      AND c.relname = ANY(%s)
+      AND c.relkind IN ('r', 'p', 'm', 'v', 'f')
+"""
+
+
+def _index_from_row(row: dict, table_name: str) -> IndexInfo:
+    return IndexInfo(
+        index_name=row["index_name"],
+        table_name=table_name,
+        columns=list(row["columns"] or []),
+        is_unique=row["is_unique"],
+        index_type=row["index_type"],
+        definition=row["definition"],
+    )
+
+
+def _column_stat_from_row(row: dict) -> ColumnStat:
+    mcv_raw = row["most_common_vals"] or ""
+    mcv = [v.strip() for v in mcv_raw.strip("{}").split(",") if v.strip()] if mcv_raw else []
+    return ColumnStat(
+        column_name=row["column_name"],
+        null_frac=float(row["null_frac"] or 0),
+        avg_width=int(row["avg_width"] or 0),
+        n_distinct=float(row["n_distinct"] or 0),
+        most_common_vals=mcv,
+        most_common_freqs=list(row["most_common_freqs"] or []),
+    )
+
+
+# pg_stat_statements keeps one row per (user, database, queryid, toplevel);
+# fold them into one row per queryid for the current database.
+# {time_col} is total_exec_time on PG13+ and total_time before that.
+_STATEMENT_STATS_SQL = """
+    SELECT
+        s.queryid::text                         AS statement_id,
+        min(s.query)                            AS query,
+        sum(s.calls)::bigint                    AS calls,
+        sum(s.{time_col})::float8               AS total_exec_time_ms,
+        sum(s.rows)::bigint                     AS rows,
+        sum(s.shared_blks_hit)::bigint          AS shared_blks_hit,
+        sum(s.shared_blks_read)::bigint         AS shared_blks_read,
+        sum(s.shared_blks_dirtied)::bigint      AS shared_blks_dirtied,
+        sum(s.shared_blks_written)::bigint      AS shared_blks_written
+    FROM pg_stat_statements s
+    WHERE s.dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+      AND s.queryid IS NOT NULL
+    GROUP BY s.queryid
+    ORDER BY total_exec_time_ms DESC
+    LIMIT %s
+"""
+
+
+def _statement_stat_from_row(row: dict) -> StatementStat:
+    calls = int(row["calls"] or 0)
+    total = float(row["total_exec_time_ms"] or 0.0)
+    return StatementStat(
+        statement_id=row["statement_id"],
+        query=row["query"],
+        calls=calls,
+        total_exec_time_ms=total,
+        mean_exec_time_ms=total / calls if calls else 0.0,
+        rows=int(row["rows"] or 0),
+        shared_blks_hit=int(row["shared_blks_hit"] or 0),
+        shared_blks_read=int(row["shared_blks_read"] or 0),
+        shared_blks_dirtied=int(row["shared_blks_dirtied"] or 0),
+        shared_blks_written=int(row["shared_blks_written"] or 0),
+    )
+
 
 class PostgreSQLConnector(BaseConnector):
     def __init__(
@@ -94,6 +211,78 @@ class PostgreSQLConnector(BaseConnector):
             column_stats=col_stats,
         )
 
+    def get_table_schemas(
+        self, table_names: list[str], schema: str | None = "public"
+    ) -> list[TableSchema]:
+        """Fetch columns, reltuples, indexes and pg_stats for all tables in one round trip."""
+        if not table_names:
+            return []
+        schema = schema or "public"
+        with self._conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.execute(_BULK_SCHEMA_SQL, (schema, list(table_names)))
+            rows = {row["table_name"]: row for row in cur.fetchall()}
+
+        schemas: list[TableSchema] = []
+        for table in table_names:
+            row = rows.get(table)
+            if row is None:
+                # Same shape get_table_schema() returns for an unknown relation
+                schemas.append(TableSchema(table, [], 0, [], []))
+                continue
+            schemas.append(
+                TableSchema(
+                    table_name=table,
+                    columns=list(row["columns"]),
+                    row_count=int(row["row_count"] or 0),
+                    indexes=[_index_from_row(ix, table) for ix in row["indexes"]],
+                    column_stats=[_column_stat_from_row(st) for st in row["column_stats"]],
+                )
+            )
+        return schemas
+
+    def get_table_versions(
+        self, table_names: list[str], schema: str | None = "public"
+    ) -> dict[str, str] | None:
+        """relfilenode + reltuples + last (auto)analyze, plus column/index shape."""
+        if not table_names:
+            return {}
+        sql = """
+            SELECT
+                c.relname AS table_name,
+                concat_ws('|',
+                    c.relfilenode, c.reltuples, c.relnatts,
+                    s.last_analyze, s.last_autoanalyze,
+                    (SELECT array_agg(ix.indexrelid ORDER BY ix.indexrelid)
+                     FROM pg_index ix WHERE ix.indrelid = c.oid)
+                ) AS version
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+            WHERE n.nspname = %s
+              AND c.relname = ANY(%s)
+              AND c.relkind IN ('r', 'p', 'm', 'v', 'f')
+        """
+        with self._conn.cursor() as cur:
+            cur.execute(sql, (schema or "public", list(table_names)))
+            return {row[0]: row[1] for row in cur.fetchall()}
+
+    def get_statement_stats(self, limit: int) -> list[StatementStat]:
+        """Top statements from pg_stat_statements, ranked by total execution time."""
+        time_col = "total_exec_time" if self._conn.server_version >= 130000 else "total_time"
+        try:
+            with self._conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+                if cur.fetchone() is None:
+                    raise RuntimeError(
+                        "pg_stat_statements is not installed in this database "
+                        "(CREATE EXTENSION pg_stat_statements)"
+                    )
+                cur.execute(_STATEMENT_STATS_SQL.format(time_col=time_col), (limit,))
+                return [_statement_stat_from_row(row) for row in cur.fetchall()]
+        except psycopg2.Error as exc:
+            self._conn.rollback()
+            raise RuntimeError(f"Could not read pg_stat_statements: {exc}") from exc
+
     def get_existing_indexes(self, table_names: list[str]) -> list[IndexInfo]:
         all_indexes: list[IndexInfo] = []
         for table in table_names:
@@ -113,6 +302,9 @@ class PostgreSQLConnector(BaseConnector):
         finally:
             self._conn.rollback()
 
+    def reset(self) -> None:
+        self._conn.rollback()
+
     def close(self) -> None:
         try:
             self._conn.close()
@@ -176,17 +368,7 @@ class PostgreSQLConnector(BaseConnector):
         """
         with self._conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
             cur.execute(sql, params)
-            return [
-                IndexInfo(
-                    index_name=row["index_name"],
-                    table_name=row["table_name"],
-                    columns=list(row["columns"]),
-                    is_unique=row["is_unique"],
-                    index_type=row["index_type"],
-                    definition=row["definition"],
-                )
-                for row in cur.fetchall()
-            ]
+            return [_index_from_row(row, row["table_name"]) for row in cur.fetchall()]
 
     def _fetch_column_stats(self, table: str, schema: str) -> list[ColumnStat]:
         sql = """
@@ -202,18 +384,4 @@ class PostgreSQLConnector(BaseConnector):
         """
         with self._conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
             cur.execute(sql, (schema, table))
-            stats = []
-            for row in cur.fetchall():
-                mcv_raw = row["most_common_vals"] or ""
-                mcv = [v.strip() for v in mcv_raw.strip("{}").split(",") if v.strip()] if mcv_raw else []
-                stats.append(
-                    ColumnStat(
-                        column_name=row["column_name"],
-                        null_frac=float(row["null_frac"] or 0),
-                        avg_width=int(row["avg_width"] or 0),
-                        n_distinct=float(row["n_distinct"] or 0),
-                        most_common_vals=mcv,
-                        most_common_freqs=list(row["most_common_freqs"] or []),
-                    )
-                )
-            return stats
+            return [_column_stat_from_row(row) for row in cur.fetchall()]
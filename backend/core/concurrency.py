@@ -0,0 +1,30 @@
+"""Bounded thread offloading for blocking work called from async handlers."""
+
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+import anyio
+import anyio.to_thread
+
+from core.config import settings
+
+T = TypeVar("T")
+
+# Created lazily: anyio limiters must be built inside a running event loop
+_db_limiter: anyio.CapacityLimiter | None = None
+
+
+def _limiter() -> anyio.CapacityLimiter:
+    global _db_limiter
+    if _db_limiter is None:
+        _db_limiter = anyio.CapacityLimiter(settings.db_worker_threads)
+    return _db_limiter
+
+
+async def run_db_work(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run blocking DB work (introspection, internal store I/O) in a worker thread.
+
+    Uses its own capacity limiter, separate from Starlette's default
+    threadpool, so slow target databases cannot starve sync endpoints.
+    """
+    return await anyio.to_thread.run_sync(partial(func, *args, **kwargs), limiter=_limiter())
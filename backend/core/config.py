@@ -38,6 +38,50 @@ class Settings(BaseSettings):
         default="sqlite:///./data/sql_optimizer.db",
         description="Internal storage DB URL",
     )
+    # Pooled sessions for a server-backed internal store (e.g. postgresql://…);
+    # several API replicas can share one PostgreSQL database
+    database_pool_size: int = Field(
+        default=5,
+        description="Persistent internal-DB connections per API process",
+    )
+    database_max_overflow: int = Field(
+        default=10,
+        description="Extra internal-DB connections allowed under burst load",
+    )
+    database_pool_timeout_s: float = Field(
+        default=30.0,
+        description="Seconds to wait for a free internal-DB connection",
+    )
+    database_pool_recycle_s: int = Field(
+        default=1800,
+        description="Reconnect internal-DB connections older than this (beats server/LB idle timeouts)",
+    )
+    database_pool_pre_ping: bool = Field(
+        default=True,
+        description="Test internal-DB connections on checkout and replace dead ones",
+    )
+
+    # SQLite internal store tuning (applied to every new connection)
+    sqlite_journal_mode: str = Field(
+        default="WAL",
+        description="SQLite journal_mode; WAL lets readers proceed while a worker writes",
+    )
+    sqlite_busy_timeout_ms: int = Field(
+        default=5000,
+        description="How long a SQLite writer waits for a lock before 'database is locked'",
+    )
+    sqlite_synchronous: str = Field(
+        default="NORMAL",
+        description="SQLite synchronous level (NORMAL is durable across app crashes in WAL mode)",
+    )
+    sqlite_mmap_size: int = Field(
+        default=256 * 1024 * 1024,
+        description="Bytes of the SQLite file to memory-map (0 disables)",
+    )
+    sqlite_temp_store_memory: bool = Field(
+        default=True,
+        description="Keep SQLite temp tables and sort spills in memory",
+    )
 
     # LLM provider
     llm_provider: str = Field(default="openrouter", description="Active LLM provider")
@@ -100,6 +144,108 @@ class Settings(BaseSettings):
     # LLM
     llm_model: str = Field(default="meta-llama/llama-3.3-70b-instruct:free", description="LLM model ID")
     llm_max_tokens: int = Field(default=4096, description="Max output tokens for LLM response")
+    llm_config_cache_ttl_s: int = Field(
+        default=60,
+        description="Seconds the active LLM config (decrypted) is cached per worker",
+    )
+    llm_prompt_caching: bool = Field(
+        default=True,
+        description="Mark the system prompt and schema prefix as cacheable (Anthropic cache_control)",
+    )
+
+    # Hedged LLM requests: if the primary provider is slower than its usual
+    # p-quantile latency, race the same prompt on a standby LLM config
+    llm_hedge_enabled: bool = Field(
+        default=False,
+        description="Race slow LLM calls against stored standby (inactive) LLM configs",
+    )
+    llm_hedge_quantile: float = Field(
+        default=0.9, gt=0, lt=1,
+        description="Latency quantile of the primary provider after which a hedge is sent",
+    )
+    llm_hedge_initial_delay_s: float = Field(
+        default=15.0,
+        description="Hedge delay used until a provider has llm_hedge_min_samples latencies",
+    )
+    llm_hedge_min_delay_s: float = Field(
+        default=1.0,
+        description="Lower bound on the hedge delay",
+    )
+    llm_hedge_min_samples: int = Field(
+        default=20,
+        description="Latencies recorded for a provider before its quantile is trusted",
+    )
+    llm_hedge_max_standbys: int = Field(
+        default=1,
+        description="Standby providers a single call may be hedged to",
+    )
+    llm_latency_window: int = Field(
+        default=200,
+        description="Recent successful call latencies kept per provider/model",
+    )
+
+    # Provider routing: health tracking, circuit breakers and retries across
+    # the active and standby LLM configs
+    llm_routing_enabled: bool = Field(
+        default=False,
+        description="Route analyses across the active and stored standby (inactive) LLM configs — "
+        "fastest healthy first, retrying on failure",
+    )
+    llm_health_window: int = Field(
+        default=50,
+        description="Recent call outcomes kept per provider/model for error / empty-response rates",
+    )
+    llm_breaker_failure_threshold: int = Field(
+        default=3,
+        description="Consecutive failures (errors or empty responses) that open a provider's circuit",
+    )
+    llm_breaker_error_rate: float = Field(
+        default=0.5, gt=0, le=1,
+        description="Failure rate over the health window that opens the circuit (after 10 calls)",
+    )
+    llm_breaker_cooldown_s: float = Field(
+        default=30.0,
+        description="Seconds an open circuit rejects calls before one probe is let through",
+    )
+    llm_retry_attempts: int = Field(
+        default=3,
+        description="LLM call attempts per analysis across the routed providers",
+    )
+    llm_retry_base_delay_s: float = Field(
+        default=0.5,
+        description="Base of the exponential, fully jittered backoff between attempts",
+    )
+    llm_retry_max_delay_s: float = Field(
+        default=8.0,
+        description="Cap on a single backoff sleep",
+    )
+
+    # LLM call scheduling: per (provider, API key) request / token budgets and
+    # priority so interactive analyses go ahead of batch and workload jobs
+    llm_requests_per_minute: int = Field(
+        default=0,
+        description="Requests per minute allowed per provider API key (0 = unlimited)",
+    )
+    llm_tokens_per_minute: int = Field(
+        default=0,
+        description="Estimated tokens (prompt + max output) per minute per provider API key (0 = unlimited)",
+    )
+    llm_provider_rate_limits: dict[str, list[int]] = Field(
+        default_factory=dict,
+        description='Per-provider [rpm, tpm] overrides, e.g. {"groq": [30, 6000]}',
+    )
+    llm_rate_limit_retries: int = Field(
+        default=3,
+        description="Times a 429 is waited out (honoring retry-after) before the call fails",
+    )
+    llm_rate_limit_default_pause_s: float = Field(
+        default=5.0,
+        description="Pause for a provider key after a 429 without a retry-after header",
+    )
+    llm_sdk_max_retries: int = Field(
+        default=0,
+        description="Retries inside the OpenAI / Anthropic SDKs (the scheduler handles 429s)",
+    )
 
     # Hosted mode (disables connections & LLM settings routes, drops API key auth)
     hosted_mode: bool = Field(default=False, description="Enable hosted/playground-only mode")
@@ -122,5 +268,92 @@ class Settings(BaseSettings):
         description="Max characters in the LLM user message (~4K tokens)",
     )
 
+    # Connector pool (per stored connection)
+    connector_pool_min_size: int = Field(
+        default=1,
+        description="Idle read-only sessions kept warm per connection",
+    )
+    connector_pool_max_size: int = Field(
+        default=4,
+        description="Max open read-only sessions per connection",
+    )
+    connector_pool_idle_timeout_s: int = Field(
+        default=300,
+        description="Seconds an idle pooled session may live before eviction",
+    )
+    connector_pool_checkout_timeout_s: float = Field(
+        default=10.0,
+        description="Seconds to wait for a free pooled session before failing",
+    )
+
+    # Threads for blocking DB work awaited by async endpoints
+    db_worker_threads: int = Field(
+        default=16,
+        description="Max worker threads for introspection and internal-store I/O",
+    )
+
+    # LLM analysis result cache (internal DB)
+    analysis_cache_ttl_s: int = Field(
+        default=7 * 24 * 3600,
+        description="Seconds a cached analysis stays valid",
+    )
+    analysis_cache_max_entries: int = Field(
+        default=5_000,
+        description="Max cached analyses before least-recently-used eviction (0 disables)",
+    )
+
+    # Schema / statistics cache
+    schema_cache_max_entries: int = Field(
+        default=512,
+        description="Max cached table schemas across all connections (0 disables)",
+    )
+
+    # Batch analysis (POST /analyze/batch)
+    batch_max_queries: int = Field(
+        default=50,
+        description="Max statements accepted in one batch request",
+    )
+    batch_llm_concurrency: int = Field(
+        default=4,
+        description="Max concurrent LLM calls per batch request",
+    )
+
+    # Workload advisor (POST /analyze/workload)
+    workload_sample_size: int = Field(
+        default=500,
+        description="Statements read from the statistics view when building a workload report",
+    )
+
+    # Parsed-SQL memo (services/sql_normalizer.analyze_sql)
+    sql_parse_cache_max_entries: int = Field(
+        default=4096,
+        description="Max memoized SQL parses (0 disables)",
+    )
+
+    # Slow-query / auto_explain log ingestion (POST /analyze/logs)
+    log_ingest_max_fingerprints: int = Field(
+        default=10_000,
+        description="Distinct statement fingerprints tracked per uploaded log",
+    )
+
+    # Background analysis jobs (POST /analyze?async=true)
+    analysis_job_workers: int = Field(
+        default=4,
+        description="Concurrent background analyses per API worker",
+    )
+    analysis_job_max_queue: int = Field(
+        default=100,
+        description="Max queued background analyses per API worker before new jobs are rejected",
+    )
+    analysis_job_retention_s: int = Field(
+        default=24 * 3600,
+        description="Seconds finished background jobs and their results are kept",
+    )
+    analysis_job_stale_after_s: int = Field(
+        default=1800,
+        description="At startup, queued / running jobs older than this are assumed orphaned by a crash "
+        "or restart and failed",
+    )
+
 
 settings = Settings()
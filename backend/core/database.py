@@ -1,24 +1,115 @@
-"""Internal SQLAlchemy setup for storing connection configs and query history."""
+"""Internal SQLAlchemy setup for storing connection configs and query history.
 
+SQLite (the default) suits a single API process; point ``database_url`` at
+PostgreSQL to share one store between several replicas.
+"""
+
+import logging
 from pathlib import Path
 
-from sqlalchemy import create_engine
+from sqlalchemy import Date, create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
-from typing import Generator
+from sqlalchemy.sql.functions import FunctionElement
+from typing import TYPE_CHECKING, Any, Generator, Sequence
 
 from core.config import settings
 
+if TYPE_CHECKING:
+    from core.migrations import Migration
+
+logger = logging.getLogger(__name__)
+
+
+def engine_options(url: str) -> dict[str, Any]:
+    """create_engine() keyword arguments for the internal store at ``url``."""
+    if make_url(url).get_backend_name() == "sqlite":
+        # SQLite needs this flag so pooled connections can cross threads
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout_s,
+        "pool_recycle": settings.database_pool_recycle_s,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+    }
+
+
 # Ensure the data directory exists for SQLite storage
-if "sqlite" in settings.database_url:
+if make_url(settings.database_url).get_backend_name() == "sqlite":
     Path("data").mkdir(parents=True, exist_ok=True)
 
 engine = create_engine(
     settings.database_url,
-    # SQLite needs this flag; ignored by other drivers
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
     echo=(settings.app_env == "development"),
+    **engine_options(settings.database_url),
 )
 
+
+class day_bucket(FunctionElement):
+    """Calendar day of a timestamp column, portable across internal-store dialects."""
+    type = Date()
+    inherit_cache = True
+    name = "day_bucket"
+
+
+@compiles(day_bucket)
+def _day_bucket_default(element, compiler, **kw):
+    return f"CAST({compiler.process(element.clauses, **kw)} AS DATE)"
+
+
+@compiles(day_bucket, "sqlite")
+@compiles(day_bucket, "mysql")
+def _day_bucket_date_fn(element, compiler, **kw):
+    return f"DATE({compiler.process(element.clauses, **kw)})"
+
+
+def sqlite_pragmas() -> dict[str, Any]:
+    """Per-connection SQLite settings, in the order they are applied."""
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "synchronous": settings.sqlite_synchronous,
+        "mmap_size": settings.sqlite_mmap_size,
+        "temp_store": "MEMORY" if settings.sqlite_temp_store_memory else "DEFAULT",
+    }
+
+
+def configure_sqlite(target: Engine) -> None:
+    """Apply ``sqlite_pragmas()`` to every connection ``target`` opens."""
+    if target.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(target, "connect")
+    def _apply_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for name, value in sqlite_pragmas().items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def storage_report(target: Engine | None = None) -> dict[str, Any]:
+    """The storage settings actually in effect on a fresh connection."""
+    target = target or engine
+    report: dict[str, Any] = {"dialect": target.dialect.name}
+    if target.dialect.name == "sqlite":
+        with target.connect() as conn:
+            for name in sqlite_pragmas():
+                report[name] = conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+    else:
+        pool = target.pool
+        report["pool"] = type(pool).__name__
+        if hasattr(pool, "size"):
+            report["pool_size"] = pool.size()
+            report["max_overflow"] = getattr(pool, "_max_overflow", None)
+    return report
+
+
+configure_sqlite(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -35,8 +126,27 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def init_db() -> None:
-    """Create all tables on startup."""
+def init_db(migrations: Sequence["Migration"] = ()) -> None:
+    """Create or upgrade all tables on startup, then apply pending data migrations."""
     # Import models so Base registers them before create_all
     import api.models.orm  # noqa: F401
-    Base.metadata.create_all(bind=engine)
+    from core.migrations import run_migrations
+
+    applied = run_migrations(engine, sessionmaker(autoflush=False, bind=engine), migrations)
+    if applied:
+        logger.info("Applied internal-store migrations: %s", ", ".join(applied))
+    _log_storage_report()
+
+
+def _log_storage_report() -> None:
+    report = storage_report()
+    logger.info("Internal store: %s", ", ".join(f"{k}={v}" for k, v in report.items()))
+    if report["dialect"] != "sqlite":
+        return
+    wanted = sqlite_pragmas()
+    # In-memory databases cannot use WAL; only warn for file-backed stores
+    if str(report["journal_mode"]).lower() != wanted["journal_mode"].lower() and engine.url.database not in (None, "", ":memory:"):
+        logger.warning(
+            "SQLite journal_mode is %s, expected %s — concurrent writers may see 'database is locked'",
+            report["journal_mode"], wanted["journal_mode"],
+        )
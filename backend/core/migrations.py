@@ -0,0 +1,139 @@
+"""Versioned startup migrations for the internal store.
+
+Schema changes stay additive: ``create_all`` creates new tables and
+``add_missing_columns`` appends columns / indexes that newer models declare.
+Data migrations (backfills) run once each and are recorded in
+``schema_migrations``. Everything runs under a lock — an advisory lock on
+PostgreSQL, a file lock next to the database on SQLite — so workers and
+replicas starting together do not race each other.
+"""
+
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock; run one worker there
+    fcntl = None
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.orm import Session
+
+from core.database import Base
+
+logger = logging.getLogger(__name__)
+
+# (version, step) — step receives a session and commits its own work
+Migration = tuple[str, Callable[[Session], Any]]
+
+# Arbitrary constant shared by every replica
+_PG_LOCK_KEY = 0x0B71_3E01
+
+
+def run_migrations(
+    engine: Engine,
+    session_factory: Callable[[], Session],
+    migrations: Sequence[Migration] = (),
+) -> list[str]:
+    """Bring the schema up to date and apply pending data migrations in order."""
+    from api.models.orm import SchemaMigration
+
+    with _migration_lock(engine):
+        Base.metadata.create_all(bind=engine)
+        add_missing_columns(engine)
+
+        db = session_factory()
+        try:
+            done = {version for (version,) in db.query(SchemaMigration.version)}
+            applied: list[str] = []
+            for version, step in migrations:
+                if version in done:
+                    continue
+                logger.info("Running internal-store migration %s", version)
+                step(db)
+                db.add(SchemaMigration(version=version))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    # Recorded by a process that ran it concurrently (no lock available)
+                    db.rollback()
+                    continue
+                applied.append(version)
+            return applied
+        finally:
+            db.close()
+
+
+def add_missing_columns(engine: Engine) -> None:
+    """Bring tables created by older versions up to date.
+
+    ``create_all`` never alters existing tables, so nullable / defaulted
+    columns added to a model later are appended here, and the model's
+    indexes are created if absent.
+    """
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+            default = getattr(column.server_default, "arg", None)
+            if isinstance(default, str):  # ALTER TABLE only accepts constant defaults
+                ddl += f" DEFAULT '{default}'"
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(ddl))
+            except DBAPIError as exc:
+                if not _already_exists(exc):
+                    raise
+                logger.info("Column %s.%s was added concurrently", table.name, column.name)
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def _already_exists(exc: DBAPIError) -> bool:
+    message = str(exc.orig).lower()
+    return "duplicate column" in message or "already exists" in message
+
+
+@contextmanager
+def _migration_lock(engine: Engine) -> Iterator[None]:
+    if engine.dialect.name == "sqlite":
+        with _file_lock(engine.url.database):
+            yield
+        return
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _PG_LOCK_KEY})
+        conn.commit()
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _PG_LOCK_KEY})
+            conn.commit()
+
+
+@contextmanager
+def _file_lock(database: str | None) -> Iterator[None]:
+    """Exclusive lock on ``<database>.migrate.lock``; a no-op for in-memory databases.
+
+    A file lock rather than ``BEGIN EXCLUSIVE``: the migration steps open
+    their own connections, which an exclusive transaction would block.
+    """
+    if not database or database == ":memory:" or fcntl is None:
+        yield
+        return
+    with open(f"{database}.migrate.lock", "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
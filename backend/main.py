@@ -9,7 +9,11 @@ from slowapi.errors import RateLimitExceeded
 
 from api.dependencies import get_real_ip
 from core.config import settings
-from core.database import init_db
+from core.database import SessionLocal, init_db
+from services.connector_pool import close_all_pools
+from services.job_queue import analysis_jobs
+from services.history_rollups import rebuild_rollups
+from services.query_history import backfill_fingerprints, rebuild_suggestion_index
 from api.routes.connections import router as connections_router
 from api.routes.analyze import router as analyze_router
 from api.routes.llm_settings import router as llm_settings_router
@@ -22,6 +26,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Backfills for history written by older versions, applied once each in order
+_DATA_MIGRATIONS = [
+    ("0001_history_fingerprints", backfill_fingerprints),
+    ("0002_suggestion_index", rebuild_suggestion_index),
+    ("0003_dashboard_rollups", rebuild_rollups),
+]
+
 limiter = Limiter(key_func=get_real_ip, default_limits=[])
 
 app = FastAPI(
@@ -51,10 +62,21 @@ app.add_middleware(
 @app.on_event("startup")
 def on_startup() -> None:
     logger.info("Initializing database tables…")
-    init_db()
+    init_db(_DATA_MIGRATIONS)
+    db = SessionLocal()
+    try:
+        analysis_jobs.recover(db)
+    finally:
+        db.close()
     logger.info("Startup complete.")
 
 
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await analysis_jobs.shutdown()
+    close_all_pools()
+
+
 app.include_router(analyze_router, prefix="/api/v1")
 app.include_router(share_router, prefix="/api/v1")
 
@@ -66,5 +88,5 @@ else:
 
 
 @app.get("/health", tags=["meta"])
-def health() -> dict:
+async def health() -> dict:
     return {"status": "ok", "version": settings.app_version}
@@ -0,0 +1,109 @@
+"""Persistent cache of LLM analysis results in the internal DB."""
+
+import hashlib
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from api.models.orm import AnalysisCacheEntry
+from api.models.schemas import AnalysisResult
+from core.config import settings
+from services.prompt_builder import PromptBuilder
+from services.query_introspector import QueryIntrospectionResult
+from services.sql_normalizer import fingerprint_sql
+
+logger = logging.getLogger(__name__)
+
+_prompt_builder = PromptBuilder()
+
+
+def cache_key(introspection: QueryIntrospectionResult, model: str) -> str:
+    """Hash of dialect, literal-stripped SQL, prompt context digest and model id.
+
+    Queries that differ only in literals share a key as long as the schema,
+    statistics and plan shape they were analyzed against are unchanged.
+    """
+    parts = [
+        introspection.db_type or "",
+        fingerprint_sql(introspection.sql, introspection.db_type),
+        _prompt_builder.context_digest(introspection),
+        model,
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def lookup(db: Session, key: str) -> AnalysisResult | None:
+    """Return the cached result for ``key`` if present and within the TTL."""
+    if settings.analysis_cache_max_entries <= 0:
+        return None
+    entry = db.get(AnalysisCacheEntry, key)
+    if entry is None:
+        return None
+
+    now = datetime.utcnow()
+    if entry.created_at and entry.created_at < now - timedelta(seconds=settings.analysis_cache_ttl_s):
+        db.delete(entry)
+        db.commit()
+        return None
+
+    try:
+        result = AnalysisResult.model_validate_json(entry.result_json)
+    except ValueError as exc:
+        logger.warning("Dropping unreadable analysis cache entry %s: %s", key, exc)
+        db.delete(entry)
+        db.commit()
+        return None
+
+    entry.hit_count = (entry.hit_count or 0) + 1
+    entry.last_used_at = now
+    db.commit()
+    return result
+
+
+def store(db: Session, key: str, model: str, result: AnalysisResult) -> None:
+    """Insert or refresh a cache entry, then evict expired and least-recently-used rows."""
+    if settings.analysis_cache_max_entries <= 0:
+        return
+    try:
+        now = datetime.utcnow()
+        payload = result.model_dump_json()
+        entry = db.get(AnalysisCacheEntry, key)
+        if entry is None:
+            db.add(AnalysisCacheEntry(
+                cache_key=key,
+                model=model,
+                result_json=payload,
+                created_at=now,
+                last_used_at=now,
+            ))
+        else:
+            entry.result_json = payload
+            entry.created_at = now
+            entry.last_used_at = now
+        db.commit()
+        _evict(db, now)
+    except Exception as exc:
+        db.rollback()
+        logger.warning("Failed to store analysis cache entry: %s", exc)
+
+
+def _evict(db: Session, now: datetime) -> None:
+    expired_before = now - timedelta(seconds=settings.analysis_cache_ttl_s)
+    db.query(AnalysisCacheEntry).filter(
+        AnalysisCacheEntry.created_at < expired_before
+    ).delete(synchronize_session=False)
+
+    overflow = (db.query(func.count(AnalysisCacheEntry.cache_key)).scalar() or 0) - settings.analysis_cache_max_entries
+    if overflow > 0:
+        oldest = (
+            db.query(AnalysisCacheEntry.cache_key)
+            .order_by(AnalysisCacheEntry.last_used_at.asc())
+            .limit(overflow)
+            .subquery()
+        )
+        db.query(AnalysisCacheEntry).filter(
+            AnalysisCacheEntry.cache_key.in_(db.query(oldest.c.cache_key))
+        ).delete(synchronize_session=False)
+    db.commit()
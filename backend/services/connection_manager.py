@@ -1,6 +1,8 @@
 """CRUD operations for stored DB connections, with encrypted credentials."""
 
 import logging
+from contextlib import contextmanager
+from typing import Callable, Iterator
 
 from sqlalchemy.orm import Session
 
@@ -11,6 +13,8 @@ from connectors.postgresql import PostgreSQLConnector
 from connectors.base import BaseConnector
 from core.config import settings
 from core.encryption import decrypt, encrypt
+from services.connector_pool import ConnectorPool, get_pool, invalidate_pool
+from services.schema_cache import schema_cache
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +29,44 @@ def _resolve_host(host: str) -> str:
     return host
 
 
+def _connector_factory(conn: DBConnection) -> Callable[[], BaseConnector]:
+    """Capture a connection record's settings in a factory that outlives the DB session.
+
+    The password stays encrypted until a new session is actually opened.
+    """
+    db_type = conn.db_type
+    host = _resolve_host(conn.host)
+    port = conn.port
+    database = conn.database
+    user = conn.username
+    encrypted_password = conn.encrypted_password
+    ssl_enabled = conn.ssl_enabled
+
+    if db_type not in ("postgresql", "mysql"):
+        raise ValueError(f"Unsupported db_type: {db_type!r}")
+
+    def factory() -> BaseConnector:
+        password = decrypt(encrypted_password)
+        if db_type == "postgresql":
+            return PostgreSQLConnector(
+                host=host,
+                port=port,
+                database=database,
+                user=user,
+                password=password,
+                sslmode="require" if ssl_enabled else "prefer",
+            )
+        return MySQLConnector(
+            host=host,
+            port=port,
+            database=database,
+            user=user,
+            password=password,
+        )
+
+    return factory
+
+
 class ConnectionManager:
     def __init__(self, db: Session) -> None:
         self._db = db
@@ -69,6 +111,8 @@ class ConnectionManager:
             conn.ssl_enabled = data.ssl_enabled
         self._db.commit()
         self._db.refresh(conn)
+        invalidate_pool(connection_id)
+        schema_cache.invalidate(connection_id)
         return conn
 
     def delete(self, connection_id: str) -> bool:
@@ -77,6 +121,8 @@ class ConnectionManager:
             return False
         self._db.delete(conn)
         self._db.commit()
+        invalidate_pool(connection_id)
+        schema_cache.invalidate(connection_id)
         return True
 
     # ------------------------------------------------------------------
@@ -84,32 +130,36 @@ class ConnectionManager:
     # ------------------------------------------------------------------
 
     def open_connector(self, connection_id: str) -> BaseConnector:
-        """Decrypt credentials and return a live connector instance."""
+        """Decrypt credentials and return a new, unpooled connector instance."""
         conn = self.get(connection_id)
         if not conn:
             raise ValueError(f"Connection {connection_id!r} not found")
+        return _connector_factory(conn)()
+
+    @contextmanager
+    def pooled_connector(
+        self, connection_id: str, block: bool = True
+    ) -> Iterator[BaseConnector | None]:
+        """Check out a read-only connector from the connection's pool.
+
+        The session is rolled back and returned to the pool on exit. Pools are
+        keyed by the record's ``updated_at`` so edits made by another worker
+        also retire stale sessions. With ``block=False`` yields None when the
+        pool is exhausted instead of waiting.
+        """
+        with self.connection_pool(connection_id).connection(block=block) as connector:
+            yield connector
 
-        password = decrypt(conn.encrypted_password)
+    def connection_pool(self, connection_id: str) -> ConnectorPool:
+        """Return the connector pool for a stored connection.
 
-        if conn.db_type == "postgresql":
-            return PostgreSQLConnector(
-                host=_resolve_host(conn.host),
-                port=conn.port,
-                database=conn.database,
-                user=conn.username,
-                password=password,
-                sslmode="require" if conn.ssl_enabled else "prefer",
-            )
-        elif conn.db_type == "mysql":
-            return MySQLConnector(
-                host=_resolve_host(conn.host),
-                port=conn.port,
-                database=conn.database,
-                user=conn.username,
-                password=password,
-            )
-        else:
-            raise ValueError(f"Unsupported db_type: {conn.db_type!r}")
+        The pool itself is thread-safe, so callers fanning work out across
+        threads can share it without touching this manager's DB session.
+        """
+        conn = self.get(connection_id)
+        if not conn:
+            raise ValueError(f"Connection {connection_id!r} not found")
+        return get_pool(conn.id, str(conn.updated_at), _connector_factory(conn))
 
     def open_raw_pg_connection(self, connection_id: str):
         """Open a raw psycopg2 connection WITHOUT read-only restriction.
@@ -136,8 +186,5 @@ class ConnectionManager:
         )
 
     def test_connection(self, connection_id: str) -> bool:
-        connector = self.open_connector(connection_id)
-        try:
+        with self.pooled_connector(connection_id) as connector:
             return connector.test_connection()
-        finally:
-            connector.close()
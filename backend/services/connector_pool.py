@@ -0,0 +1,294 @@
+"""Per-connection pools of pre-authenticated, read-only connector sessions."""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Iterator
+
+from connectors.base import BaseConnector
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no pooled session becomes free within the checkout timeout."""
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    waits: int = 0
+    creates: int = 0
+    discards: int = 0
+    evictions: int = 0
+    timeouts: int = 0
+
+
+class ConnectorPool:
+    """Thread-safe pool of live connectors for a single stored connection.
+
+    Sessions are created on demand up to ``max_size``; from the first
+    checkout on, the pool is topped up to ``min_size`` in the background.
+    Idle sessions older than ``idle_timeout_s`` are evicted (down to
+    ``min_size``), and every checkout runs a liveness check so a dropped
+    session is replaced transparently.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], BaseConnector],
+        min_size: int = 1,
+        max_size: int = 4,
+        idle_timeout_s: float = 300,
+        checkout_timeout_s: float = 10.0,
+    ) -> None:
+        self._factory = factory
+        self._min_size = max(0, min_size)
+        self._max_size = max(1, max_size)
+        self._idle_timeout_s = idle_timeout_s
+        self._checkout_timeout_s = checkout_timeout_s
+
+        self._cond = threading.Condition()
+        self._idle: deque[tuple[BaseConnector, float]] = deque()  # (connector, returned_at)
+        self._size = 0  # idle + checked out + being created
+        self._closed = False
+        self._warming = False
+        self.stats = PoolStats()
+
+    # ------------------------------------------------------------------
+    # Checkout / check-in
+    # ------------------------------------------------------------------
+
+    def acquire(self, block: bool = True) -> BaseConnector | None:
+        """Return a live connector, creating one if the pool has spare capacity.
+
+        With ``block=False`` returns None instead of waiting when the pool is
+        exhausted — used for optional helper sessions.
+        """
+        deadline = time.monotonic() + self._checkout_timeout_s
+        waited = False
+
+        while True:
+            self._evict_idle()
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Connector pool is closed")
+
+                connector = self._idle.pop()[0] if self._idle else None
+                if connector is None:
+                    if self._size < self._max_size:
+                        self._size += 1  # reserve the slot; connect outside the lock
+                    elif not block:
+                        return None
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.stats.timeouts += 1
+                            raise PoolTimeoutError(
+                                f"No pooled session available after {self._checkout_timeout_s}s"
+                            )
+                        if not waited:
+                            self.stats.waits += 1
+                            waited = True
+                        self._cond.wait(remaining)
+                        continue
+
+            if connector is None:
+                connector = self._create()
+            elif not self._is_alive(connector):
+                self._discard(connector)
+                continue
+
+            with self._cond:
+                self.stats.checkouts += 1
+            self._top_up()
+            return connector
+
+    def release(self, connector: BaseConnector, discard: bool = False) -> None:
+        """Return a connector to the pool, or close it if it is no longer reusable."""
+        if not discard:
+            try:
+                connector.reset()
+            except Exception as exc:
+                logger.warning("Discarding pooled session that failed to reset: %s", exc)
+                discard = True
+
+        with self._cond:
+            if not discard and not self._closed:
+                self._idle.append((connector, time.monotonic()))
+                self._cond.notify()
+                return
+
+        self._discard(connector)
+
+    @contextmanager
+    def connection(self, block: bool = True) -> Iterator[BaseConnector | None]:
+        connector = self.acquire(block=block)
+        try:
+            yield connector
+        finally:
+            if connector is not None:
+                self.release(connector)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def close(self) -> None:
+        """Close idle sessions now; checked-out sessions are closed on release."""
+        with self._cond:
+            self._closed = True
+            idle = [c for c, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for connector in idle:
+            connector.close()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "max_size": self._max_size,
+                **asdict(self.stats),
+            }
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _create(self) -> BaseConnector:
+        try:
+            connector = self._factory()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.stats.creates += 1
+        return connector
+
+    def _discard(self, connector: BaseConnector) -> None:
+        connector.close()
+        with self._cond:
+            self._size -= 1
+            self.stats.discards += 1
+            self._cond.notify()
+
+    @staticmethod
+    def _is_alive(connector: BaseConnector) -> bool:
+        if not connector.test_connection():
+            return False
+        try:
+            connector.reset()
+        except Exception:
+            return False
+        return True
+
+    def _evict_idle(self) -> None:
+        """Close sessions idle for longer than the timeout (oldest first).
+
+        Closing can block on the network, so it happens after the lock is released.
+        """
+        now = time.monotonic()
+        evicted: list[BaseConnector] = []
+        with self._cond:
+            while len(self._idle) > self._min_size:
+                connector, returned_at = self._idle[0]
+                if now - returned_at < self._idle_timeout_s:
+                    break
+                self._idle.popleft()
+                self._size -= 1
+                self.stats.evictions += 1
+                evicted.append(connector)
+        for connector in evicted:
+            connector.close()
+
+    def _top_up(self) -> None:
+        """Open sessions on a background thread until the pool holds ``min_size``."""
+        with self._cond:
+            if self._warming or self._closed or self._size >= self._min_size:
+                return
+            self._warming = True
+        threading.Thread(target=self._warm, name="connector-pool-warm", daemon=True).start()
+
+    def _warm(self) -> None:
+        try:
+            while True:
+                with self._cond:
+                    if self._closed or self._size >= self._min_size:
+                        return
+                    self._size += 1  # reserve the slot; connect outside the lock
+                try:
+                    connector = self._create()
+                except Exception as exc:
+                    logger.warning("Could not pre-warm pooled session: %s", exc)
+                    return
+                self.release(connector)
+        finally:
+            with self._cond:
+                self._warming = False
+
+
+# ── Registry (one pool per stored connection) ─────────────────────────────
+
+_registry_lock = threading.Lock()
+_pools: dict[str, tuple[str, ConnectorPool]] = {}  # connection_id → (version, pool)
+
+
+def get_pool(
+    connection_id: str,
+    version: str,
+    factory: Callable[[], BaseConnector],
+) -> ConnectorPool:
+    """Return the pool for a connection, replacing it if the record version changed."""
+    stale: ConnectorPool | None = None
+    with _registry_lock:
+        entry = _pools.get(connection_id)
+        if entry and entry[0] == version:
+            return entry[1]
+        if entry:
+            stale = entry[1]
+        pool = ConnectorPool(
+            factory,
+            min_size=settings.connector_pool_min_size,
+            max_size=settings.connector_pool_max_size,
+            idle_timeout_s=settings.connector_pool_idle_timeout_s,
+            checkout_timeout_s=settings.connector_pool_checkout_timeout_s,
+        )
+        _pools[connection_id] = (version, pool)
+    if stale:
+        stale.close()
+    return pool
+
+
+def invalidate_pool(connection_id: str) -> None:
+    """Drop and close the pool for a connection (after update or delete)."""
+    with _registry_lock:
+        entry = _pools.pop(connection_id, None)
+    if entry:
+        entry[1].close()
+        logger.info("Invalidated connector pool for connection %s", connection_id)
+
+
+def close_all_pools() -> None:
+    with _registry_lock:
+        entries = list(_pools.values())
+        _pools.clear()
+    for _, pool in entries:
+        pool.close()
+
+
+def pool_stats() -> dict[str, dict[str, Any]]:
+    """Return a snapshot of every live pool keyed by connection id."""
+    with _registry_lock:
+        entries = list(_pools.items())
+    return {cid: pool.snapshot() for cid, (_, pool) in entries}
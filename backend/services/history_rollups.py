@@ -0,0 +1,216 @@
+"""Daily dashboard rollups, maintained incrementally as analyses are recorded.
+
+``/analyze/stats`` reads these small per-day tables instead of re-parsing
+``QueryHistory.llm_response`` blobs, so its numbers cover all history at a
+cost proportional to the number of days, categories and tables.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from api.models.orm import (
+    DailyAnalysisRollup,
+    DailyCategoryRollup,
+    DailyTableRollup,
+    QueryHistory,
+    QueryTable,
+    Suggestion,
+)
+from api.models.schemas import (
+    AnalysisResult,
+    CategoryCount,
+    DashboardStats,
+    QueryByDate,
+    RecentAnalysis,
+    TableCount,
+)
+from core.database import day_bucket
+from services.query_history import SUGGESTION_CATEGORIES, query_tables
+
+logger = logging.getLogger(__name__)
+
+
+def record_analysis(db: Session, day: date, result: AnalysisResult, tables: list[str]) -> None:
+    """Fold one analysis into the rollups (caller commits with the history row)."""
+    categories = {c: len(getattr(result, c)) for c in SUGGESTION_CATEGORIES}
+    high = sum(
+        1 for c in SUGGESTION_CATEGORIES for item in getattr(result, c)
+        if (item.estimated_impact or "").lower() == "high"
+    )
+    _increment(db, DailyAnalysisRollup, {"day": day}, {
+        "analysis_count": 1,
+        "suggestion_count": sum(categories.values()),
+        "high_impact_count": high,
+    })
+    for category, count in categories.items():
+        if count:
+            _increment(db, DailyCategoryRollup, {"day": day, "category": category}, {"count": count})
+    for table in query_tables(result, tables):
+        _increment(db, DailyTableRollup, {"day": day, "table_name": table}, {"count": 1})
+
+
+def rebuild_rollups(db: Session) -> int:
+    """Populate empty rollups from existing history (first start after upgrade).
+
+    Aggregates server-side over ``query_history``, ``suggestions`` and
+    ``query_tables``, so it needs the fingerprint backfill and suggestion
+    index to have run first.
+    """
+    if db.query(DailyAnalysisRollup.day).first() is not None:
+        return 0
+
+    day = day_bucket(QueryHistory.created_at)
+    totals: dict[date, dict[str, int]] = {
+        d: {"analysis_count": n, "suggestion_count": s or 0, "high_impact_count": 0}
+        for d, n, s in (
+            db.query(day, func.count(QueryHistory.id), func.sum(QueryHistory.suggestion_count))
+            .filter(QueryHistory.created_at.isnot(None))
+            .group_by(day)
+        )
+    }
+    if not totals:
+        return 0
+
+    for d, high in (
+        db.query(day, func.count(Suggestion.id))
+        .join(QueryHistory, QueryHistory.id == Suggestion.query_id)
+        .filter(Suggestion.estimated_impact == "high", QueryHistory.created_at.isnot(None))
+        .group_by(day)
+    ):
+        totals[d]["high_impact_count"] = high
+    db.add_all(DailyAnalysisRollup(day=d, **counts) for d, counts in totals.items())
+
+    db.add_all(
+        DailyCategoryRollup(day=d, category=category, count=n)
+        for d, category, n in (
+            db.query(day, Suggestion.category, func.count(Suggestion.id))
+            .join(QueryHistory, QueryHistory.id == Suggestion.query_id)
+            .filter(QueryHistory.created_at.isnot(None))
+            .group_by(day, Suggestion.category)
+        )
+    )
+    db.add_all(
+        DailyTableRollup(day=d, table_name=table, count=n)
+        for d, table, n in (
+            db.query(day, QueryTable.table_name, func.count(QueryTable.query_id))
+            .join(QueryHistory, QueryHistory.id == QueryTable.query_id)
+            .filter(QueryHistory.created_at.isnot(None))
+            .group_by(day, QueryTable.table_name)
+        )
+    )
+    db.commit()
+
+    analyses = sum(c["analysis_count"] for c in totals.values())
+    logger.info("Rebuilt dashboard rollups from %d query history rows", analyses)
+    return analyses
+
+
+def dashboard_stats(db: Session, recent: int = 5, days: int = 30, top_tables: int = 5) -> DashboardStats:
+    totals = db.query(
+        func.coalesce(func.sum(DailyAnalysisRollup.analysis_count), 0),
+        func.coalesce(func.sum(DailyAnalysisRollup.suggestion_count), 0),
+        func.coalesce(func.sum(DailyAnalysisRollup.high_impact_count), 0),
+    ).one()
+
+    today = datetime.utcnow().date()
+    by_date = (
+        db.query(DailyAnalysisRollup.day, DailyAnalysisRollup.analysis_count)
+        .filter(DailyAnalysisRollup.day >= today - timedelta(days=days))
+        .order_by(DailyAnalysisRollup.day)
+        .all()
+    )
+
+    category_counts = dict.fromkeys(SUGGESTION_CATEGORIES, 0)
+    for category, count in (
+        db.query(DailyCategoryRollup.category, func.sum(DailyCategoryRollup.count))
+        .group_by(DailyCategoryRollup.category)
+    ):
+        category_counts[category] = count
+    top_categories = sorted(
+        (CategoryCount(category=k, count=v) for k, v in category_counts.items()),
+        key=lambda x: x.count,
+        reverse=True,
+    )
+
+    table_total = func.sum(DailyTableRollup.count)
+    most_analyzed_tables = [
+        TableCount(table_name=name, count=count)
+        for name, count in (
+            db.query(DailyTableRollup.table_name, table_total)
+            .group_by(DailyTableRollup.table_name)
+            .order_by(table_total.desc(), DailyTableRollup.table_name)
+            .limit(top_tables)
+        )
+    ]
+
+    recent_analyses = [
+        RecentAnalysis(
+            id=row.id,
+            sql_query=row.sql_query,
+            suggestion_count=row.suggestion_count or 0,
+            created_at=row.created_at,
+            llm_response=row.llm_response,
+        )
+        for row in db.query(QueryHistory).order_by(QueryHistory.created_at.desc()).limit(recent)
+    ]
+
+    return DashboardStats(
+        total_queries=totals[0],
+        total_suggestions=totals[1],
+        high_impact_count=totals[2],
+        streak_days=_streak(db, today),
+        top_categories=top_categories,
+        most_analyzed_tables=most_analyzed_tables,
+        queries_by_date=[QueryByDate(date=d.isoformat(), count=n) for d, n in by_date],
+        recent_analyses=recent_analyses,
+    )
+
+
+# ── Private helpers ──────────────────────────────────────────────────────────
+
+def _streak(db: Session, today: date) -> int:
+    """Consecutive days with analyses, counting back from today."""
+    streak = 0
+    expected = today
+    days = (
+        db.query(DailyAnalysisRollup.day)
+        .filter(DailyAnalysisRollup.day <= today, DailyAnalysisRollup.analysis_count > 0)
+        .order_by(DailyAnalysisRollup.day.desc())
+        .yield_per(64)
+    )
+    for (day,) in days:
+        if day != expected:
+            break
+        streak += 1
+        expected -= timedelta(days=1)
+    return streak
+
+
+def _increment(db: Session, model: Any, keys: dict[str, Any], increments: dict[str, int]) -> None:
+    """Atomic upsert-and-add on the dialects that support it, read-modify-write otherwise."""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        table = model.__table__
+        stmt = insert(table).values(**keys, **increments)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={col: table.c[col] + stmt.excluded[col] for col in increments},
+        )
+        db.execute(stmt)
+        return
+
+    row = db.get(model, tuple(keys.values()))
+    if row is None:
+        db.add(model(**keys, **increments))
+        db.flush()
+    else:
+        for col, value in increments.items():
+            setattr(row, col, getattr(row, col) + value)
@@ -0,0 +1,288 @@
+"""Bounded background worker pool for analyses, with job state in the internal DB."""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from api.models.orm import AnalysisJob
+from core.concurrency import run_db_work
+from core.config import settings
+from core.database import SessionLocal
+from services.llm_scheduler import Priority, llm_priority
+
+logger = logging.getLogger(__name__)
+
+# Receives a session owned by the worker; returns the result to store
+JobRunner = Callable[[Session], Awaitable[BaseModel]]
+
+_FINISHED = ("succeeded", "failed", "cancelled")
+_UNFINISHED = ("queued", "running")
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the local job queue already holds ``max_queue`` live (not cancelled) jobs."""
+
+
+@dataclass
+class JobQueueStats:
+    submitted: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    started: int = 0
+    total_wait_s: float = 0.0
+    max_wait_s: float = 0.0
+
+
+class AnalysisJobQueue:
+    """Runs submitted analyses on ``workers`` asyncio worker tasks.
+
+    The queue itself lives in this process, but every state transition is
+    written to the ``analysis_jobs`` table, so any API worker can report on
+    (or cancel) any job. Workers are started lazily on the running event loop.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self._workers = max(1, workers)
+        self._max_queue = max_queue
+        self._session_factory = session_factory
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[tuple[str, JobRunner]] | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._queued: set[str] = set()
+        self._running: set[str] = set()
+        self.stats = JobQueueStats()
+
+    # ------------------------------------------------------------------
+    # Submission / cancellation
+    # ------------------------------------------------------------------
+
+    async def submit(self, db: Session, runner: JobRunner) -> AnalysisJob:
+        """Record a queued job and hand it to the workers."""
+        queue = self._ensure_workers()
+        # Jobs cancelled by another API worker stay in our queue until a worker skips them
+        if len(self._queued) >= self._max_queue and (
+            await run_db_work(self._live_count, db, list(self._queued)) >= self._max_queue
+        ):
+            raise QueueFullError(f"Analysis queue is full ({self._max_queue} jobs waiting)")
+        job = await run_db_work(self._create_job, db)
+        queue.put_nowait((job.id, runner))
+        self._queued.add(job.id)
+        self.stats.submitted += 1
+        return job
+
+    def cancel(self, db: Session, job_id: str) -> AnalysisJob | None:
+        """Cancel a queued job. Running and finished jobs are returned unchanged."""
+        updated = (
+            db.query(AnalysisJob)
+            .filter(AnalysisJob.id == job_id, AnalysisJob.status == "queued")
+            .update({"status": "cancelled", "finished_at": datetime.utcnow()}, synchronize_session=False)
+        )
+        db.commit()
+        if updated:
+            self.stats.cancelled += 1
+            self._queued.discard(job_id)
+        return db.get(AnalysisJob, job_id)
+
+    # ------------------------------------------------------------------
+    # Metrics / lifecycle
+    # ------------------------------------------------------------------
+
+    def snapshot(self, db: Session) -> dict[str, Any]:
+        totals = dict(
+            db.query(AnalysisJob.status, func.count(AnalysisJob.id))
+            .filter(AnalysisJob.status.in_(_UNFINISHED))
+            .group_by(AnalysisJob.status)
+            .all()
+        )
+        started = self.stats.started
+        return {
+            "workers": self._workers,
+            "queue_depth": self._live_count(db, list(self._queued)) if self._queued else 0,
+            "running": len(self._running),
+            "queued_total": totals.get("queued", 0),
+            "running_total": totals.get("running", 0),
+            "submitted": self.stats.submitted,
+            "succeeded": self.stats.succeeded,
+            "failed": self.stats.failed,
+            "cancelled": self.stats.cancelled,
+            "avg_wait_ms": (self.stats.total_wait_s / started * 1000) if started else 0.0,
+            "max_wait_ms": self.stats.max_wait_s * 1000,
+        }
+
+    def recover(self, db: Session) -> int:
+        """Fail jobs orphaned by a crash or restart (run at startup); returns how many."""
+        failed = self._fail_stale(db, datetime.utcnow())
+        db.commit()
+        if failed:
+            logger.warning("Failed %d background job(s) orphaned by a previous run", failed)
+        return failed
+
+    async def shutdown(self) -> None:
+        """Stop the workers and fail jobs that will never run in this process."""
+        pending: list[str] = list(self._running)
+        if self._queue is not None:
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait()[0])
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks, self._queue, self._loop = [], None, None
+        self._queued.clear()
+        self._running.clear()
+
+        if pending:
+            db = self._session_factory()
+            try:
+                db.query(AnalysisJob).filter(
+                    AnalysisJob.id.in_(pending), AnalysisJob.status.in_(_UNFINISHED)
+                ).update(
+                    {"status": "failed", "error": "Server shut down before the job finished",
+                     "finished_at": datetime.utcnow()},
+                    synchronize_session=False,
+                )
+                db.commit()
+            finally:
+                db.close()
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _ensure_workers(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._queue is None:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._queued.clear()
+            self._running.clear()
+            self._tasks = [loop.create_task(self._worker()) for _ in range(self._workers)]
+        return self._queue
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            job_id, runner = await queue.get()
+            self._queued.discard(job_id)
+            try:
+                await self._run(job_id, runner)
+            except Exception:
+                logger.exception("Background job %s crashed", job_id)
+            finally:
+                queue.task_done()
+
+    async def _run(self, job_id: str, runner: JobRunner) -> None:
+        db = self._session_factory()
+        try:
+            wait_s = await run_db_work(self._mark_running, db, job_id)
+            if wait_s is None:
+                return  # cancelled while queued
+            self.stats.started += 1
+            self.stats.total_wait_s += wait_s
+            self.stats.max_wait_s = max(self.stats.max_wait_s, wait_s)
+
+            self._running.add(job_id)
+            try:
+                # Background jobs queue behind interactive analyses for LLM quota
+                with llm_priority(Priority.BATCH):
+                    result = await runner(db)
+            except Exception as exc:
+                logger.warning("Background job %s failed: %s", job_id, exc)
+                self.stats.failed += 1
+                await run_db_work(db.rollback)
+                error = getattr(exc, "detail", None) or str(exc)
+                await run_db_work(self._finish, db, job_id, "failed", None, str(error))
+            else:
+                self.stats.succeeded += 1
+                await run_db_work(self._finish, db, job_id, "succeeded", result.model_dump_json(), None)
+            finally:
+                self._running.discard(job_id)
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------------
+    # DB state transitions (run on DB worker threads)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _create_job(db: Session) -> AnalysisJob:
+        now = datetime.utcnow()
+        db.query(AnalysisJob).filter(
+            AnalysisJob.status.in_(_FINISHED),
+            AnalysisJob.finished_at < now - timedelta(seconds=settings.analysis_job_retention_s),
+        ).delete(synchronize_session=False)
+        job = AnalysisJob(status="queued", created_at=now)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def _fail_stale(db: Session, now: datetime) -> int:
+        """Fail queued / running rows past ``analysis_job_stale_after_s`` (not committed).
+
+        The queue lives in a worker's memory, so a job whose worker crashed or
+        restarted is never picked up or finished by anyone else.
+        """
+        cutoff = now - timedelta(seconds=settings.analysis_job_stale_after_s)
+        return (
+            db.query(AnalysisJob)
+            .filter(
+                ((AnalysisJob.status == "queued") & (AnalysisJob.created_at < cutoff))
+                | ((AnalysisJob.status == "running") & (AnalysisJob.started_at < cutoff))
+            )
+            .update(
+                {"status": "failed", "error": "Job was orphaned by a server restart", "finished_at": now},
+                synchronize_session=False,
+            )
+        )
+
+    @staticmethod
+    def _live_count(db: Session, job_ids: list[str]) -> int:
+        """How many of ``job_ids`` are still queued (not cancelled meanwhile)."""
+        return (
+            db.query(func.count(AnalysisJob.id))
+            .filter(AnalysisJob.id.in_(job_ids), AnalysisJob.status == "queued")
+            .scalar()
+        )
+
+    @staticmethod
+    def _mark_running(db: Session, job_id: str) -> float | None:
+        """Claim a queued job; returns its queue wait in seconds, or None if it was cancelled."""
+        now = datetime.utcnow()
+        claimed = (
+            db.query(AnalysisJob)
+            .filter(AnalysisJob.id == job_id, AnalysisJob.status == "queued")
+            .update({"status": "running", "started_at": now}, synchronize_session=False)
+        )
+        db.commit()
+        if not claimed:
+            return None
+        created_at = db.query(AnalysisJob.created_at).filter(AnalysisJob.id == job_id).scalar()
+        return max(0.0, (now - created_at).total_seconds()) if created_at else 0.0
+
+    @staticmethod
+    def _finish(db: Session, job_id: str, status: str, result_json: str | None, error: str | None) -> None:
+        # Only a job we still own as running; recover() may have failed it meanwhile
+        db.query(AnalysisJob).filter(AnalysisJob.id == job_id, AnalysisJob.status == "running").update(
+            {"status": status, "result_json": result_json, "error": error, "finished_at": datetime.utcnow()},
+            synchronize_session=False,
+        )
+        db.commit()
+
+
+analysis_jobs = AnalysisJobQueue(
+    workers=settings.analysis_job_workers,
+    max_queue=settings.analysis_job_max_queue,
+)
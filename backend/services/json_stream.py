@@ -0,0 +1,104 @@
+"""Incremental parser that surfaces completed analysis items while the LLM is still writing."""
+
+import json
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisStreamParser:
+    """Feed raw LLM text chunks; get back events for every finished top-level item.
+
+    Understands just enough JSON to track nesting and strings. Anything before
+    the root ``{`` (e.g. a markdown fence) is skipped. Events are tuples:
+
+    - ``("summary", str)`` once the top-level ``summary`` string is closed
+    - ``(section, dict)`` for each object closed inside a top-level array,
+      e.g. ``("indexes", {...})``
+    """
+
+    def __init__(self) -> None:
+        self._pos = 0  # absolute offset of the next unread character
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._item_start = -1
+        self._last_key: str | None = None
+        self._awaiting_value = False
+        self._section: str | None = None
+        self._text = ""
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        self._text += chunk
+        events: list[tuple[str, Any]] = []
+        text = self._text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._on_root_string(text[self._string_start:i + 1], events)
+                continue
+
+            if ch == '"':
+                if self._depth > 0:
+                    self._in_string = True
+                    self._string_start = i
+            elif ch in "{[":
+                if self._depth == 0 and ch != "{":
+                    continue
+                if self._depth == 1 and ch == "[":
+                    self._section = self._last_key
+                    self._awaiting_value = False
+                elif self._depth == 2 and ch == "{" and self._section:
+                    self._item_start = i
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 0:
+                    continue
+                self._depth -= 1
+                if self._depth == 2 and ch == "}" and self._item_start >= 0:
+                    self._emit_item(text[self._item_start:i + 1], events)
+                    self._item_start = -1
+                elif self._depth == 1 and ch == "]":
+                    self._section = None
+            elif self._depth == 1:
+                if ch == ":":
+                    self._awaiting_value = True
+                elif ch == ",":
+                    self._awaiting_value = False
+        self._pos = len(text)
+        return events
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far (the full raw response once the stream ends)."""
+        return self._text
+
+    def _on_root_string(self, literal: str, events: list[tuple[str, Any]]) -> None:
+        try:
+            value = json.loads(literal)
+        except json.JSONDecodeError:
+            return
+        if self._awaiting_value:
+            self._awaiting_value = False
+            if self._last_key == "summary":
+                events.append(("summary", value))
+        else:
+            self._last_key = value
+
+    def _emit_item(self, literal: str, events: list[tuple[str, Any]]) -> None:
+        try:
+            item = json.loads(literal)
+        except json.JSONDecodeError as exc:
+            logger.debug("Skipping unparseable streamed item in %s: %s", self._section, exc)
+            return
+        if isinstance(item, dict):
+            events.append((self._section, item))
@@ -3,11 +3,16 @@
 import json
 import logging
 import re
+from functools import partial
+from typing import Any, AsyncIterator
 
 from api.models.schemas import AnalysisResult, ConfigurationItem, SuggestionItem
 from core.config import settings
 from services.llm_providers import get_provider
-from services.llm_providers.base import BaseLLMProvider
+from services.json_stream import AnalysisStreamParser
+from services.llm_health import tracked_agenerate, tracked_generate
+from services.llm_scheduler import llm_scheduler
+from services.llm_providers.base import BaseLLMProvider, responder_scope
 from services.prompt_builder import PromptBuilder
 from services.query_introspector import QueryIntrospectionResult
 
@@ -58,6 +63,39 @@ def _parse_configuration_list(raw: list) -> list[ConfigurationItem]:
     return items
 
 
+# Top-level keys of the response schema that hold suggestion lists
+_SUGGESTION_SECTIONS = ("bottlenecks", "indexes", "statistics", "rewrites", "materialized_views")
+
+
+def parse_stream_item(section: str, entry: dict) -> SuggestionItem | ConfigurationItem | None:
+    """Convert one streamed list entry into its schema model (None for unknown sections)."""
+    if section == "configuration":
+        items = _parse_configuration_list([entry])
+    elif section in _SUGGESTION_SECTIONS:
+        items = _parse_suggestion_list([entry])
+    else:
+        return None
+    return items[0] if items else None
+
+
+def _strip_fence(raw_text: str) -> str:
+    fence_match = _FENCE_RE.match(raw_text)
+    return fence_match.group(1).strip() if fence_match else raw_text
+
+
+def _answered_by(responders: list[BaseLLMProvider], model_label: str) -> str:
+    """Model of the provider a composite reported as answering, else the requested one."""
+    return getattr(responders[-1], "_model", None) or model_label if responders else model_label
+
+
+def looks_like_json(raw_text: str | None) -> bool:
+    """True if the response (optionally fenced) parses as a JSON object."""
+    try:
+        return isinstance(json.loads(_strip_fence((raw_text or "").strip())), dict)
+    except ValueError:
+        return False
+
+
 class LLMAnalyzer:
     _instance: "LLMAnalyzer | None" = None
 
@@ -74,8 +112,83 @@ class LLMAnalyzer:
         query_id: str,
         provider_override: BaseLLMProvider | None = None,
     ) -> AnalysisResult:
+        provider, model_label, system_prompt, user_message = self._prepare(
+            introspection, query_id, provider_override
+        )
+        generate = provider.generate if getattr(provider, "tracks_latency", False) else partial(
+            tracked_generate, provider
+        )
+        with responder_scope() as responders:
+            raw_text = generate(
+                system_prompt=system_prompt,
+                user_message=user_message,
+                max_tokens=settings.llm_max_tokens,
+            )
+        return self._parse(raw_text, introspection, query_id, _answered_by(responders, model_label))
+
+    async def aanalyze(
+        self,
+        introspection: QueryIntrospectionResult,
+        query_id: str,
+        provider_override: BaseLLMProvider | None = None,
+    ) -> AnalysisResult:
+        """Async analyze(): awaits the provider instead of holding a thread."""
+        provider, model_label, system_prompt, user_message = self._prepare(
+            introspection, query_id, provider_override
+        )
+        # Hedged / routed providers record each underlying call themselves
+        agenerate = provider.agenerate if getattr(provider, "tracks_latency", False) else partial(
+            tracked_agenerate, provider
+        )
+        with responder_scope() as responders:
+            raw_text = await agenerate(
+                system_prompt=system_prompt,
+                user_message=user_message,
+                max_tokens=settings.llm_max_tokens,
+            )
+        return self._parse(raw_text, introspection, query_id, _answered_by(responders, model_label))
+
+    async def astream(
+        self,
+        introspection: QueryIntrospectionResult,
+        query_id: str,
+        provider_override: BaseLLMProvider | None = None,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """Streaming analyze(): yields ``("summary", str)`` and ``(section, item)``
+        events as the model closes them, then ``("result", AnalysisResult)``."""
+        provider, model_label, system_prompt, user_message = self._prepare(
+            introspection, query_id, provider_override
+        )
+        if not getattr(provider, "tracks_latency", False):
+            await llm_scheduler.admit(provider, system_prompt, user_message, settings.llm_max_tokens)
+        parser = AnalysisStreamParser()
+        with responder_scope() as responders:
+            async for chunk in provider.astream(
+                system_prompt=system_prompt,
+                user_message=user_message,
+                max_tokens=settings.llm_max_tokens,
+            ):
+                for section, value in parser.feed(chunk):
+                    if section == "summary":
+                        yield section, value
+                        continue
+                    item = parse_stream_item(section, value)
+                    if item is not None:
+                        yield section, item
+        yield "result", self._parse(parser.text, introspection, query_id, _answered_by(responders, model_label))
+
+    def model_label(self, provider_override: BaseLLMProvider | None = None) -> str:
+        """Model id the analysis will run on (used in cache keys and logs)."""
+        return getattr(provider_override or self._provider, "_model", settings.llm_model)
+
+    def _prepare(
+        self,
+        introspection: QueryIntrospectionResult,
+        query_id: str,
+        provider_override: BaseLLMProvider | None,
+    ) -> tuple[BaseLLMProvider, str, str, str]:
         provider = provider_override or self._provider
-        model_label = getattr(provider, "_model", settings.llm_model)
+        model_label = self.model_label(provider_override)
         system_prompt, user_message = self._prompt_builder.build(introspection)
 
         logger.info(
@@ -84,14 +197,16 @@ class LLMAnalyzer:
             model_label,
             provider_override is not None,
         )
-        raw_text = (
-            provider.generate(
-                system_prompt=system_prompt,
-                user_message=user_message,
-                max_tokens=settings.llm_max_tokens,
-            )
-            or ""
-        ).strip()
+        return provider, model_label, system_prompt, user_message
+
+    def _parse(
+        self,
+        raw_text: str | None,
+        introspection: QueryIntrospectionResult,
+        query_id: str,
+        model_label: str,
+    ) -> AnalysisResult:
+        raw_text = (raw_text or "").strip()
 
         logger.debug("Raw LLM response: %s", raw_text[:500] if raw_text else "(empty)")
 
@@ -105,12 +220,12 @@ class LLMAnalyzer:
                 bottlenecks=[],
                 explain_plan=introspection.explain.raw_plan if introspection.explain else None,
                 tables_analyzed=introspection.table_names,
+                model=model_label,
+                degraded=True,
             )
 
         # Strip markdown fences if present
-        fence_match = _FENCE_RE.match(raw_text)
-        if fence_match:
-            raw_text = fence_match.group(1).strip()
+        raw_text = _strip_fence(raw_text)
 
         try:
             data = json.loads(raw_text)
@@ -128,6 +243,8 @@ class LLMAnalyzer:
                 ],
                 explain_plan=introspection.explain.raw_plan if introspection.explain else None,
                 tables_analyzed=introspection.table_names,
+                model=model_label,
+                degraded=True,
             )
 
         return AnalysisResult(
@@ -141,4 +258,5 @@ class LLMAnalyzer:
             configuration=_parse_configuration_list(data.get("configuration", [])),
             explain_plan=introspection.explain.raw_plan if introspection.explain else None,
             tables_analyzed=introspection.table_names,
+            model=model_label,
         )
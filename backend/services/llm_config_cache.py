@@ -0,0 +1,80 @@
+"""Per-process cache of the stored LLMConfig rows with their decrypted API keys."""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy.orm import Session
+
+from api.models.orm import LLMConfig
+from core.config import settings
+from core.encryption import decrypt
+from services.llm_providers import clear_provider_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ActiveLLMConfig:
+    config_id: str
+    provider: str
+    api_key: str
+    model: str | None = None
+
+
+_lock = threading.Lock()
+_cached: ActiveLLMConfig | None = None
+_standby: list[ActiveLLMConfig] = []  # inactive rows, usable as hedge targets
+_loaded_at: float | None = None  # None = nothing cached yet
+
+
+def get_active_config(db: Session) -> ActiveLLMConfig | None:
+    """Return the active config, hitting SQLite + Fernet at most once per TTL.
+
+    Edits made through this worker invalidate the cache immediately; the TTL
+    bounds staleness for edits made through other workers.
+    """
+    return _load(db)[0]
+
+
+def get_standby_configs(db: Session) -> list[ActiveLLMConfig]:
+    """Stored configs other than the active one, oldest first (same cache as above)."""
+    return list(_load(db)[1])
+
+
+def _load(db: Session) -> tuple[ActiveLLMConfig | None, list[ActiveLLMConfig]]:
+    global _cached, _standby, _loaded_at
+    with _lock:
+        if _loaded_at is not None and time.monotonic() - _loaded_at < settings.llm_config_cache_ttl_s:
+            return _cached, _standby
+
+    active: ActiveLLMConfig | None = None
+    standby: list[ActiveLLMConfig] = []
+    for row in db.query(LLMConfig).order_by(LLMConfig.created_at):
+        try:
+            config = ActiveLLMConfig(
+                config_id=row.id,
+                provider=row.provider,
+                api_key=decrypt(row.encrypted_api_key),
+                model=row.model,
+            )
+        except ValueError as exc:
+            logger.warning("Failed to decrypt LLM config %s: %s", row.id, exc)
+            continue
+        if row.is_active and active is None:
+            active = config
+        else:
+            standby.append(config)
+
+    with _lock:
+        _cached, _standby, _loaded_at = active, standby, time.monotonic()
+    return active, standby
+
+
+def invalidate_active_config() -> None:
+    """Forget the cached config and the provider clients built from it."""
+    global _cached, _standby, _loaded_at
+    with _lock:
+        _cached, _standby, _loaded_at = None, [], None
+    clear_provider_cache()
@@ -0,0 +1,195 @@
+"""Per-provider/model health: outcome history, circuit breakers and routing order.
+
+Latency lives in ``services.llm_latency``; this module adds error and
+empty-response rates and a breaker per label. ``tracked_agenerate`` is the
+one place calls are scheduled and measured, so every routed, hedged or
+plain analysis feeds the same statistics.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Literal, Sequence
+
+from core.config import settings
+from services.llm_latency import llm_latency, provider_label
+from services.llm_providers.base import BaseLLMProvider
+from services.llm_scheduler import llm_scheduler
+
+logger = logging.getLogger(__name__)
+
+Outcome = Literal["ok", "error", "empty"]
+BreakerState = Literal["closed", "open", "half_open"]
+
+# Calls needed in the window before the failure rate can open a circuit
+_MIN_CALLS_FOR_RATE = 10
+
+
+@dataclass
+class _Health:
+    outcomes: deque[Outcome]
+    consecutive_failures: int = 0
+    state: BreakerState = "closed"
+    opened_at: float = 0.0
+    probe_in_flight: bool = False
+    last_error: str | None = None
+
+
+class ProviderHealthRegistry:
+    """Thread-safe outcome history and breaker per provider label."""
+
+    def __init__(self, window: int) -> None:
+        self._window = max(1, window)
+        self._health: dict[str, _Health] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, label: str) -> _Health:
+        health = self._health.get(label)
+        if health is None:
+            health = self._health[label] = _Health(outcomes=deque(maxlen=self._window))
+        return health
+
+    # ------------------------------------------------------------------
+    # Breaker
+    # ------------------------------------------------------------------
+
+    def allow(self, label: str) -> bool:
+        """Whether a call may go to ``label`` now (claims the probe when half-open)."""
+        with self._lock:
+            health = self._get(label)
+            if health.state == "closed":
+                return True
+            if health.state == "open" and time.monotonic() - health.opened_at >= settings.llm_breaker_cooldown_s:
+                health.state = "half_open"
+            if health.state == "half_open" and not health.probe_in_flight:
+                health.probe_in_flight = True
+                return True
+            return False
+
+    def release(self, label: str) -> None:
+        """Give back a probe claimed by ``allow`` whose call ended without an outcome (cancelled)."""
+        with self._lock:
+            self._get(label).probe_in_flight = False
+
+    def is_available(self, label: str) -> bool:
+        """Non-claiming variant of ``allow`` for ranking."""
+        with self._lock:
+            health = self._get(label)
+            if health.state == "closed":
+                return True
+            cooled = time.monotonic() - health.opened_at >= settings.llm_breaker_cooldown_s
+            return cooled and not health.probe_in_flight
+
+    def record(self, label: str, outcome: Outcome, error: str | None = None) -> None:
+        with self._lock:
+            health = self._get(label)
+            health.outcomes.append(outcome)
+            health.probe_in_flight = False
+            if outcome == "ok":
+                health.consecutive_failures = 0
+                if health.state != "closed":
+                    logger.info("LLM provider %s recovered — circuit closed", label)
+                health.state = "closed"
+                return
+
+            health.consecutive_failures += 1
+            health.last_error = error or "empty response"
+            failures = sum(1 for o in health.outcomes if o != "ok")
+            tripped = (
+                health.state == "half_open"
+                or health.consecutive_failures >= settings.llm_breaker_failure_threshold
+                or (
+                    len(health.outcomes) >= _MIN_CALLS_FOR_RATE
+                    and failures / len(health.outcomes) >= settings.llm_breaker_error_rate
+                )
+            )
+            if tripped:
+                if health.state != "open":
+                    logger.warning("LLM provider %s unhealthy (%s) — circuit opened", label, health.last_error)
+                health.state = "open"
+                health.opened_at = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Routing / reporting
+    # ------------------------------------------------------------------
+
+    def rank(self, providers: Sequence[BaseLLMProvider]) -> list[BaseLLMProvider]:
+        """Available providers fastest first (unknown latency keeps configured order),
+        then providers with open circuits, longest-open first."""
+        def speed(item: tuple[int, BaseLLMProvider]) -> tuple[float, int]:
+            index, provider = item
+            p50 = llm_latency.quantile(provider_label(provider), 0.5)
+            return (p50 if p50 is not None else math.inf, index)
+
+        indexed = list(enumerate(providers))
+        available = [i for i in indexed if self.is_available(provider_label(i[1]))]
+        blocked = [i for i in indexed if i not in available]
+        with self._lock:
+            blocked.sort(key=lambda i: self._get(provider_label(i[1])).opened_at)
+        return [p for _, p in sorted(available, key=speed)] + [p for _, p in blocked]
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            out = {}
+            for label, health in self._health.items():
+                calls = len(health.outcomes)
+                out[label] = {
+                    "calls": calls,
+                    "error_rate": health.outcomes.count("error") / calls if calls else 0.0,
+                    "empty_rate": health.outcomes.count("empty") / calls if calls else 0.0,
+                    "state": health.state,
+                    "consecutive_failures": health.consecutive_failures,
+                    "last_error": health.last_error,
+                }
+            return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._health.clear()
+
+
+llm_health = ProviderHealthRegistry(settings.llm_health_window)
+
+
+def record_outcome(label: str, seconds: float, text: str | None) -> None:
+    """Record a completed call: latency and "ok" if it produced text, else "empty"."""
+    if (text or "").strip():
+        llm_latency.record(label, seconds)
+        llm_health.record(label, "ok")
+    else:
+        llm_health.record(label, "empty")
+
+
+async def tracked_agenerate(
+    provider: BaseLLMProvider, system_prompt: str, user_message: str, max_tokens: int
+) -> str:
+    """``provider.agenerate`` through the scheduler, with its latency and outcome recorded."""
+    label = provider_label(provider)
+    try:
+        text, seconds = await llm_scheduler.call(
+            provider, system_prompt, user_message, max_tokens,
+            lambda: provider.agenerate(system_prompt, user_message, max_tokens),
+        )
+    except Exception as exc:
+        llm_health.record(label, "error", f"{type(exc).__name__}: {exc}")
+        raise
+    record_outcome(label, seconds, text)
+    return text
+
+
+def tracked_generate(provider: BaseLLMProvider, system_prompt: str, user_message: str, max_tokens: int) -> str:
+    """Blocking variant of ``tracked_agenerate``."""
+    label = provider_label(provider)
+    try:
+        text, seconds = llm_scheduler.call_sync(
+            provider, system_prompt, user_message, max_tokens,
+            lambda: provider.generate(system_prompt, user_message, max_tokens),
+        )
+    except Exception as exc:
+        llm_health.record(label, "error", f"{type(exc).__name__}: {exc}")
+        raise
+    record_outcome(label, seconds, text)
+    return text
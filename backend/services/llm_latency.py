@@ -0,0 +1,76 @@
+"""Rolling per-provider/model latency history for LLM calls."""
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from core.config import settings
+
+
+def provider_label(provider: Any) -> str:
+    """Stable "provider/model" key for a provider instance."""
+    return getattr(provider, "label", None) or f"{type(provider).__name__}/{getattr(provider, '_model', '?')}"
+
+
+class LatencyHistory:
+    """The last ``window`` successful call durations per label (thread-safe)."""
+
+    def __init__(self, window: int) -> None:
+        self._window = max(1, window)
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, label: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(label)
+            if samples is None:
+                samples = self._samples[label] = deque(maxlen=self._window)
+            samples.append(seconds)
+
+    @contextmanager
+    def measure(self, label: str) -> Iterator[None]:
+        """Record the duration of the block if it completes without raising."""
+        started = time.monotonic()
+        yield
+        self.record(label, time.monotonic() - started)
+
+    def quantile(self, label: str, q: float, min_samples: int = 1) -> float | None:
+        """Nearest-rank ``q`` quantile, or None with fewer than ``min_samples`` samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(label, ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        rank = min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))
+        return samples[rank]
+
+    def snapshot(self) -> dict[str, dict[str, float | int]]:
+        with self._lock:
+            labels = list(self._samples)
+        out: dict[str, dict[str, float | int]] = {}
+        for label in labels:
+            with self._lock:
+                count = len(self._samples[label])
+            out[label] = {
+                "samples": count,
+                "p50_s": self.quantile(label, 0.5) or 0.0,
+                "p90_s": self.quantile(label, 0.9) or 0.0,
+                "p99_s": self.quantile(label, 0.99) or 0.0,
+            }
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+def hedge_delay(label: str) -> float:
+    """Seconds to wait on ``label`` before hedging: its configured latency quantile."""
+    observed = llm_latency.quantile(label, settings.llm_hedge_quantile, settings.llm_hedge_min_samples)
+    delay = observed if observed is not None else settings.llm_hedge_initial_delay_s
+    return max(settings.llm_hedge_min_delay_s, delay)
+
+
+llm_latency = LatencyHistory(settings.llm_latency_window)
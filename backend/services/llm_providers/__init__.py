@@ -1,8 +1,18 @@
 """LLM provider factory — import get_provider() to obtain the active provider."""
 
+import hashlib
+import threading
+from collections import OrderedDict
+
 from core.config import settings
 from services.llm_providers.base import BaseLLMProvider
 
+# Long-lived providers keyed by (provider, api-key fingerprint, model), so the
+# SDK clients — and their HTTP keep-alive pools — are reused across requests.
+_MAX_CACHED_PROVIDERS = 32
+_provider_cache: OrderedDict[tuple[str, str, str], BaseLLMProvider] = OrderedDict()
+_provider_cache_lock = threading.Lock()
+
 # Base URLs for OpenAI-compatible providers (None = use the SDK default, i.e. official OpenAI)
 _OPENAI_COMPATIBLE_URLS: dict[str, str | None] = {
     "openai":     None,
@@ -23,13 +33,43 @@ def get_provider(
 ) -> BaseLLMProvider:
     """Return an LLM provider instance.
 
-    When called with explicit arguments, creates a provider using those
-    credentials. When called without arguments, falls back to the
-    global settings from .env.
+    When called with explicit arguments, uses those credentials. When called
+    without arguments, falls back to the global settings from .env. Instances
+    are cached per (provider, api key, model) and shared between callers.
     """
     name = (provider_name or settings.llm_provider).lower()
     resolved_model = model or settings.llm_model
+    key = (name, _fingerprint(api_key or ""), resolved_model)
+
+    with _provider_cache_lock:
+        provider = _provider_cache.get(key)
+        if provider is not None:
+            _provider_cache.move_to_end(key)
+            return provider
+
+    provider = _build_provider(name, api_key, resolved_model)
+    provider.label = f"{name}/{resolved_model}"
+    provider.quota_key = f"{name}:{key[1]}"
+
+    with _provider_cache_lock:
+        provider = _provider_cache.setdefault(key, provider)
+        _provider_cache.move_to_end(key)
+        while len(_provider_cache) > _MAX_CACHED_PROVIDERS:
+            _provider_cache.popitem(last=False)
+    return provider
+
+
+def clear_provider_cache() -> None:
+    """Drop cached provider clients (after LLM settings change)."""
+    with _provider_cache_lock:
+        _provider_cache.clear()
+
+
+def _fingerprint(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
 
+def _build_provider(name: str, api_key: str | None, resolved_model: str) -> BaseLLMProvider:
     # Anthropic — uses its own SDK
     if name == "anthropic":
         from services.llm_providers.anthropic_provider import AnthropicProvider
@@ -1,20 +1,72 @@
 """Anthropic Claude provider using the anthropic SDK."""
 
-from anthropic import Anthropic
+from typing import Any, AsyncIterator
 
+from anthropic import Anthropic, AsyncAnthropic
+
+from core.config import settings
 from services.llm_providers.base import BaseLLMProvider
+from services.prompt_builder import split_cacheable_prefix
+
+_EPHEMERAL = {"type": "ephemeral"}
+
+
+def _usage(message) -> dict[str, int]:
+    usage = getattr(message, "usage", None)
+    if usage is None:
+        return {}
+    cached = getattr(usage, "cache_read_input_tokens", None) or 0
+    written = getattr(usage, "cache_creation_input_tokens", None) or 0
+    return {
+        # Anthropic's input_tokens excludes the cached / cache-write parts
+        "input_tokens": (usage.input_tokens or 0) + cached + written,
+        "output_tokens": usage.output_tokens or 0,
+        "cached_tokens": cached,
+        "cache_write_tokens": written,
+    }
 
 
 class AnthropicProvider(BaseLLMProvider):
     def __init__(self, api_key: str, model: str) -> None:
-        self._client = Anthropic(api_key=api_key)
+        self._client = Anthropic(api_key=api_key, max_retries=settings.llm_sdk_max_retries)
+        self._async_client = AsyncAnthropic(api_key=api_key, max_retries=settings.llm_sdk_max_retries)
         self._model = model
 
+    def _request(self, system_prompt: str, user_message: str, max_tokens: int) -> dict[str, Any]:
+        """Messages API arguments, with cache breakpoints after the system prompt
+        and after the schema prefix of the user message."""
+        if not settings.llm_prompt_caching:
+            return {
+                "model": self._model,
+                "max_tokens": max_tokens,
+                "system": system_prompt,
+                "messages": [{"role": "user", "content": user_message}],
+            }
+        prefix, rest = split_cacheable_prefix(user_message)
+        content = [{"type": "text", "text": rest}]
+        if prefix:
+            content.insert(0, {"type": "text", "text": prefix, "cache_control": _EPHEMERAL})
+        return {
+            "model": self._model,
+            "max_tokens": max_tokens,
+            "system": [{"type": "text", "text": system_prompt, "cache_control": _EPHEMERAL}],
+            "messages": [{"role": "user", "content": content}],
+        }
+
     def generate(self, system_prompt: str, user_message: str, max_tokens: int) -> str:
-        message = self._client.messages.create(
-            model=self._model,
-            max_tokens=max_tokens,
-            system=system_prompt,
-            messages=[{"role": "user", "content": user_message}],
-        )
+        message = self._client.messages.create(**self._request(system_prompt, user_message, max_tokens))
+        self._record_usage(_usage(message))
+        return message.content[0].text
+
+    async def agenerate(self, system_prompt: str, user_message: str, max_tokens: int) -> str:
+        message = await self._async_client.messages.create(**self._request(system_prompt, user_message, max_tokens))
+        self._record_usage(_usage(message))
         return message.content[0].text
+
+    async def astream(self, system_prompt: str, user_message: str, max_tokens: int) -> AsyncIterator[str]:
+        async with self._async_client.messages.stream(
+            **self._request(system_prompt, user_message, max_tokens)
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+            self._record_usage(_usage(await stream.get_final_message()))
@@ -1,11 +1,70 @@
 """Abstract base for LLM providers."""
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import AsyncIterator, Iterator
+
+import anyio.to_thread
+
+from services.llm_latency import provider_label
+from services.llm_usage import llm_usage
 
 
 class BaseLLMProvider(ABC):
-    """Every provider must implement generate()."""
+    """Every provider must implement generate(); agenerate() is the async variant
+    and astream() yields the response incrementally."""
+
+    # "provider/model", set by get_provider(); keys latency history and routing
+    label: str | None = None
+    # "provider:api-key fingerprint", set by get_provider(); keys rate-limit budgets
+    quota_key: str | None = None
 
     @abstractmethod
     def generate(self, system_prompt: str, user_message: str, max_tokens: int) -> str:
         """Send a prompt to the LLM and return the raw text response."""
+
+    async def agenerate(self, system_prompt: str, user_message: str, max_tokens: int) -> str:
+        """Async generate(). Providers with an async SDK client override this;
+        the default runs the blocking call in a worker thread."""
+        return await anyio.to_thread.run_sync(
+            partial(self.generate, system_prompt, user_message, max_tokens)
+        )
+
+    async def astream(self, system_prompt: str, user_message: str, max_tokens: int) -> AsyncIterator[str]:
+        """Yield text deltas as the model produces them. Providers with a
+        streaming API override this; the default yields the whole response once."""
+        yield await self.agenerate(system_prompt, user_message, max_tokens)
+
+    def _record_usage(self, counts: dict[str, int]) -> None:
+        """Add one response's token counts (incl. cached prompt tokens) to ``llm_usage``."""
+        if counts:
+            llm_usage.record(provider_label(self), **counts)
+
+
+# Members of a composite provider (hedged / routed) that produced responses
+# inside the innermost ``responder_scope()``
+_responders: ContextVar[list[BaseLLMProvider] | None] = ContextVar("llm_responders", default=None)
+
+
+@contextmanager
+def responder_scope() -> Iterator[list[BaseLLMProvider]]:
+    """Collect the providers composites report via ``note_responder`` during the block."""
+    responders: list[BaseLLMProvider] = []
+    token = _responders.set(responders)
+    try:
+        yield responders
+    finally:
+        try:
+            _responders.reset(token)
+        except ValueError:
+            # An async generator holding the scope was closed from another context
+            pass
+
+
+def note_responder(provider: BaseLLMProvider) -> None:
+    """Report that ``provider`` produced the response a composite is returning."""
+    responders = _responders.get()
+    if responders is not None:
+        responders.append(provider)
@@ -1,23 +1,59 @@
 """Google Gemini provider using the google-genai SDK."""
 
+from typing import AsyncIterator
+
 from google import genai
 from google.genai import types
 
 from services.llm_providers.base import BaseLLMProvider
 
 
+def _usage(response) -> dict[str, int]:
+    meta = getattr(response, "usage_metadata", None)
+    if meta is None:
+        return {}
+    return {
+        "input_tokens": meta.prompt_token_count or 0,
+        "output_tokens": meta.candidates_token_count or 0,
+        "cached_tokens": meta.cached_content_token_count or 0,
+    }
+
+
 class GeminiProvider(BaseLLMProvider):
     def __init__(self, api_key: str, model: str) -> None:
         self._client = genai.Client(api_key=api_key)
         self._model = model
 
+    def _config(self, system_prompt: str, max_tokens: int) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            system_instruction=system_prompt,
+            max_output_tokens=max_tokens,
+        )
+
     def generate(self, system_prompt: str, user_message: str, max_tokens: int) -> str:
         response = self._client.models.generate_content(
             model=self._model,
-            config=types.GenerateContentConfig(
-                system_instruction=system_prompt,
-                max_output_tokens=max_tokens,
-            ),
+            config=self._config(system_prompt, max_tokens),
+            contents=user_message,
+        )
+        self._record_usage(_usage(response))
+        return response.text
+
+    async def agenerate(self, system_prompt: str, user_message: str, max_tokens: int) -> str:
+        response = await self._client.aio.models.generate_content(
+            model=self._model,
+            config=self._config(system_prompt, max_tokens),
             contents=user_message,
         )
+        self._record_usage(_usage(response))
         return response.text
+
+    async def astream(self, system_prompt: str, user_message: str, max_tokens: int) -> AsyncIterator[str]:
+        stream = await self._client.aio.models.generate_content_stream(
+            model=self._model,
+            config=self._config(system_prompt, max_tokens),
+            contents=user_message,
+        )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
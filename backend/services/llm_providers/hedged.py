@@ -0,0 +1,103 @@
+"""Composite provider that hedges slow calls onto standby providers."""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Callable
+
+from services.llm_health import llm_health, tracked_agenerate, tracked_generate
+from services.llm_latency import hedge_delay, llm_latency, provider_label
+from services.llm_providers.base import BaseLLMProvider, note_responder
+from services.llm_scheduler import llm_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class HedgedProvider(BaseLLMProvider):
+    """Sends the prompt to ``primary``; if it has not answered within its usual
+    ``llm_hedge_quantile`` latency, sends it to the next standby as well.
+
+    The first response ``accept`` approves wins and the other calls are
+    cancelled. If none is accepted, the first non-empty text is returned (so
+    the analyzer can report it as degraded); if every call raised, the first
+    error is raised. The provider whose text is returned is reported through
+    ``note_responder`` so results are attributed to the model that wrote them.
+    """
+
+    tracks_latency = True
+
+    def __init__(
+        self,
+        primary: BaseLLMProvider,
+        standbys: list[BaseLLMProvider],
+        accept: Callable[[str], bool] = bool,
+    ) -> None:
+        self.primary = primary
+        self.standbys = standbys
+        self._accept = accept
+        self._model = getattr(primary, "_model", None)
+        self.label = provider_label(primary)
+
+    def generate(self, system_prompt: str, user_message: str, max_tokens: int) -> str:
+        # Blocking callers get the primary only; hedging needs the event loop
+        return tracked_generate(self.primary, system_prompt, user_message, max_tokens)
+
+    async def astream(self, system_prompt: str, user_message: str, max_tokens: int) -> AsyncIterator[str]:
+        # Once tokens are flowing there is nothing to race; stream the primary
+        await llm_scheduler.admit(self.primary, system_prompt, user_message, max_tokens)
+        with llm_latency.measure(self.label):
+            async for chunk in self.primary.astream(system_prompt, user_message, max_tokens):
+                yield chunk
+
+    async def agenerate(self, system_prompt: str, user_message: str, max_tokens: int) -> str:
+        # Healthy providers first, fastest first; open circuits are last resorts
+        candidates = iter(llm_health.rank([self.primary, *self.standbys]))
+        pending: dict[asyncio.Task, BaseLLMProvider] = {}
+        last_started: BaseLLMProvider | None = None
+        fallback: tuple[str, BaseLLMProvider] | None = None
+        error: BaseException | None = None
+
+        def start_next() -> bool:
+            nonlocal last_started
+            provider = next(candidates, None)
+            if provider is None:
+                return False
+            if last_started is not None:
+                logger.info("Hedging LLM call: %s → %s", provider_label(last_started), provider_label(provider))
+            task = asyncio.ensure_future(tracked_agenerate(provider, system_prompt, user_message, max_tokens))
+            pending[task] = last_started = provider
+            return True
+
+        start_next()
+        exhausted = False
+        try:
+            while pending:
+                timeout = None if exhausted else hedge_delay(provider_label(last_started))
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    exhausted = not start_next()
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is not None:
+                        logger.warning("LLM call to %s failed: %s", provider_label(provider), task.exception())
+                        error = error or task.exception()
+                        continue
+                    text = task.result()
+                    if self._accept(text):
+                        note_responder(provider)
+                        return text
+                    if text and fallback is None:
+                        fallback = text, provider
+                if not pending and not exhausted:
+                    # Everything in flight failed — bring in the next standby now
+                    exhausted = not start_next()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if fallback is not None:
+            note_responder(fallback[1])
+            return fallback[0]
+        if error is None:
+            return ""
+        raise error
@@ -1,29 +1,59 @@
 """Generic OpenAI-compatible provider (covers OpenAI, DeepSeek, xAI, Qwen, Meta Llama, etc.)."""
 
 import logging
+from typing import AsyncIterator
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
+from core.config import settings
 from services.llm_providers.base import BaseLLMProvider
+from services.llm_usage import openai_usage
 
 logger = logging.getLogger(__name__)
 
 
 class OpenAICompatibleProvider(BaseLLMProvider):
     def __init__(self, api_key: str, model: str, base_url: str | None = None) -> None:
-        self._client = OpenAI(api_key=api_key, base_url=base_url)
+        self._client = OpenAI(api_key=api_key, base_url=base_url, max_retries=settings.llm_sdk_max_retries)
+        self._async_client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=settings.llm_sdk_max_retries)
         self._model = model
 
+    def _messages(self, system_prompt: str, user_message: str) -> list[dict]:
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message},
+        ]
+
     def generate(self, system_prompt: str, user_message: str, max_tokens: int) -> str:
         response = self._client.chat.completions.create(
             model=self._model,
             max_tokens=max_tokens,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message},
-            ],
+            messages=self._messages(system_prompt, user_message),
+        )
+        return self._extract_content(response)
+
+    async def agenerate(self, system_prompt: str, user_message: str, max_tokens: int) -> str:
+        response = await self._async_client.chat.completions.create(
+            model=self._model,
+            max_tokens=max_tokens,
+            messages=self._messages(system_prompt, user_message),
+        )
+        return self._extract_content(response)
+
+    async def astream(self, system_prompt: str, user_message: str, max_tokens: int) -> AsyncIterator[str]:
+        stream = await self._async_client.chat.completions.create(
+            model=self._model,
+            max_tokens=max_tokens,
+            messages=self._messages(system_prompt, user_message),
+            stream=True,
         )
+        async for chunk in stream:
+            delta = chunk.choices[0].delta if chunk.choices else None
+            if delta is not None and delta.content:
+                yield delta.content
 
+    def _extract_content(self, response) -> str:
+        self._record_usage(openai_usage(response))
         choice = response.choices[0] if response.choices else None
         if not choice:
             logger.error("Provider returned no choices. model=%s", self._model)
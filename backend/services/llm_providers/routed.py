@@ -0,0 +1,165 @@
+"""Composite provider that routes calls to the fastest healthy configured provider."""
+
+import asyncio
+import logging
+import random
+import time
+from typing import AsyncIterator, Callable
+
+from core.config import settings
+from services.llm_health import llm_health, record_outcome, tracked_agenerate, tracked_generate
+from services.llm_latency import provider_label
+from services.llm_providers.base import BaseLLMProvider, note_responder
+from services.llm_scheduler import llm_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class NoHealthyProviderError(RuntimeError):
+    """Every candidate's circuit is open and none is due for a probe."""
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry ``attempt`` (1-based)."""
+    ceiling = min(settings.llm_retry_max_delay_s, settings.llm_retry_base_delay_s * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling)
+
+
+class RoutedProvider(BaseLLMProvider):
+    """Sends each call to the fastest candidate whose circuit is closed.
+
+    Failed, empty or rejected (``accept``) responses are retried — on a
+    candidate not yet tried for this call when one is available — up to
+    ``llm_retry_attempts`` times with jittered backoff. Outcomes feed
+    ``services.llm_health``, which opens a candidate's circuit when it keeps
+    failing so later calls skip it until its cooldown has passed. The
+    candidate that answered is reported through ``note_responder``.
+    """
+
+    tracks_latency = True
+
+    def __init__(self, candidates: list[BaseLLMProvider], accept: Callable[[str], bool] = bool) -> None:
+        if not candidates:
+            raise ValueError("RoutedProvider needs at least one candidate")
+        self.candidates = candidates
+        self._accept = accept
+        self._model = getattr(candidates[0], "_model", None)
+        self.label = provider_label(candidates[0])
+
+    def generate(self, system_prompt: str, user_message: str, max_tokens: int) -> str:
+        tried: set[str] = set()
+        fallback: tuple[str, BaseLLMProvider] | None = None
+        error: Exception | None = None
+        for attempt in range(max(1, settings.llm_retry_attempts)):
+            if attempt:
+                time.sleep(backoff_delay(attempt))
+            provider = self._choose(tried, error)
+            if provider is None:
+                break
+            try:
+                text = tracked_generate(provider, system_prompt, user_message, max_tokens)
+            except Exception as exc:
+                error = self._failed(provider, exc)
+                continue
+            except BaseException:
+                llm_health.release(provider_label(provider))
+                raise
+            if self._accept(text):
+                note_responder(provider)
+                return text
+            if text and fallback is None:
+                fallback = text, provider
+        return self._give_up(fallback, error, tried)
+
+    async def agenerate(self, system_prompt: str, user_message: str, max_tokens: int) -> str:
+        tried: set[str] = set()
+        fallback: tuple[str, BaseLLMProvider] | None = None
+        error: Exception | None = None
+        for attempt in range(max(1, settings.llm_retry_attempts)):
+            if attempt:
+                await asyncio.sleep(backoff_delay(attempt))
+            provider = self._choose(tried, error)
+            if provider is None:
+                break
+            try:
+                text = await tracked_agenerate(provider, system_prompt, user_message, max_tokens)
+            except Exception as exc:
+                error = self._failed(provider, exc)
+                continue
+            except BaseException:
+                # Cancelled (client gone, batch torn down): no outcome, but free a half-open probe
+                llm_health.release(provider_label(provider))
+                raise
+            if self._accept(text):
+                note_responder(provider)
+                return text
+            if text and fallback is None:
+                fallback = text, provider
+        return self._give_up(fallback, error, tried)
+
+    async def astream(self, system_prompt: str, user_message: str, max_tokens: int) -> AsyncIterator[str]:
+        # Retry only until the first chunk arrives; a half-streamed answer cannot be replayed
+        tried: set[str] = set()
+        error: Exception | None = None
+        for attempt in range(max(1, settings.llm_retry_attempts)):
+            if attempt:
+                await asyncio.sleep(backoff_delay(attempt))
+            provider = self._choose(tried, error)
+            if provider is None:
+                break
+            label = provider_label(provider)
+            streamed = False
+            try:
+                await llm_scheduler.admit(provider, system_prompt, user_message, max_tokens)
+                started = time.monotonic()
+                async for chunk in provider.astream(system_prompt, user_message, max_tokens):
+                    if chunk and not streamed:
+                        streamed = True
+                        note_responder(provider)
+                    yield chunk
+            except Exception as exc:
+                llm_health.record(label, "error", f"{type(exc).__name__}: {exc}")
+                if streamed:
+                    raise
+                error = self._failed(provider, exc)
+                continue
+            except BaseException:
+                # Client disconnected mid-stream or the task was cancelled
+                llm_health.release(label)
+                raise
+            record_outcome(label, time.monotonic() - started, "x" if streamed else "")
+            if streamed:
+                return
+        self._give_up(None, error, tried)
+
+    # ── Private helpers ──────────────────────────────────────────────────────
+
+    def _choose(self, tried: set[str], error: Exception | None) -> BaseLLMProvider | None:
+        """Fastest allowed candidate, preferring ones not yet tried for this call."""
+        ranked = llm_health.rank(self.candidates)
+        for provider in sorted(ranked, key=lambda p: provider_label(p) in tried):
+            label = provider_label(provider)
+            if llm_health.allow(label):
+                if tried and label not in tried:
+                    logger.info("Routing LLM retry to %s", label)
+                tried.add(label)
+                return provider
+        return None
+
+    @staticmethod
+    def _failed(provider: BaseLLMProvider, exc: Exception) -> Exception:
+        logger.warning("LLM call to %s failed: %s", provider_label(provider), exc)
+        return exc
+
+    def _give_up(
+        self, fallback: tuple[str, BaseLLMProvider] | None, error: Exception | None, tried: set[str]
+    ) -> str:
+        if fallback is not None:
+            note_responder(fallback[1])
+            return fallback[0]
+        if error is not None:
+            raise error
+        if not tried:
+            labels = ", ".join(provider_label(p) for p in self.candidates)
+            raise NoHealthyProviderError(f"All LLM providers are unavailable (circuit open): {labels}")
+        return ""
@@ -0,0 +1,302 @@
+"""Provider-aware scheduling of LLM calls.
+
+Calls are admitted per (provider, API key) through two token buckets —
+requests per minute and estimated tokens per minute — and, when a key is
+saturated, in priority order: interactive analyses ahead of batch and
+workload jobs. A 429 pauses the key for the provider's ``retry-after``
+and the call is retried once the pause is over instead of failing.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Iterator
+
+from core.config import settings
+from services.llm_latency import provider_label
+from services.llm_providers.base import BaseLLMProvider
+
+logger = logging.getLogger(__name__)
+
+# Rough prompt-size estimate; providers count tokens differently anyway
+_CHARS_PER_TOKEN = 4
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BATCH = 10
+
+
+_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(priority: Priority) -> Iterator[None]:
+    """Run the LLM calls made inside the block (and tasks it spawns) at ``priority``."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def estimate_tokens(system_prompt: str, user_message: str, max_tokens: int) -> int:
+    return (len(system_prompt) + len(user_message)) // _CHARS_PER_TOKEN + max_tokens
+
+
+def quota_key(provider: BaseLLMProvider) -> str:
+    """"provider:api-key fingerprint", set by get_provider(); the label otherwise."""
+    return getattr(provider, "quota_key", None) or provider_label(provider)
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds to back off if ``exc`` is a rate-limit (429) response, else None.
+
+    Reads ``retry-after-ms`` / ``retry-after`` (seconds or HTTP date) from the
+    SDK error's HTTP response; falls back to ``llm_rate_limit_default_pause_s``.
+    """
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    if status != 429:
+        return None
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        pass
+    return settings.llm_rate_limit_default_pause_s
+
+
+class TokenBucket:
+    """``per_minute`` units refilled continuously, bursting up to one minute's worth."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)  # an oversized call waits for a full bucket
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self._rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+    def available(self, now: float) -> float:
+        self._refill(now)
+        return self.tokens
+
+
+@dataclass
+class _Quota:
+    requests: TokenBucket | None
+    tokens: TokenBucket | None
+    paused_until: float = 0.0
+    waiters: list[tuple[int, int, int, asyncio.Future]] = field(default_factory=list)
+    timer: tuple[asyncio.AbstractEventLoop, float] | None = None
+    admitted: int = 0
+    rate_limited: int = 0
+
+    def wait_time(self, cost: int, now: float) -> float:
+        wait = max(0.0, self.paused_until - now)
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(cost, now))
+        return wait
+
+    def take(self, cost: int) -> None:
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(cost)
+        self.admitted += 1
+
+
+class LLMScheduler:
+    """Admission control for LLM calls, one ``_Quota`` per provider key."""
+
+    def __init__(self) -> None:
+        self._quotas: dict[str, _Quota] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _quota(self, key: str) -> _Quota:
+        quota = self._quotas.get(key)
+        if quota is None:
+            rpm, tpm = settings.llm_provider_rate_limits.get(
+                key.split(":", 1)[0], [settings.llm_requests_per_minute, settings.llm_tokens_per_minute]
+            )
+            quota = self._quotas[key] = _Quota(
+                requests=TokenBucket(rpm) if rpm > 0 else None,
+                tokens=TokenBucket(tpm) if tpm > 0 else None,
+            )
+        return quota
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    async def acquire(self, key: str, cost: int, priority: Priority | None = None) -> None:
+        """Wait until ``key`` has budget for one call of ``cost`` tokens and it is our turn."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            quota = self._quota(key)
+            heapq.heappush(quota.waiters, (int(priority if priority is not None else _priority.get()),
+                                           next(self._seq), cost, future))
+        self._dispatch(key)
+        await future
+
+    def acquire_sync(self, key: str, cost: int) -> None:
+        """Blocking ``acquire`` for worker-thread callers (no queue position)."""
+        while True:
+            with self._lock:
+                quota = self._quota(key)
+                wait = quota.wait_time(cost, time.monotonic())
+                if wait <= 0:
+                    quota.take(cost)
+                    return
+            time.sleep(max(wait, 0.05))
+
+    def pause(self, key: str, seconds: float) -> None:
+        """Hold every call on ``key`` for ``seconds`` (a provider said 429)."""
+        with self._lock:
+            quota = self._quota(key)
+            quota.paused_until = max(quota.paused_until, time.monotonic() + seconds)
+            quota.rate_limited += 1
+        logger.warning("LLM rate limit on %s — pausing calls for %.1fs", key, seconds)
+
+    def _dispatch(self, key: str) -> None:
+        """Admit queued calls in priority order while ``key`` has budget."""
+        with self._lock:
+            quota = self._quotas[key]
+            while quota.waiters:
+                _, _, cost, future = quota.waiters[0]
+                if future.done():  # cancelled while queued
+                    heapq.heappop(quota.waiters)
+                    continue
+                wait = quota.wait_time(cost, time.monotonic())
+                if wait > 0:
+                    self._schedule(key, quota, future.get_loop(), wait)
+                    return
+                heapq.heappop(quota.waiters)
+                quota.take(cost)
+                future.set_result(None)
+
+    def _schedule(self, key: str, quota: _Quota, loop: asyncio.AbstractEventLoop, wait: float) -> None:
+        due = time.monotonic() + wait
+        if quota.timer is not None:
+            timer_loop, timer_due = quota.timer
+            if timer_loop is loop and not loop.is_closed() and timer_due <= due:
+                return
+        quota.timer = (loop, due)
+        loop.call_later(wait, self._timer_fired, key, loop)
+
+    def _timer_fired(self, key: str, loop: asyncio.AbstractEventLoop) -> None:
+        with self._lock:
+            quota = self._quotas.get(key)
+            if quota is not None and quota.timer is not None and quota.timer[0] is loop:
+                quota.timer = None
+        if quota is not None:
+            self._dispatch(key)
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    async def admit(self, provider: BaseLLMProvider, system_prompt: str, user_message: str, max_tokens: int) -> None:
+        """``acquire`` for one call to ``provider`` (streaming callers, which handle errors themselves)."""
+        await self.acquire(quota_key(provider), estimate_tokens(system_prompt, user_message, max_tokens))
+
+    async def call(
+        self,
+        provider: BaseLLMProvider,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        invoke: Callable[[], Awaitable[str]],
+    ) -> tuple[str, float]:
+        """Run ``invoke`` once admitted, waiting out 429s; returns (text, seconds of the final attempt)."""
+        key = quota_key(provider)
+        cost = estimate_tokens(system_prompt, user_message, max_tokens)
+        for attempt in range(settings.llm_rate_limit_retries + 1):
+            await self.acquire(key, cost)
+            started = time.monotonic()
+            try:
+                return await invoke(), time.monotonic() - started
+            except Exception as exc:
+                delay = retry_after(exc)
+                if delay is None or attempt == settings.llm_rate_limit_retries:
+                    raise
+                self.pause(key, delay)
+        raise AssertionError("unreachable")
+
+    def call_sync(
+        self,
+        provider: BaseLLMProvider,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        invoke: Callable[[], str],
+    ) -> tuple[str, float]:
+        """Blocking variant of ``call``."""
+        key = quota_key(provider)
+        cost = estimate_tokens(system_prompt, user_message, max_tokens)
+        for attempt in range(settings.llm_rate_limit_retries + 1):
+            self.acquire_sync(key, cost)
+            started = time.monotonic()
+            try:
+                return invoke(), time.monotonic() - started
+            except Exception as exc:
+                delay = retry_after(exc)
+                if delay is None or attempt == settings.llm_rate_limit_retries:
+                    raise
+                self.pause(key, delay)
+        raise AssertionError("unreachable")
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            out = {}
+            for key, quota in self._quotas.items():
+                out[key] = {
+                    "queued": sum(1 for *_, f in quota.waiters if not f.done()),
+                    "admitted": quota.admitted,
+                    "rate_limited": quota.rate_limited,
+                    "paused_s": max(0.0, quota.paused_until - now),
+                    "requests_available": None if quota.requests is None else quota.requests.available(now),
+                    "tokens_available": None if quota.tokens is None else quota.tokens.available(now),
+                }
+            return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._quotas.clear()
+
+
+llm_scheduler = LLMScheduler()
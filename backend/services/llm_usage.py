@@ -0,0 +1,65 @@
+"""Per-provider/model token usage, including prompt-cache hits."""
+
+import threading
+from typing import Any
+
+
+def openai_usage(response: Any) -> dict[str, int]:
+    """Token counts from an OpenAI-style ``usage`` block.
+
+    Cached prompt tokens are reported as ``prompt_tokens_details.cached_tokens``
+    by OpenAI and most compatible APIs, and as ``prompt_cache_hit_tokens`` by
+    DeepSeek.
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) or getattr(usage, "prompt_cache_hit_tokens", None) or 0
+    return {
+        "input_tokens": getattr(usage, "prompt_tokens", None) or 0,
+        "output_tokens": getattr(usage, "completion_tokens", None) or 0,
+        "cached_tokens": cached,
+    }
+
+
+class UsageCounters:
+    """Cumulative token counts per label since start-up (thread-safe)."""
+
+    _FIELDS = ("calls", "input_tokens", "output_tokens", "cached_tokens", "cache_write_tokens")
+
+    def __init__(self) -> None:
+        self._totals: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        label: str,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cached_tokens: int = 0,
+        cache_write_tokens: int = 0,
+    ) -> None:
+        """Add one call; ``input_tokens`` includes the cached and cache-write tokens."""
+        with self._lock:
+            totals = self._totals.setdefault(label, dict.fromkeys(self._FIELDS, 0))
+            totals["calls"] += 1
+            totals["input_tokens"] += input_tokens
+            totals["output_tokens"] += output_tokens
+            totals["cached_tokens"] += cached_tokens
+            totals["cache_write_tokens"] += cache_write_tokens
+
+    def snapshot(self) -> dict[str, dict[str, float | int]]:
+        with self._lock:
+            out: dict[str, dict[str, float | int]] = {}
+            for label, totals in self._totals.items():
+                inputs = totals["input_tokens"]
+                out[label] = {**totals, "cache_hit_ratio": totals["cached_tokens"] / inputs if inputs else 0.0}
+            return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+llm_usage = UsageCounters()
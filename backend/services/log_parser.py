@@ -0,0 +1,279 @@
+"""Stream-parse PostgreSQL and MySQL slow-query logs and aggregate them per statement fingerprint.
+
+Logs are consumed line by line and only the entry currently being read is
+buffered, so memory stays flat no matter how large the file is; the
+aggregate grows with the number of distinct fingerprints (capped).
+"""
+
+import csv
+import itertools
+import json
+import logging
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Literal
+
+from services.sql_normalizer import fingerprint_sql_uncached
+
+logger = logging.getLogger(__name__)
+
+LogFormat = Literal["postgres", "postgres_csv", "mysql_slow"]
+
+# Entries larger than this are dropped rather than buffered
+_MAX_ENTRY_CHARS = 1_000_000
+
+# Columns of PostgreSQL csvlog rows: error_severity and message
+_CSV_SEVERITY_COL = 11
+_CSV_MESSAGE_COL = 13
+# csvlog column counts: 23 (≤ 12), 24 (13, backend_type), 26 (14+, leader_pid, query_id)
+_CSV_COLUMN_COUNTS = frozenset({23, 24, 26})
+_CSV_SEVERITIES = frozenset({
+    "LOG", "ERROR", "WARNING", "NOTICE", "INFO", "FATAL", "PANIC",
+    "DEBUG", "DEBUG1", "DEBUG2", "DEBUG3", "DEBUG4", "DEBUG5",
+})
+_CSV_TIMESTAMP_RE = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+
+# "duration: 12.3 ms  statement: …" / "execute <name>: …" / "plan:" (auto_explain)
+_PG_DURATION_RE = re.compile(
+    r"duration:\s+(?P<ms>[\d.]+)\s+ms\s+(?P<kind>statement|execute [^:]*|plan):\s?(?P<rest>.*)",
+    re.DOTALL,
+)
+# Start of a new stderr log record: "<prefix> LOG:  …"
+_PG_RECORD_RE = re.compile(
+    r"\b(?:LOG|ERROR|WARNING|NOTICE|INFO|DEBUG\d?|FATAL|PANIC|DETAIL|HINT|CONTEXT|STATEMENT):\s"
+)
+# First line of a text-format auto_explain plan node
+_PG_TEXT_PLAN_RE = re.compile(r"\(cost=|\(actual ")
+
+_MYSQL_QUERY_TIME_RE = re.compile(r"^# Query_time:\s+(?P<secs>[\d.]+)")
+_MYSQL_SKIP_RE = re.compile(r"^(?:use\s+\S+;|SET\s+timestamp=\d+;)\s*$", re.IGNORECASE)
+
+
+@dataclass
+class LogStatement:
+    sql: str
+    duration_ms: float
+    plan: str | None = None
+
+
+@dataclass
+class FingerprintAggregate:
+    fingerprint: str
+    sql: str                       # slowest captured example
+    count: int = 0
+    total_duration_ms: float = 0.0
+    max_duration_ms: float = 0.0
+    plan: str | None = None        # plan captured for the slowest planned execution
+    plan_duration_ms: float | None = None
+
+
+# ── Format detection ─────────────────────────────────────────────────────────
+
+def detect_format(lines: Iterable[str]) -> tuple[LogFormat, Iterator[str]]:
+    """Sniff the first lines; returns the format and an iterator over *all* lines."""
+    it = iter(lines)
+    head = list(itertools.islice(it, 20))
+    stream = itertools.chain(head, it)
+    for line in head:
+        if line.startswith(("# Time:", "# User@Host:", "# Query_time:")):
+            return "mysql_slow", stream
+    # stderr records ("<prefix> LOG:  duration: …") never appear verbatim in csvlog rows
+    if any(_PG_RECORD_RE.search(line) for line in head):
+        return "postgres", stream
+    if _looks_like_csvlog(head):
+        return "postgres_csv", stream
+    return "postgres", stream
+
+
+def _looks_like_csvlog(head: list[str]) -> bool:
+    """First record has csvlog's shape: timestamp, known column count, severity."""
+    try:
+        row = next(csv.reader(line for line in head if line.strip()), None)
+    except csv.Error:
+        return False
+    return (
+        row is not None
+        and len(row) in _CSV_COLUMN_COUNTS
+        and bool(_CSV_TIMESTAMP_RE.match(row[0]))
+        and row[_CSV_SEVERITY_COL] in _CSV_SEVERITIES
+    )
+
+
+# ── PostgreSQL ───────────────────────────────────────────────────────────────
+
+def _statement_from_pg_message(message: str) -> LogStatement | None:
+    match = _PG_DURATION_RE.search(message)
+    if not match:
+        return None
+    duration_ms = float(match.group("ms"))
+    rest = match.group("rest").strip()
+    if match.group("kind") != "plan":
+        return LogStatement(sql=rest, duration_ms=duration_ms) if rest else None
+    return _statement_from_auto_explain(rest, duration_ms)
+
+
+def _statement_from_auto_explain(body: str, duration_ms: float) -> LogStatement | None:
+    """auto_explain output in JSON format, or text format starting with "Query Text:"."""
+    if body.startswith("{"):
+        try:
+            data = json.loads(body)
+        except json.JSONDecodeError:
+            return None
+        sql = (data.pop("Query Text", "") or "").strip()
+        if not sql:
+            return None
+        # Same shape EXPLAIN (FORMAT JSON) produces on the live path
+        return LogStatement(sql=sql, duration_ms=duration_ms, plan=json.dumps([data], indent=2))
+
+    lines = body.splitlines()
+    if not lines or not lines[0].startswith("Query Text:"):
+        return None
+    sql_lines = [lines[0][len("Query Text:"):].strip()]
+    plan_start = len(lines)
+    for i, line in enumerate(lines[1:], start=1):
+        if _PG_TEXT_PLAN_RE.search(line):
+            plan_start = i
+            break
+        sql_lines.append(line.strip())
+    sql = "\n".join(sql_lines).strip()
+    plan = "\n".join(line.strip("\t") for line in lines[plan_start:]).strip()
+    return LogStatement(sql=sql, duration_ms=duration_ms, plan=plan or None) if sql else None
+
+
+def parse_postgres_stderr(lines: Iterable[str]) -> Iterator[LogStatement]:
+    """stderr / syslog-style logs; continuation lines are tab-indented."""
+    buf: list[str] = []
+    size = 0
+    for line in lines:
+        line = line.rstrip("\r\n")
+        continuation = line.startswith("\t") or (buf and not _PG_RECORD_RE.search(line))
+        if continuation and buf:
+            if size < _MAX_ENTRY_CHARS:
+                buf.append(line[1:] if line.startswith("\t") else line)
+                size += len(line)
+            continue
+        if buf:
+            stmt = _flush_pg(buf, size)
+            if stmt:
+                yield stmt
+        buf, size = ([line], len(line)) if "duration:" in line else ([], 0)
+    if buf:
+        stmt = _flush_pg(buf, size)
+        if stmt:
+            yield stmt
+
+
+def _flush_pg(buf: list[str], size: int) -> LogStatement | None:
+    if size >= _MAX_ENTRY_CHARS:
+        logger.debug("Skipping oversized log entry (%d chars)", size)
+        return None
+    return _statement_from_pg_message("\n".join(buf))
+
+
+def parse_postgres_csv(lines: Iterable[str]) -> Iterator[LogStatement]:
+    """csvlog output; the csv module follows quoted multi-line messages lazily."""
+    for row in csv.reader(lines):
+        if len(row) <= _CSV_MESSAGE_COL:
+            continue
+        message = row[_CSV_MESSAGE_COL]
+        if "duration:" not in message or len(message) >= _MAX_ENTRY_CHARS:
+            continue
+        stmt = _statement_from_pg_message(message)
+        if stmt:
+            yield stmt
+
+
+# ── MySQL ────────────────────────────────────────────────────────────────────
+
+def parse_mysql_slow(lines: Iterable[str]) -> Iterator[LogStatement]:
+    """Slow query log: "# Query_time:" header followed by the statement text."""
+    duration_ms: float | None = None
+    sql_lines: list[str] = []
+    size = 0
+
+    def flush() -> LogStatement | None:
+        sql = "\n".join(sql_lines).strip()
+        if duration_ms is None or not sql or size >= _MAX_ENTRY_CHARS:
+            return None
+        return LogStatement(sql=sql, duration_ms=duration_ms)
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.startswith("#"):
+            match = _MYSQL_QUERY_TIME_RE.match(line)
+            if match or line.startswith(("# Time:", "# User@Host:")):
+                if sql_lines:
+                    stmt = flush()
+                    if stmt:
+                        yield stmt
+                    sql_lines, size = [], 0
+                if match:
+                    duration_ms = float(match.group("secs")) * 1000
+            continue
+        if duration_ms is None or _MYSQL_SKIP_RE.match(line.strip()):
+            continue  # server banner lines, "use db;", "SET timestamp=…;"
+        if size < _MAX_ENTRY_CHARS:
+            sql_lines.append(line)
+            size += len(line)
+
+    stmt = flush()
+    if stmt:
+        yield stmt
+
+
+_PARSERS = {
+    "postgres": parse_postgres_stderr,
+    "postgres_csv": parse_postgres_csv,
+    "mysql_slow": parse_mysql_slow,
+}
+
+DB_TYPES = {"postgres": "postgresql", "postgres_csv": "postgresql", "mysql_slow": "mysql"}
+
+
+# ── Aggregation ──────────────────────────────────────────────────────────────
+
+class LogAggregator:
+    """Count and duration per fingerprint, keeping the slowest example and plan."""
+
+    def __init__(self, db_type: str, max_fingerprints: int = 10_000) -> None:
+        self._db_type = db_type
+        self._max = max_fingerprints
+        self.entries: dict[str, FingerprintAggregate] = {}
+        self.statements = 0
+        self.dropped = 0  # statements whose fingerprint arrived after the cap
+
+    def add(self, stmt: LogStatement) -> None:
+        self.statements += 1
+        fp = fingerprint_sql_uncached(stmt.sql, self._db_type)
+        agg = self.entries.get(fp)
+        if agg is None:
+            if len(self.entries) >= self._max:
+                self.dropped += 1
+                return
+            agg = self.entries[fp] = FingerprintAggregate(fingerprint=fp, sql=stmt.sql)
+        agg.count += 1
+        agg.total_duration_ms += stmt.duration_ms
+        if stmt.duration_ms >= agg.max_duration_ms:
+            agg.max_duration_ms = stmt.duration_ms
+            agg.sql = stmt.sql
+        if stmt.plan and (agg.plan_duration_ms is None or stmt.duration_ms >= agg.plan_duration_ms):
+            agg.plan = stmt.plan
+            agg.plan_duration_ms = stmt.duration_ms
+            agg.sql = stmt.sql  # keep the example consistent with its plan
+
+    def top(self, k: int) -> list[FingerprintAggregate]:
+        return sorted(self.entries.values(), key=lambda a: a.total_duration_ms, reverse=True)[:k]
+
+
+def aggregate_log(
+    lines: Iterable[str],
+    log_format: LogFormat | Literal["auto"] = "auto",
+    max_fingerprints: int = 10_000,
+) -> tuple[LogFormat, LogAggregator]:
+    """Parse ``lines`` as a stream and aggregate statements per fingerprint."""
+    if log_format == "auto":
+        log_format, lines = detect_format(lines)
+    aggregator = LogAggregator(DB_TYPES[log_format], max_fingerprints)
+    for stmt in _PARSERS[log_format](lines):
+        aggregator.add(stmt)
+    return log_format, aggregator
@@ -0,0 +1,157 @@
+"""Compact text rendering of PostgreSQL JSON plans for LLM prompts.
+
+``EXPLAIN (FORMAT JSON)`` output pretty-printed with ``indent=2`` spends
+most of its bytes on whitespace, braces and default-valued keys. This
+renders one line per node, indented by depth: estimated vs actual rows,
+loops, inclusive and exclusive time and non-zero buffers, then after a
+``|`` the node's conditions and other non-default fields.
+"""
+
+import json
+from typing import Any
+
+# Keys rendered in the node header or deliberately dropped (verbose/noise)
+_HEADER_KEYS = frozenset({
+    "Node Type", "Plans", "Parent Relationship", "Subplan Name", "Parallel Aware", "Async Capable",
+    "Join Type", "Strategy", "Partial Mode", "Scan Direction", "Index Name", "Relation Name", "Alias",
+    "Schema", "CTE Name", "Function Name", "Startup Cost", "Total Cost", "Plan Rows", "Plan Width",
+    "Actual Startup Time", "Actual Total Time", "Actual Rows", "Actual Loops", "Output", "Workers",
+    "Inner Unique", "Single Copy",
+})
+_BUFFER_KEYS = (
+    ("Shared Hit Blocks", "shared hit"), ("Shared Read Blocks", "shared read"),
+    ("Shared Dirtied Blocks", "shared dirtied"), ("Shared Written Blocks", "shared written"),
+    ("Local Hit Blocks", "local hit"), ("Local Read Blocks", "local read"),
+    ("Local Dirtied Blocks", "local dirtied"), ("Local Written Blocks", "local written"),
+    ("Temp Read Blocks", "temp read"), ("Temp Written Blocks", "temp written"),
+)
+_SKIP_KEYS = _HEADER_KEYS | {key for key, _ in _BUFFER_KEYS} | {
+    "I/O Read Time", "I/O Write Time", "Temp I/O Read Time", "Temp I/O Write Time",
+}
+_AGGREGATE_NAMES = {"Hashed": "HashAggregate", "Sorted": "GroupAggregate", "Mixed": "MixedAggregate"}
+
+# Flag nodes whose actual rows are off from the estimate by this factor or more
+_MISESTIMATE_FACTOR = 10
+
+
+# Prepended to compact plans in the prompt so the model reads the columns right
+COMPACT_PLAN_LEGEND = (
+    "Compact plan: one node per line, children indented under '->', node details after '|'. "
+    "time = total over all loops, self = time excluding children, est = planner estimate."
+)
+
+
+def compact_plan(raw_plan: str) -> str:
+    """Compact rendering of a JSON plan; any other text (MySQL, text-format) is returned unchanged.
+
+    Times are totals over all loops; ``self`` excludes the node's children.
+    """
+    text = raw_plan.strip()
+    if not text.startswith(("[", "{")):
+        return raw_plan
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return raw_plan
+    top = data[0] if isinstance(data, list) and data else data
+    if not isinstance(top, dict) or not isinstance(top.get("Plan"), dict):
+        return raw_plan
+
+    lines: list[str] = []
+    _render(top["Plan"], 0, lines)
+    for trigger in top.get("Triggers") or []:
+        lines.append(f"Trigger {trigger.get('Trigger Name')}: time={_ms(trigger.get('Time'))} calls={trigger.get('Calls')}")
+    if top.get("Settings"):
+        lines.append("Settings: " + ", ".join(f"{k}={v}" for k, v in top["Settings"].items()))
+    return "\n".join(lines)
+
+
+def _render(node: dict[str, Any], depth: int, lines: list[str]) -> None:
+    details = "; ".join(
+        f"{key}: {_value(value)}"
+        for key, value in node.items()
+        if key not in _SKIP_KEYS and not _is_default(value)
+    )
+    prefix = "  " * depth + ("-> " if depth else "")
+    lines.append(prefix + _header(node) + (f" | {details}" if details else ""))
+    for child in node.get("Plans") or []:
+        _render(child, depth + 1, lines)
+
+
+def _header(node: dict[str, Any]) -> str:
+    name = node.get("Node Type", "?")
+    if name == "Aggregate":
+        name = _AGGREGATE_NAMES.get(node.get("Strategy"), name)
+    if node.get("Partial Mode") and node["Partial Mode"] != "Simple":
+        name = f"{node['Partial Mode']} {name}"
+    join_type = node.get("Join Type")
+    if join_type and join_type != "Inner":
+        name = f"{name[:-5]} {join_type} Join" if name.endswith(" Join") else f"{name} {join_type} Join"
+    if node.get("Parallel Aware"):
+        name = f"Parallel {name}"
+    if node.get("Scan Direction") == "Backward":
+        name += " Backward"
+    if node.get("Index Name"):
+        name += f" using {node['Index Name']}"
+    target = node.get("Relation Name") or node.get("CTE Name") or node.get("Function Name")
+    if target:
+        alias = node.get("Alias")
+        name += f" on {target}" + (f" {alias}" if alias and alias != target else "")
+    if node.get("Subplan Name"):
+        name = f"[{node['Subplan Name']}] {name}"
+
+    parts = [name, f"(est rows={node.get('Plan Rows', '?')} cost={node.get('Total Cost', '?')})"]
+    if node.get("Actual Loops") == 0:
+        parts.append("(never executed)")
+    elif "Actual Rows" in node:
+        loops = node.get("Actual Loops") or 1
+        actual = f"actual rows={node['Actual Rows']} loops={loops}"
+        if "Actual Total Time" in node:
+            actual += f" time={_ms(node['Actual Total Time'] * loops)} self={_ms(_exclusive_ms(node))}"
+        parts.append(f"({actual})")
+        misestimate = _misestimate(node.get("Plan Rows"), node["Actual Rows"])
+        if misestimate:
+            parts.append(misestimate)
+    buffers = [f"{label}={node[key]}" for key, label in _BUFFER_KEYS if node.get(key)]
+    if buffers:
+        parts.append("buffers: " + " ".join(buffers))
+    return " ".join(parts)
+
+
+def _exclusive_ms(node: dict[str, Any]) -> float:
+    """Time spent in the node itself: its total over all loops minus its children's."""
+    total = node.get("Actual Total Time", 0.0) * (node.get("Actual Loops") or 1)
+    # Children that never ran report no time (loops 0), so they add nothing here
+    children = sum(
+        c.get("Actual Total Time", 0.0) * c.get("Actual Loops", 1) for c in node.get("Plans") or []
+    )
+    return max(0.0, total - children)
+
+
+def _misestimate(estimated: Any, actual: Any) -> str | None:
+    if not isinstance(estimated, (int, float)) or not isinstance(actual, (int, float)):
+        return None
+    est, act = max(estimated, 1), max(actual, 1)
+    if act >= est * _MISESTIMATE_FACTOR:
+        return f"[rows x{act / est:.0f} under-estimated]"
+    if est >= act * _MISESTIMATE_FACTOR:
+        return f"[rows x{est / act:.0f} over-estimated]"
+    return None
+
+
+def _is_default(value: Any) -> bool:
+    return value is None or value is False or value == 0 or value == "" or value == [] or value == {}
+
+
+def _value(value: Any) -> str:
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    if isinstance(value, dict):
+        return ", ".join(f"{k}={v}" for k, v in value.items())
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value)
+
+
+def _ms(value: Any) -> str:
+    return f"{value:.3f}ms" if isinstance(value, (int, float)) else "?"
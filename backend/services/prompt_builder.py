@@ -1,10 +1,13 @@
 """Assemble the structured prompt sent to the LLM for query analysis."""
 
+import hashlib
 import json
 import logging
+import re
 
 from connectors.base import ColumnStat, IndexInfo, TableSchema
 from core.config import settings
+from services.plan_format import COMPACT_PLAN_LEGEND, compact_plan
 from services.query_introspector import QueryIntrospectionResult
 
 logger = logging.getLogger(__name__)
@@ -319,9 +322,56 @@ def _format_table_schema(ts: TableSchema) -> str:
     return "\n".join(lines)
 
 
+# Numbers and quoted strings vary between runs of the same plan; strip them
+# so the digest reflects only the plan's shape (node types, relations, indexes).
+_PLAN_VOLATILE_RE = re.compile(r"'(?:[^']|'')*'|(?<!\w)-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?")
+
+
+def _plan_shape(raw_plan: str) -> str:
+    return _PLAN_VOLATILE_RE.sub("?", raw_plan)
+
+
+def _sorted_schemas(introspection: QueryIntrospectionResult) -> list[TableSchema]:
+    # Queries name their tables in any order; the prompt prefix must not
+    return sorted(introspection.table_schemas, key=lambda ts: ts.table_name)
+
+
+# The user message opens with the per-connection schema block (stable across
+# queries on the same tables) and the volatile part starts at this heading.
+# Providers with explicit prompt caching place their breakpoint here.
+_QUERY_HEADING = "## SQL Query\n"
+
+
+def split_cacheable_prefix(user_message: str) -> tuple[str, str]:
+    """Split a built user message into (stable schema prefix, query + plan)."""
+    prefix, sep, rest = user_message.partition("\n\n" + _QUERY_HEADING)
+    if not sep:
+        return "", user_message
+    return prefix + "\n\n", _QUERY_HEADING + rest
+
+
 class PromptBuilder:
+    def context_digest(self, introspection: QueryIntrospectionResult) -> str:
+        """Hash of the prompt context that is independent of query literals.
+
+        Covers the system prompt, the schema/statistics block and the plan
+        shape — not the query text or per-run timings.
+        """
+        digest = hashlib.sha256()
+        digest.update(_DIALECT_PROMPTS.get(introspection.db_type or "", _GENERIC_SYSTEM_PROMPT).encode())
+        for ts in _sorted_schemas(introspection):
+            digest.update(_format_table_schema(ts).encode())
+        if introspection.explain:
+            digest.update(_plan_shape(introspection.explain.raw_plan).encode())
+        return digest.hexdigest()
+
     def build(self, introspection: QueryIntrospectionResult) -> tuple[str, str]:
-        """Return (system_prompt, user_message) ready to send to the LLM."""
+        """Return (system_prompt, user_message) ready to send to the LLM.
+
+        Laid out for provider prompt caching: the dialect system prompt, then
+        the schema/statistics block (byte-identical for the same tables), then
+        the query and its plan, which change on every call.
+        """
         system_prompt = _DIALECT_PROMPTS.get(
             introspection.db_type or "", _GENERIC_SYSTEM_PROMPT
         )
@@ -329,11 +379,14 @@ class PromptBuilder:
         max_chars = settings.max_prompt_chars
 
         # 1. The query (always kept in full — most critical section)
-        query_section = "## SQL Query\n```sql\n" + introspection.sql + "\n```"
+        query_section = _QUERY_HEADING + "```sql\n" + introspection.sql + "\n```"
 
         # 2. EXPLAIN ANALYZE output
         if introspection.explain:
-            plan = introspection.explain.raw_plan
+            raw_plan = introspection.explain.raw_plan
+            plan = compact_plan(raw_plan)
+            if plan is not raw_plan:
+                plan = COMPACT_PLAN_LEGEND + "\n" + plan
             pt = introspection.explain.planning_time_ms
             et = introspection.explain.execution_time_ms
             timing = ""
@@ -351,7 +404,7 @@ class PromptBuilder:
         # 3. Table schemas + indexes + stats
         if introspection.table_schemas:
             schema_blocks = "\n\n".join(
-                _format_table_schema(ts) for ts in introspection.table_schemas
+                _format_table_schema(ts) for ts in _sorted_schemas(introspection)
             )
             schema_section = f"## Table Schemas & Statistics\n```\n{schema_blocks}\n```"
         else:
@@ -376,7 +429,9 @@ class PromptBuilder:
 
         # Fit explain section
         if len(explain_section) > budget:
-            explain_section = explain_section[:budget - 30] + "\n… [truncated]```"
+            # Cut at a node boundary so the model never sees half a line
+            cut = explain_section.rfind("\n", 0, budget - 30)
+            explain_section = explain_section[:cut if cut > 0 else budget - 30] + "\n… [truncated]```"
             truncated = True
         budget -= len(explain_section)
 
@@ -396,5 +451,7 @@ class PromptBuilder:
                 max_chars, len(query_section), len(explain_section), len(schema_section),
             )
 
-        user_message = joiner.join([query_section, explain_section, schema_section])
+        # Stable schema first so it extends the cacheable prefix; truncation
+        # priority above is unchanged
+        user_message = joiner.join([schema_section, query_section, explain_section])
         return system_prompt, user_message
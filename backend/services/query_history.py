@@ -0,0 +1,243 @@
+"""Query history rows, their suggestion / table index and per-fingerprint aggregates."""
+
+import json
+import logging
+import re
+from datetime import datetime
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from api.models.orm import QueryHistory, QueryTable, Suggestion
+from api.models.schemas import AnalysisResult, QueryHistoryGroup
+from services.sql_normalizer import analyze_sql, fingerprint_sql
+
+logger = logging.getLogger(__name__)
+
+SUGGESTION_CATEGORIES = (
+    "indexes", "rewrites", "materialized_views", "bottlenecks", "statistics", "configuration",
+)
+
+# PostgreSQL text EXPLAIN footer / MySQL EXPLAIN ANALYZE root node
+_PG_TEXT_EXEC_RE = re.compile(r"Execution Time:\s*([\d.]+)\s*ms", re.IGNORECASE)
+_MYSQL_ACTUAL_RE = re.compile(r"actual time=[\d.]+\.\.([\d.]+)")
+
+
+def suggestion_count(result: AnalysisResult) -> int:
+    return sum(len(getattr(result, category)) for category in SUGGESTION_CATEGORIES)
+
+
+def plan_execution_time_ms(raw_plan: str | None) -> float | None:
+    """Execution time recorded in a stored EXPLAIN ANALYZE plan, if any."""
+    if not raw_plan:
+        return None
+    text = raw_plan.strip()
+    if text.startswith(("[", "{")):
+        try:
+            data = json.loads(text)
+            top = data[0] if isinstance(data, list) else data
+            value = top.get("Execution Time") if isinstance(top, dict) else None
+            return float(value) if value is not None else None
+        except (ValueError, TypeError, IndexError):
+            return None
+    match = _PG_TEXT_EXEC_RE.search(text) or _MYSQL_ACTUAL_RE.search(text)
+    return float(match.group(1)) if match else None
+
+
+def history_row(
+    query_id: str,
+    connection_id: str | None,
+    sql: str,
+    db_type: str | None,
+    explain_plan: str | None,
+    execution_time_ms: float | None,
+    result: AnalysisResult,
+) -> QueryHistory:
+    return QueryHistory(
+        id=query_id,
+        connection_id=connection_id,
+        sql_query=sql,
+        explain_plan=explain_plan,
+        llm_response=result.model_dump_json(),
+        fingerprint=fingerprint_sql(sql, db_type),
+        suggestion_count=suggestion_count(result),
+        execution_time_ms=execution_time_ms if execution_time_ms is not None else plan_execution_time_ms(explain_plan),
+    )
+
+
+def query_tables(result: AnalysisResult, tables: list[str]) -> list[str]:
+    """Tables an analysis is filed under: the parsed ones, else what the LLM reported."""
+    return sorted({t.lower() for t in tables or result.tables_analyzed if t})
+
+
+def index_rows(
+    query_id: str,
+    result: AnalysisResult,
+    tables: list[str],
+    db_type: str | None = None,
+    created_at: datetime | None = None,
+) -> list[Suggestion | QueryTable]:
+    """Suggestion and query→table rows that make history filterable without parsing JSON."""
+    tables = query_tables(result, tables)
+    rows: list[Suggestion | QueryTable] = [QueryTable(query_id=query_id, table_name=t) for t in tables]
+    for category in SUGGESTION_CATEGORIES:
+        for item in getattr(result, category):
+            sql = getattr(item, "sql", None)
+            touched = analyze_sql(sql, db_type).table_names if sql else ()
+            rows.append(Suggestion(
+                query_id=query_id,
+                category=category,
+                estimated_impact=(item.estimated_impact or "").lower()[:10],
+                index_type=getattr(item, "index_type", None),
+                root_cause=getattr(item, "root_cause", None),
+                sql=sql,
+                explanation=item.explanation,
+                tables=",".join(touched or tables),
+                created_at=created_at or datetime.utcnow(),
+            ))
+    return rows
+
+
+def backfill_fingerprints(db: Session, batch_size: int = 500) -> int:
+    """Fill the derived columns of rows written before they existed."""
+    updated = 0
+    while True:
+        rows = (
+            db.query(QueryHistory)
+            .filter(QueryHistory.fingerprint.is_(None))
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        for row in rows:
+            db_type = row.connection.db_type if row.connection else None
+            row.fingerprint = fingerprint_sql(row.sql_query, db_type)
+            row.execution_time_ms = plan_execution_time_ms(row.explain_plan)
+            try:
+                row.suggestion_count = suggestion_count(AnalysisResult.model_validate_json(row.llm_response or ""))
+            except ValueError:
+                row.suggestion_count = 0
+        db.commit()
+        updated += len(rows)
+    if updated:
+        logger.info("Backfilled fingerprints for %d query history rows", updated)
+    return updated
+
+
+def history_groups(
+    db: Session, limit: int, connection_id: str | None = None
+) -> list[QueryHistoryGroup]:
+    """Most recently seen fingerprints with counts and their latest analysis.
+
+    One GROUP BY over (fingerprint, created_at) plus a join back to the
+    latest row of each group — both served by the composite index.
+    """
+    query = db.query(
+        QueryHistory.fingerprint.label("fingerprint"),
+        func.count(QueryHistory.id).label("analysis_count"),
+        func.max(QueryHistory.created_at).label("last_seen"),
+        func.sum(QueryHistory.suggestion_count).label("total_suggestions"),
+    ).filter(QueryHistory.fingerprint.isnot(None))
+    if connection_id:
+        query = query.filter(QueryHistory.connection_id == connection_id)
+    groups = (
+        query.group_by(QueryHistory.fingerprint)
+        .order_by(func.max(QueryHistory.created_at).desc())
+        .limit(limit)
+        .subquery()
+    )
+
+    latest = (
+        db.query(groups, QueryHistory)
+        .join(QueryHistory, and_(
+            QueryHistory.fingerprint == groups.c.fingerprint,
+            QueryHistory.created_at == groups.c.last_seen,
+        ))
+        .order_by(groups.c.last_seen.desc(), QueryHistory.id)
+    )
+    if connection_id:
+        latest = latest.filter(QueryHistory.connection_id == connection_id)
+
+    result: dict[str, QueryHistoryGroup] = {}
+    for row in latest.all():
+        if row.fingerprint in result:
+            continue  # two analyses in the same timestamp — keep one
+        entry: QueryHistory = row.QueryHistory
+        result[row.fingerprint] = QueryHistoryGroup(
+            fingerprint=row.fingerprint,
+            analysis_count=row.analysis_count,
+            last_seen=row.last_seen,
+            total_suggestions=row.total_suggestions or 0,
+            latest_id=entry.id,
+            latest_sql=entry.sql_query,
+            latest_connection_id=entry.connection_id,
+            latest_execution_time_ms=entry.execution_time_ms,
+            latest_suggestion_count=entry.suggestion_count or 0,
+        )
+    return list(result.values())
+
+
+def rebuild_suggestion_index(db: Session, batch_size: int = 500) -> int:
+    """Split existing history into suggestion / table rows (first start after upgrade)."""
+    if db.query(QueryTable.query_id).first() is not None or db.query(Suggestion.id).first() is not None:
+        return 0
+    rows = 0
+    last_id = ""
+    while True:
+        batch = (
+            db.query(QueryHistory)
+            .filter(QueryHistory.id > last_id)
+            .order_by(QueryHistory.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        for row in batch:
+            try:
+                result = AnalysisResult.model_validate_json(row.llm_response or "")
+            except ValueError:
+                continue
+            db_type = row.connection.db_type if row.connection else None
+            tables = list(analyze_sql(row.sql_query, db_type).table_names)
+            db.add_all(index_rows(row.id, result, tables, db_type, row.created_at))
+            rows += 1
+        db.commit()
+        last_id = batch[-1].id
+    if rows:
+        logger.info("Indexed suggestions for %d query history rows", rows)
+    return rows
+
+
+def find_suggestions(
+    db: Session,
+    *,
+    category: str | None = None,
+    impact: str | None = None,
+    table: str | None = None,
+    index_type: str | None = None,
+    root_cause: str | None = None,
+    connection_id: str | None = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[Suggestion]:
+    """Stored suggestions matching every given filter, newest first."""
+    query = db.query(Suggestion)
+    if category:
+        query = query.filter(Suggestion.category == category)
+    if impact:
+        query = query.filter(Suggestion.estimated_impact == impact.lower())
+    if index_type:
+        query = query.filter(Suggestion.index_type == index_type)
+    if root_cause:
+        query = query.filter(Suggestion.root_cause == root_cause)
+    if table:
+        query = query.filter(Suggestion.query_id.in_(
+            db.query(QueryTable.query_id).filter(QueryTable.table_name == table.lower())
+        ))
+    if connection_id:
+        query = query.filter(Suggestion.query_id.in_(
+            db.query(QueryHistory.id).filter(QueryHistory.connection_id == connection_id)
+        ))
+    return query.order_by(Suggestion.created_at.desc(), Suggestion.id.desc()).offset(offset).limit(limit).all()
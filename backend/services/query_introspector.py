@@ -1,46 +1,26 @@
 """Extract table names from SQL and gather schema + explain info from the database."""
 
 import logging
-import re
-
-import sqlglot
-import sqlglot.expressions as exp
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from connectors.base import BaseConnector, ExplainResult, TableSchema
 from core.config import settings
+from services.schema_cache import schema_cache
+from services.sql_normalizer import analyze_sql
 
 logger = logging.getLogger(__name__)
 
+# Shared workers for catalog fetches that overlap with EXPLAIN ANALYZE
+_catalog_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="catalog")
+
 
-def extract_table_names(sql: str) -> list[str]:
-    """Parse the SQL and return all referenced table names (lowercase, deduplicated).
+def extract_table_names(sql: str, db_type: str | None = None) -> list[str]:
+    """Return all referenced table names (lowercase, deduplicated, sorted).
 
-    Falls back to a simple regex scan if sqlglot cannot parse the dialect.
+    Served from the shared parse cache; falls back to a lenient parse and
+    then a regex scan if sqlglot cannot parse the dialect.
     """
-    try:
-        tree = sqlglot.parse_one(sql, error_level=sqlglot.ErrorLevel.WARN)
-        tables = {
-            node.name.lower()
-            for node in tree.find_all(exp.Table)
-            if node.name
-        }
-        if tables:
-            return sorted(tables)
-    except Exception as exc:
-        logger.debug("sqlglot parsing failed (%s), falling back to regex", exc)
-
-    # Regex fallback: match FROM/JOIN <identifier>
-    pattern = re.compile(
-        r"(?:FROM|JOIN)\s+([`\"]?[\w]+[`\"]?(?:\.[`\"]?[\w]+[`\"]?)?)",
-        re.IGNORECASE,
-    )
-    tables = set()
-    for match in pattern.finditer(sql):
-        raw = match.group(1).strip("`\"")
-        # Strip schema prefix if present (schema.table → table)
-        table = raw.split(".")[-1].lower()
-        tables.add(table)
-    return sorted(tables)
+    return list(analyze_sql(sql, db_type).table_names)
 
 
 class QueryIntrospectionResult:
@@ -64,16 +44,37 @@ class QueryIntrospectionResult:
 
 
 class QueryIntrospector:
-    """Orchestrates EXPLAIN ANALYZE + schema collection for a query."""
+    """Orchestrates EXPLAIN ANALYZE + schema collection for a query.
+
+    When a second ``catalog_connector`` session is supplied, the catalog
+    fetch runs on it in a worker thread while EXPLAIN ANALYZE runs on the
+    primary session, so wall time is max(explain, catalog) rather than the sum.
+    """
 
-    def __init__(self, connector: BaseConnector) -> None:
+    def __init__(
+        self,
+        connector: BaseConnector,
+        connection_id: str | None = None,
+        catalog_connector: BaseConnector | None = None,
+        db_type: str | None = None,
+    ) -> None:
         self._connector = connector
+        self._db_type = db_type  # parse dialect
+        # Stored connections get their schemas served from the versioned cache
+        self._connection_id = connection_id
+        self._catalog_connector = catalog_connector
 
     def introspect(self, sql: str) -> QueryIntrospectionResult:
-        table_names = extract_table_names(sql)
+        table_names = extract_table_names(sql, self._db_type)
         logger.info("Detected tables: %s", table_names)
 
-        # 1. Run EXPLAIN ANALYZE
+        schema_future: Future[list[TableSchema]] | None = None
+        if self._catalog_connector is not None and table_names:
+            schema_future = _catalog_executor.submit(
+                self._fetch_schemas, self._catalog_connector, table_names
+            )
+
+        # 1. Run EXPLAIN ANALYZE (statement_timeout / read-only enforced by the connector)
         explain: ExplainResult | None = None
         explain_error: str | None = None
         try:
@@ -81,20 +82,44 @@ class QueryIntrospector:
         except Exception as exc:
             logger.warning("EXPLAIN ANALYZE failed: %s", exc)
             explain_error = str(exc).strip()
-
-        # 2. Fetch schema + stats for each referenced table
-        table_schemas: list[TableSchema] = []
-        for table in table_names:
-            try:
-                schema = self._connector.get_table_schema(table)
-                table_schemas.append(schema)
-            except Exception as exc:
-                logger.warning("Could not fetch schema for %r: %s", table, exc)
+        finally:
+            # 2. Fetch schema + stats for all referenced tables in one batch.
+            # Always wait for the worker so the catalog session is idle
+            # before the caller hands it back to the pool.
+            if schema_future is not None:
+                table_schemas = schema_future.result()
+            else:
+                table_schemas = self._fetch_schemas(self._connector, table_names)
 
         return QueryIntrospectionResult(
             sql=sql,
             explain=explain,
             table_schemas=table_schemas,
             table_names=table_names,
+            db_type=self._db_type,
             explain_error=explain_error,
         )
+
+    def _fetch_schemas(
+        self, connector: BaseConnector, table_names: list[str]
+    ) -> list[TableSchema]:
+        """Batched catalog fetch, falling back to per-table lookups on failure."""
+        try:
+            if self._connection_id:
+                return schema_cache.get_schemas(self._connection_id, connector, table_names)
+            return connector.get_table_schemas(table_names)
+        except Exception as exc:
+            logger.warning("Bulk schema fetch failed (%s), retrying per table", exc)
+            try:
+                connector.reset()  # clear the aborted transaction
+            except Exception:
+                return []
+
+        table_schemas: list[TableSchema] = []
+        for table in table_names:
+            try:
+                schema = connector.get_table_schema(table)
+                table_schemas.append(schema)
+            except Exception as exc:
+                logger.warning("Could not fetch schema for %r: %s", table, exc)
+        return table_schemas
@@ -0,0 +1,111 @@
+"""LRU cache of TableSchema objects, validated against cheap catalog version tokens."""
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from connectors.base import BaseConnector, TableSchema
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (connection_id, table)
+_Key = tuple[str, str]
+
+
+@dataclass
+class SchemaCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+    evictions: int = 0
+
+
+class SchemaCache:
+    """Size-bounded LRU of table schemas keyed by (connection_id, table).
+
+    Each lookup costs one version query against the target database; only
+    tables whose version token changed (or that were never seen) are refetched.
+    Tables that do not exist are cached as absent so CTE names and typos do not
+    trigger a catalog fetch on every request.
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[_Key, tuple[str | None, TableSchema]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = SchemaCacheStats()
+
+    def get_schemas(
+        self,
+        connection_id: str,
+        connector: BaseConnector,
+        table_names: list[str],
+    ) -> list[TableSchema]:
+        if self._max_entries <= 0 or not table_names:
+            return connector.get_table_schemas(table_names)
+
+        try:
+            versions = connector.get_table_versions(table_names)
+        except Exception as exc:
+            logger.warning("Schema version check failed (%s), bypassing cache", exc)
+            connector.reset()
+            versions = None
+        if versions is None:
+            return connector.get_table_schemas(table_names)
+
+        found: dict[str, TableSchema] = {}
+        missing: list[str] = []
+        with self._lock:
+            for table in table_names:
+                key = (connection_id, table)
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == versions.get(table):
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    found[table] = entry[1]
+                    continue
+                if entry is not None:
+                    self.stats.stale += 1
+                self.stats.misses += 1
+                missing.append(table)
+
+        if missing:
+            fetched = connector.get_table_schemas(missing)
+            with self._lock:
+                for table, ts in zip(missing, fetched):
+                    self._put((connection_id, table), versions.get(table), ts)
+                    found[table] = ts
+
+        return [found[t] for t in table_names]
+
+    def invalidate(self, connection_id: str) -> None:
+        """Drop every cached table for a connection."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == connection_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.stats = SchemaCacheStats()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                **asdict(self.stats),
+            }
+
+    def _put(self, key: _Key, version: str | None, ts: TableSchema) -> None:
+        self._entries[key] = (version, ts)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+
+schema_cache = SchemaCache(max_entries=settings.schema_cache_max_entries)
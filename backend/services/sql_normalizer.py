@@ -0,0 +1,264 @@
+"""Parse SQL once and derive fingerprints, tables, columns, predicates and join keys.
+
+``analyze_sql`` memoizes its result per (dialect, raw SQL) in a bounded LRU so
+cache keys, request coalescing, history grouping and table extraction all
+share one sqlglot parse per distinct statement.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import sqlglot
+import sqlglot.expressions as exp
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# OptimizeQL db_type → sqlglot dialect name
+SQLGLOT_DIALECTS: dict[str, str] = {
+    "postgresql": "postgres",
+    "mysql": "mysql",
+}
+
+# Regex fallback for table extraction: FROM/JOIN <identifier>
+_FROM_JOIN_RE = re.compile(
+    r"(?:FROM|JOIN)\s+([`\"]?[\w]+[`\"]?(?:\.[`\"]?[\w]+[`\"]?)?)",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class ParsedSQL:
+    """Everything derived from one parse of a statement.
+
+    ``tree`` is shared by every caller that hits the cache — copy it before
+    transforming. It is None when sqlglot could not parse the statement.
+    """
+    sql: str
+    dialect: str | None
+    tree: exp.Expression | None
+    normalized: str                         # literals replaced by ``?``
+    fingerprint: str                        # sha256 hex of ``normalized``
+    tables: tuple[str, ...]                 # lowercase, schema-qualified as written
+    table_names: tuple[str, ...]            # lowercase bare names for catalog lookups
+    columns: tuple[str, ...]                # "table.column" when qualified, else "column"
+    predicates: tuple[str, ...]             # WHERE / HAVING / JOIN ON conjuncts, literal-stripped
+    join_keys: tuple[tuple[str, str], ...]  # column pairs compared with "="
+
+
+@dataclass
+class ParseCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+# ── Parse cache ──────────────────────────────────────────────────────────────
+
+_lock = threading.Lock()
+_cache: "OrderedDict[str, ParsedSQL]" = OrderedDict()
+stats = ParseCacheStats()
+
+
+def analyze_sql(sql: str, db_type: str | None = None) -> ParsedSQL:
+    """Parse ``sql`` in the connection's dialect (memoized by raw SQL hash)."""
+    dialect = SQLGLOT_DIALECTS.get(db_type or "")
+    key = hashlib.sha256(f"{dialect or ''}\x1f{sql}".encode()).hexdigest()
+
+    with _lock:
+        parsed = _cache.get(key)
+        if parsed is not None:
+            _cache.move_to_end(key)
+            stats.hits += 1
+            return parsed
+        stats.misses += 1
+
+    parsed = _parse(sql, dialect)
+
+    max_entries = settings.sql_parse_cache_max_entries
+    if max_entries > 0:
+        with _lock:
+            _cache[key] = parsed
+            while len(_cache) > max_entries:
+                _cache.popitem(last=False)
+                stats.evictions += 1
+    return parsed
+
+
+def clear_parse_cache() -> None:
+    with _lock:
+        _cache.clear()
+
+
+def parse_cache_snapshot() -> dict[str, Any]:
+    """Size and hit / miss / eviction counters of the parse cache."""
+    with _lock:
+        return {
+            "entries": len(_cache),
+            "max_entries": settings.sql_parse_cache_max_entries,
+            **asdict(stats),
+        }
+
+
+def normalize_sql(sql: str, db_type: str | None = None) -> str:
+    """Return canonical SQL with every literal replaced by a ``?`` placeholder.
+
+    Falls back to lowercased, whitespace-collapsed text if sqlglot cannot parse it.
+    """
+    return analyze_sql(sql, db_type).normalized
+
+
+def fingerprint_sql(sql: str, db_type: str | None = None) -> str:
+    """Stable hex hash of the normalized SQL."""
+    return analyze_sql(sql, db_type).fingerprint
+
+
+def fingerprint_sql_uncached(sql: str, db_type: str | None = None) -> str:
+    """``fingerprint_sql`` without the parse cache, for bulk input such as slow
+    logs whose mostly one-off statements would evict the hot entries."""
+    dialect = SQLGLOT_DIALECTS.get(db_type or "")
+    _, normalized = _normalize(sql, dialect, _parse_tree(sql, dialect))
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+# ── Private helpers ──────────────────────────────────────────────────────────
+
+def _parse(sql: str, dialect: str | None) -> ParsedSQL:
+    tree = _parse_tree(sql, dialect)
+    stripped, normalized = _normalize(sql, dialect, tree)
+
+    if tree is None:
+        tables = _tables_lenient(sql, dialect)
+        return ParsedSQL(
+            sql=sql,
+            dialect=dialect,
+            tree=None,
+            normalized=normalized,
+            fingerprint=hashlib.sha256(normalized.encode()).hexdigest(),
+            tables=tables,
+            table_names=_bare_names(tables),
+            columns=(),
+            predicates=(),
+            join_keys=(),
+        )
+
+    tables = _tables(tree) or _tables_lenient(sql, dialect)
+    return ParsedSQL(
+        sql=sql,
+        dialect=dialect,
+        tree=tree,
+        normalized=normalized,
+        fingerprint=hashlib.sha256(normalized.encode()).hexdigest(),
+        tables=tables,
+        table_names=_bare_names(tables),
+        columns=_columns(tree),
+        predicates=_predicates(stripped, dialect),
+        join_keys=_join_keys(tree),
+    )
+
+
+def _parse_tree(sql: str, dialect: str | None) -> exp.Expression | None:
+    try:
+        return sqlglot.parse_one(sql, read=dialect)
+    except Exception as exc:
+        logger.debug("sqlglot parsing failed (%s), using fallbacks", exc)
+        return None
+
+
+def _normalize(
+    sql: str, dialect: str | None, tree: exp.Expression | None
+) -> tuple[exp.Expression | None, str]:
+    """(literal-stripped tree, its canonical SQL); whitespace-collapsed text if unparsable."""
+    if tree is None:
+        return None, " ".join(sql.lower().split())
+    stripped = tree.transform(
+        lambda node: exp.Placeholder() if isinstance(node, exp.Literal) else node
+    )
+    try:
+        return stripped, stripped.sql(dialect=dialect, normalize=True)
+    except Exception as exc:
+        logger.debug("sqlglot generation failed (%s), using whitespace fallback", exc)
+        return stripped, " ".join(sql.lower().split())
+
+
+def _tables(tree: exp.Expression) -> tuple[str, ...]:
+    names = {
+        ".".join(part for part in (t.catalog, t.db, t.name) if part).lower()
+        for t in tree.find_all(exp.Table)
+        if t.name
+    }
+    return tuple(sorted(names))
+
+
+def _tables_lenient(sql: str, dialect: str | None) -> tuple[str, ...]:
+    """Best-effort tables for SQL the strict parser rejects."""
+    try:
+        tree = sqlglot.parse_one(sql, read=dialect, error_level=sqlglot.ErrorLevel.WARN)
+        tables = _tables(tree) if tree is not None else ()
+        if tables:
+            return tables
+    except Exception as exc:
+        logger.debug("Lenient sqlglot parse failed (%s), falling back to regex", exc)
+
+    return tuple(sorted({
+        ".".join(part.strip("`\"") for part in match.group(1).split(".")).lower()
+        for match in _FROM_JOIN_RE.finditer(sql)
+    }))
+
+
+def _bare_names(tables: tuple[str, ...]) -> tuple[str, ...]:
+    return tuple(sorted({t.rsplit(".", 1)[-1] for t in tables}))
+
+
+def _column_ref(col: exp.Column) -> str:
+    return f"{col.table}.{col.name}".lower() if col.table else col.name.lower()
+
+
+def _columns(tree: exp.Expression) -> tuple[str, ...]:
+    return tuple(sorted({_column_ref(c) for c in tree.find_all(exp.Column) if c.name}))
+
+
+def _conjuncts(condition: exp.Expression) -> list[exp.Expression]:
+    if isinstance(condition, exp.Paren):
+        return _conjuncts(condition.this)
+    if isinstance(condition, exp.And):
+        return _conjuncts(condition.left) + _conjuncts(condition.right)
+    return [condition]
+
+
+def _predicates(tree: exp.Expression, dialect: str | None) -> tuple[str, ...]:
+    conditions: list[exp.Expression] = []
+    for clause in tree.find_all(exp.Where, exp.Having):
+        conditions.extend(_conjuncts(clause.this))
+    for join in tree.find_all(exp.Join):
+        on = join.args.get("on")
+        if on is not None:
+            conditions.extend(_conjuncts(on))
+
+    seen: dict[str, None] = {}
+    for cond in conditions:
+        try:
+            seen.setdefault(cond.sql(dialect=dialect, normalize=True), None)
+        except Exception:
+            continue
+    return tuple(seen)
+
+
+def _join_keys(tree: exp.Expression) -> tuple[tuple[str, str], ...]:
+    """Column pairs equated in JOIN ... ON or across tables in WHERE."""
+    keys: set[tuple[str, str]] = set()
+    for eq in tree.find_all(exp.EQ):
+        left, right = eq.left, eq.right
+        if not (isinstance(left, exp.Column) and isinstance(right, exp.Column)):
+            continue
+        a, b = _column_ref(left), _column_ref(right)
+        in_join = eq.find_ancestor(exp.Join) is not None
+        if in_join or (left.table and right.table and left.table != right.table):
+            keys.add(tuple(sorted((a, b))))
+    return tuple(sorted(keys))
@@ -0,0 +1,80 @@
+"""Rank a database's recorded workload by total time and store analysis reports."""
+
+import json
+import logging
+import re
+from dataclasses import asdict
+
+from sqlalchemy.orm import Session
+
+from api.models.orm import WorkloadReport
+from api.models.schemas import WorkloadReportEntry, WorkloadReportResponse, WorkloadStatement
+from connectors.base import StatementStat
+
+logger = logging.getLogger(__name__)
+
+# Statements with no query plan worth analyzing (transaction control, DDL, maintenance …)
+_UTILITY_RE = re.compile(
+    r"^\s*(?:BEGIN|COMMIT|ROLLBACK|START|SAVEPOINT|RELEASE|SET|SHOW|RESET|DISCARD|DEALLOCATE|"
+    r"PREPARE|EXECUTE|VACUUM|ANALYZE|EXPLAIN|CHECKPOINT|COPY|LISTEN|NOTIFY|LOCK|GRANT|REVOKE|"
+    r"CREATE|ALTER|DROP|TRUNCATE|USE|FLUSH|KILL|CALL)\b",
+    re.IGNORECASE,
+)
+
+
+def is_analyzable(query: str) -> bool:
+    return bool(query.strip()) and not _UTILITY_RE.match(query)
+
+
+def rank_workload(
+    stats: list[StatementStat], top_k: int
+) -> tuple[list[WorkloadStatement], float]:
+    """Top-K analyzable statements by total time, with their share of the sampled total."""
+    total_ms = sum(s.total_exec_time_ms for s in stats)
+    ranked = sorted(
+        (s for s in stats if is_analyzable(s.query)),
+        key=lambda s: s.total_exec_time_ms,
+        reverse=True,
+    )[:top_k]
+    return [
+        WorkloadStatement(
+            **asdict(s),
+            share_of_total=(s.total_exec_time_ms / total_ms) if total_ms else 0.0,
+        )
+        for s in ranked
+    ], total_ms
+
+
+def save_report(
+    db: Session,
+    connection_id: str,
+    source: str,
+    statements_sampled: int,
+    total_exec_time_ms: float,
+    entries: list[WorkloadReportEntry],
+) -> WorkloadReport:
+    report = WorkloadReport(
+        connection_id=connection_id,
+        source=source,
+        statements_sampled=statements_sampled,
+        total_exec_time_ms=total_exec_time_ms,
+        entries_json=json.dumps([e.model_dump(mode="json") for e in entries]),
+    )
+    db.add(report)
+    db.commit()
+    db.refresh(report)
+    return report
+
+
+def report_response(report: WorkloadReport) -> WorkloadReportResponse:
+    entries = [WorkloadReportEntry.model_validate(e) for e in json.loads(report.entries_json or "[]")]
+    return WorkloadReportResponse(
+        id=report.id,
+        connection_id=report.connection_id,
+        source=report.source,
+        statements_sampled=report.statements_sampled,
+        total_exec_time_ms=report.total_exec_time_ms,
+        created_at=report.created_at,
+        entries=entries,
+    )
+
@@ -1,5 +1,6 @@
 """Shared fixtures for the OptimizeQL test suite."""
 
+import asyncio
 import os
 import sys
 
@@ -22,6 +23,11 @@ os.environ["DATABASE_URL"] = "sqlite://"  # in-memory
 
 from core.database import Base, get_db
 from main import app
+from services.llm_health import llm_health
+from services.llm_latency import llm_latency
+from services.llm_providers.base import BaseLLMProvider
+from services.llm_scheduler import llm_scheduler
+from services.llm_usage import llm_usage
 
 from fastapi.testclient import TestClient
 
@@ -63,9 +69,13 @@ def db_session():
 @pytest.fixture()
 def client(db_session):
     """FastAPI TestClient with the DB session overridden."""
+    from services.llm_config_cache import invalidate_active_config
+
     def _override_get_db():
         yield db_session
 
+    # Cached LLM config may reference rows rolled back by an earlier test
+    invalidate_active_config()
     app.dependency_overrides[get_db] = _override_get_db
     with TestClient(app) as c:
         yield c
@@ -76,3 +86,57 @@ def client(db_session):
 def fernet_key():
     """Return the test Fernet key."""
     return _TEST_FERNET_KEY
+
+
+# ── LLM providers ────────────────────────────────────────────────────────────
+
+VALID_REPLY = '{"summary": "ok"}'
+
+
+class FakeProvider(BaseLLMProvider):
+    """Scripted provider: each call waits ``delay`` seconds, then returns (or raises)
+    the next of ``replies``; the last one repeats."""
+
+    def __init__(self, label: str = "fake/m", replies: list | None = None, delay: float = 0.0,
+                 quota_key: str | None = None):
+        self.label = label
+        self._model = label
+        self.quota_key = quota_key
+        self.replies = list(replies or [VALID_REPLY])
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = False
+
+    def _next(self) -> str:
+        reply = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    def generate(self, system_prompt, user_message, max_tokens):
+        self.calls += 1
+        return self._next()
+
+    async def agenerate(self, system_prompt, user_message, max_tokens):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self._next()
+
+
+def run_agenerate(provider: BaseLLMProvider) -> str:
+    return asyncio.run(provider.agenerate("sys", "user", 100))
+
+
+@pytest.fixture()
+def reset_llm_state():
+    """Clear the process-wide LLM health, latency, quota and usage registries around a test."""
+    registries = (llm_health, llm_latency, llm_scheduler, llm_usage)
+    for registry in registries:
+        registry.clear()
+    yield
+    for registry in registries:
+        registry.clear()
@@ -0,0 +1,59 @@
+"""Tests for the persistent analysis result cache."""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from api.models.orm import AnalysisCacheEntry
+from api.models.schemas import AnalysisResult
+from connectors.base import ExplainResult
+from services import analysis_cache
+from services.query_introspector import QueryIntrospectionResult
+
+
+def _introspection(sql: str, plan: str | None = None) -> QueryIntrospectionResult:
+    return QueryIntrospectionResult(
+        sql=sql,
+        explain=ExplainResult(plan, None, None) if plan else None,
+        table_schemas=[],
+        table_names=["users"],
+        db_type="postgresql",
+    )
+
+
+class TestCacheKey:
+    def test_literals_do_not_change_key(self):
+        a = analysis_cache.cache_key(_introspection("SELECT * FROM users WHERE id = 1"), "m")
+        b = analysis_cache.cache_key(_introspection("select *  from users where id = 99"), "m")
+        assert a == b
+
+    def test_plan_timings_do_not_change_key(self):
+        a = analysis_cache.cache_key(_introspection("SELECT 1", "Seq Scan on users (actual time=0.1..5.2)"), "m")
+        b = analysis_cache.cache_key(_introspection("SELECT 1", "Seq Scan on users (actual time=0.3..9.8)"), "m")
+        assert a == b
+
+    def test_model_and_plan_shape_change_key(self):
+        base = analysis_cache.cache_key(_introspection("SELECT 1", "Seq Scan on users"), "m")
+        assert analysis_cache.cache_key(_introspection("SELECT 1", "Seq Scan on users"), "other") != base
+        assert analysis_cache.cache_key(_introspection("SELECT 1", "Index Scan on users"), "m") != base
+
+
+class TestCacheStorage:
+    def test_lru_eviction(self, db_session):
+        with patch("services.analysis_cache.settings") as mock_settings:
+            mock_settings.analysis_cache_max_entries = 2
+            mock_settings.analysis_cache_ttl_s = 3600
+            for key in ("a", "b"):
+                analysis_cache.store(db_session, key, "m", AnalysisResult(query_id=key))
+            assert analysis_cache.lookup(db_session, "a") is not None  # "b" is now LRU
+            analysis_cache.store(db_session, "c", "m", AnalysisResult(query_id="c"))
+
+            assert analysis_cache.lookup(db_session, "b") is None
+            assert analysis_cache.lookup(db_session, "a") is not None
+            assert analysis_cache.lookup(db_session, "c") is not None
+
+    def test_expired_entry_is_a_miss(self, db_session):
+        analysis_cache.store(db_session, "old", "m", AnalysisResult(query_id="old"))
+        entry = db_session.get(AnalysisCacheEntry, "old")
+        entry.created_at = datetime.utcnow() - timedelta(days=365)
+        db_session.commit()
+        assert analysis_cache.lookup(db_session, "old") is None
@@ -1,6 +1,6 @@
 """Tests for /api/v1/analyze endpoints."""
 
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 
 from api.models.schemas import AnalysisResult
 
@@ -15,7 +15,8 @@ class TestAnalyzeAPI:
         )
         with patch("api.routes.analyze.LLMAnalyzer") as MockAnalyzer:
             instance = MockAnalyzer.return_value
-            instance.analyze.return_value = mock_result
+            instance.model_label.return_value = "test-model"
+            instance.aanalyze = AsyncMock(return_value=mock_result)
             resp = client.post("/api/v1/analyze", json={"sql": "SELECT * FROM users"})
 
         assert resp.status_code == 200
@@ -23,6 +24,35 @@ class TestAnalyzeAPI:
         assert data["summary"] == "Test analysis"
         assert "users" in data["tables_analyzed"]
 
+    def test_cached_result_reused_for_different_literals(self, client):
+        mock_result = AnalysisResult(query_id="x", summary="Cached analysis", tables_analyzed=["users"])
+        with patch("api.routes.analyze.LLMAnalyzer") as MockAnalyzer:
+            instance = MockAnalyzer.return_value
+            instance.model_label.return_value = "test-model"
+            instance.aanalyze = AsyncMock(return_value=mock_result)
+            first = client.post("/api/v1/analyze", json={"sql": "SELECT * FROM users WHERE id = 1"})
+            second = client.post("/api/v1/analyze", json={"sql": "SELECT * FROM users WHERE id = 2"})
+
+        assert instance.aanalyze.await_count == 1
+        assert first.json()["cache_hit"] is False
+        assert second.json()["cache_hit"] is True
+        assert second.json()["summary"] == "Cached analysis"
+        assert second.json()["query_id"] != first.json()["query_id"]
+
+    def test_cache_bypass_and_only(self, client):
+        mock_result = AnalysisResult(query_id="x", summary="Fresh")
+        with patch("api.routes.analyze.LLMAnalyzer") as MockAnalyzer:
+            instance = MockAnalyzer.return_value
+            instance.model_label.return_value = "test-model"
+            instance.aanalyze = AsyncMock(return_value=mock_result)
+            miss = client.post("/api/v1/analyze", json={"sql": "SELECT 1 FROM t", "cache": "only"})
+            client.post("/api/v1/analyze", json={"sql": "SELECT 1 FROM t"})
+            bypass = client.post("/api/v1/analyze", json={"sql": "SELECT 1 FROM t", "cache": "bypass"})
+
+        assert miss.status_code == 404
+        assert bypass.json()["cache_hit"] is False
+        assert instance.aanalyze.await_count == 2
+
     def test_analyze_empty_sql_rejected(self, client):
         resp = client.post("/api/v1/analyze", json={"sql": ""})
         assert resp.status_code == 422  # Pydantic validation error
@@ -44,3 +74,61 @@ class TestAnalyzeAPI:
         resp = client.get("/api/v1/analyze/history?limit=5")
         assert resp.status_code == 200
         assert len(resp.json()) <= 5
+
+
+class TestAnalyzeStream:
+    @staticmethod
+    def _events(resp) -> list[tuple[str, dict]]:
+        import json
+
+        events = []
+        for block in resp.text.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((lines["event"], json.loads(lines["data"])))
+        return events
+
+    def test_stream_emits_progress_items_and_result(self, client):
+        from api.models.schemas import SuggestionItem
+
+        result = AnalysisResult(query_id="x", summary="Streamed")
+
+        async def fake_stream(*args, **kwargs):
+            yield "summary", "Streamed"
+            yield "indexes", SuggestionItem(sql="CREATE INDEX i ON users (id)", explanation="e", estimated_impact="high")
+            yield "result", result
+
+        with patch("api.routes.analyze.LLMAnalyzer") as MockAnalyzer:
+            instance = MockAnalyzer.return_value
+            instance.model_label.return_value = "test-model"
+            instance.astream = fake_stream
+            resp = client.post("/api/v1/analyze/stream", json={"sql": "SELECT * FROM users"})
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = self._events(resp)
+        assert [e for e, _ in events] == ["progress", "progress", "progress", "summary", "suggestion", "result"]
+        assert events[1][1]["tables"] == ["users"]
+        assert events[4][1]["category"] == "indexes"
+        assert events[-1][1]["summary"] == "Streamed"
+
+        history = client.get("/api/v1/analyze/history").json()
+        assert history[0]["id"] == events[-1][1]["query_id"]
+
+    def test_stream_reports_errors_as_events(self, client):
+        with patch("api.routes.analyze.LLMAnalyzer") as MockAnalyzer:
+            MockAnalyzer.return_value.model_label.return_value = "test-model"
+            resp = client.post("/api/v1/analyze/stream", json={"sql": "SELECT 1 FROM t", "cache": "only"})
+        events = self._events(resp)
+        assert events[-1] == ("error", {"status_code": 404, "detail": "No cached analysis for this query"})
+
+    def test_stream_without_result_reports_an_error(self, client):
+        async def truncated_stream(*args, **kwargs):
+            yield "summary", "Cut off"
+
+        with patch("api.routes.analyze.LLMAnalyzer") as MockAnalyzer:
+            instance = MockAnalyzer.return_value
+            instance.model_label.return_value = "test-model"
+            instance.astream = truncated_stream
+            resp = client.post("/api/v1/analyze/stream", json={"sql": "SELECT * FROM users", "cache": "bypass"})
+        events = self._events(resp)
+        assert events[-1] == ("error", {"status_code": 502, "detail": "The model stream ended without a result"})
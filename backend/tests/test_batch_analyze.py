@@ -0,0 +1,94 @@
+"""Tests for POST /analyze/batch."""
+
+import json
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from api.models.schemas import AnalysisResult
+
+
+def _events(resp) -> list[tuple[str, dict]]:
+    events = []
+    for block in resp.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestBatchAnalyze:
+    def test_streams_one_result_per_query(self, client):
+        async def fake_analyze(introspection, query_id, provider_override=None):
+            return AnalysisResult(query_id=query_id, summary=f"tables={introspection.table_names}")
+
+        with patch("api.routes.analyze.LLMAnalyzer") as MockAnalyzer:
+            instance = MockAnalyzer.return_value
+            instance.model_label.return_value = "test-model"
+            instance.aanalyze = AsyncMock(side_effect=fake_analyze)
+            resp = client.post("/api/v1/analyze/batch", json={
+                "queries": ["SELECT * FROM a", "SELECT * FROM b", "SELECT * FROM c"],
+                "cache": "bypass",
+            })
+
+        assert resp.status_code == 200
+        events = _events(resp)
+        results = {data["index"]: data["result"] for name, data in events if name == "result"}
+        assert results[1]["summary"] == "tables=['b']"
+        assert len({r["query_id"] for r in results.values()}) == 3
+        assert events[-1] == ("done", {"total": 3, "succeeded": 3, "failed": 0})
+        assert len(client.get("/api/v1/analyze/history").json()) == 3
+
+    def test_per_query_errors_do_not_abort_batch(self, client):
+        with patch("api.routes.analyze.LLMAnalyzer") as MockAnalyzer:
+            instance = MockAnalyzer.return_value
+            instance.model_label.return_value = "test-model"
+            instance.aanalyze = AsyncMock(side_effect=[RuntimeError("provider down")])
+            resp = client.post("/api/v1/analyze/batch", json={"queries": ["SELECT 1 FROM t"], "cache": "bypass"})
+
+        events = _events(resp)
+        assert events[0][0] == "error"
+        assert events[0][1]["status_code"] == 502
+        assert events[-1][1]["failed"] == 1
+
+    def test_cancelled_query_does_not_abort_batch(self, client):
+        import asyncio
+
+        async def fake_analyze(introspection, query_id, provider_override=None):
+            if introspection.table_names == ["a"]:
+                raise asyncio.CancelledError
+            return AnalysisResult(query_id=query_id)
+
+        with patch("api.routes.analyze.LLMAnalyzer") as MockAnalyzer:
+            instance = MockAnalyzer.return_value
+            instance.model_label.return_value = "test-model"
+            instance.aanalyze = AsyncMock(side_effect=fake_analyze)
+            resp = client.post("/api/v1/analyze/batch", json={
+                "queries": ["SELECT * FROM a", "SELECT * FROM b"], "cache": "bypass",
+            })
+
+        events = _events(resp)
+        errors = [data for name, data in events if name == "error"]
+        assert errors == [{"index": 0, "status_code": 503, "detail": "Analysis was cancelled before it finished"}]
+        assert events[-1] == ("done", {"total": 2, "succeeded": 1, "failed": 1})
+
+    def test_rejects_oversized_and_empty_batches(self, client):
+        with patch("api.routes.analyze.settings") as mock_settings:
+            mock_settings.batch_max_queries = 1
+            resp = client.post("/api/v1/analyze/batch", json={"queries": ["SELECT 1", "SELECT 2"]})
+        assert resp.status_code == 400
+        assert client.post("/api/v1/analyze/batch", json={"queries": []}).status_code == 422
+        assert client.post("/api/v1/analyze/batch", json={"queries": ["  "]}).status_code == 422
+
+    def test_schema_prefetch_covers_every_table_once(self):
+        from api.routes.analyze import _warm_schema_cache
+
+        connector = MagicMock()
+        pool = MagicMock()
+
+        @contextmanager
+        def connection(block=True):
+            yield connector
+
+        pool.connection.side_effect = connection
+        with patch("api.routes.analyze.schema_cache") as cache:
+            _warm_schema_cache(pool, "c1", "postgresql", ["SELECT * FROM a JOIN b ON a.id = b.id", "SELECT * FROM b"])
+        cache.get_schemas.assert_called_once_with("c1", connector, ["a", "b"])
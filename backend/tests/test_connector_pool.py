@@ -0,0 +1,147 @@
+"""Tests for the per-connection connector pool."""
+
+import threading
+import time
+
+import pytest
+
+from services.connector_pool import ConnectorPool, PoolTimeoutError
+
+
+class FakeConnector:
+    def __init__(self) -> None:
+        self.alive = True
+        self.closed = False
+        self.resets = 0
+
+    def test_connection(self) -> bool:
+        return self.alive
+
+    def reset(self) -> None:
+        if not self.alive:
+            raise RuntimeError("connection lost")
+        self.resets += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _pool(**kwargs) -> tuple[ConnectorPool, list[FakeConnector]]:
+    created: list[FakeConnector] = []
+
+    def factory() -> FakeConnector:
+        c = FakeConnector()
+        created.append(c)
+        return c
+
+    return ConnectorPool(factory, **kwargs), created
+
+
+class TestConnectorPool:
+    def test_reuses_released_session(self):
+        pool, created = _pool()
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+        assert first is second
+        assert len(created) == 1
+        assert pool.stats.checkouts == 2
+        assert pool.stats.creates == 1
+
+    def test_dead_session_replaced_on_checkout(self):
+        pool, created = _pool()
+        with pool.connection() as first:
+            pass
+        first.alive = False
+        with pool.connection() as second:
+            assert second is not first
+        assert first.closed
+        assert pool.stats.discards == 1
+        assert pool.snapshot()["size"] == 1
+
+    def test_max_size_blocks_then_times_out(self):
+        pool, _ = _pool(max_size=1, checkout_timeout_s=0.05)
+        held = pool.acquire()
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+        assert pool.stats.waits == 1
+        assert pool.stats.timeouts == 1
+        pool.release(held)
+
+    def test_non_blocking_acquire_returns_none_when_exhausted(self):
+        pool, _ = _pool(max_size=1)
+        held = pool.acquire()
+        assert pool.acquire(block=False) is None
+        assert pool.stats.waits == 0
+        pool.release(held)
+        assert pool.acquire(block=False) is held
+
+    def test_waiter_receives_released_session(self):
+        pool, created = _pool(max_size=1, checkout_timeout_s=2)
+        held = pool.acquire()
+        got: list[FakeConnector] = []
+        t = threading.Thread(target=lambda: got.append(pool.acquire()))
+        t.start()
+        pool.release(held)
+        t.join(timeout=2)
+        assert got == [held]
+        assert len(created) == 1
+
+    def test_idle_eviction_keeps_min_size(self):
+        pool, created = _pool(min_size=1, max_size=3, idle_timeout_s=0)
+        a, b = pool.acquire(), pool.acquire()
+        pool.release(a)
+        pool.release(b)
+        pool.acquire()
+        assert pool.stats.evictions == 1
+        assert sum(c.closed for c in created) == 1
+
+    def test_evicted_sessions_close_outside_the_lock(self):
+        pool, _ = _pool(min_size=0, idle_timeout_s=0)
+        held = pool.acquire()
+        held.close = lambda: closed_under_lock.append(pool._cond._is_owned())
+        closed_under_lock: list[bool] = []
+        pool.release(held)
+        pool.acquire()
+        assert closed_under_lock == [False]
+
+    def test_first_checkout_prewarms_to_min_size(self):
+        pool, created = _pool(min_size=3, max_size=4)
+        pool.acquire()
+        deadline = time.monotonic() + 2
+        while pool.snapshot()["idle"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        snap = pool.snapshot()
+        assert (snap["size"], snap["idle"], len(created)) == (3, 2, 3)
+
+    def test_close_retires_checked_out_sessions(self):
+        pool, _ = _pool()
+        held = pool.acquire()
+        pool.close()
+        pool.release(held)
+        assert held.closed
+        assert pool.snapshot()["size"] == 0
+        with pytest.raises(RuntimeError):
+            pool.acquire()
+
+    def test_failed_create_frees_slot(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            if len(calls) == 1:
+                raise ConnectionError("refused")
+            return FakeConnector()
+
+        pool = ConnectorPool(factory, max_size=1)
+        with pytest.raises(ConnectionError):
+            pool.acquire()
+        assert pool.acquire() is not None
+
+
+class TestPoolStatsEndpoint:
+    def test_pool_stats_returns_list(self, client):
+        resp = client.get("/api/v1/connections/pool-stats")
+        assert resp.status_code == 200
+        assert isinstance(resp.json(), list)
@@ -0,0 +1,112 @@
+"""Tests for hedged LLM calls and the latency history behind the hedge delay."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from api.models.orm import LLMConfig
+from api.models.schemas import AnalyzeRequest
+from core.encryption import encrypt
+from services import analysis_cache
+from services.llm_analyzer import LLMAnalyzer, looks_like_json
+from services.llm_config_cache import invalidate_active_config
+from services.llm_latency import LatencyHistory, hedge_delay, llm_latency
+from services.llm_providers.hedged import HedgedProvider
+from services.query_introspector import QueryIntrospectionResult
+from tests.conftest import VALID_REPLY, FakeProvider, run_agenerate
+
+@pytest.fixture(autouse=True)
+def _fast_hedge(reset_llm_state):
+    with patch("services.llm_latency.settings.llm_hedge_initial_delay_s", 0.05), \
+         patch("services.llm_latency.settings.llm_hedge_min_delay_s", 0.01):
+        yield
+
+
+class TestLatencyHistory:
+    def test_quantile_needs_min_samples(self):
+        history = LatencyHistory(window=10)
+        for s in (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11):
+            history.record("p/m", float(s))
+        assert history.quantile("p/m", 0.9, min_samples=20) is None
+        assert history.quantile("p/m", 0.9) == 10.0  # window keeps 2..11
+        assert history.quantile("p/m", 0.5) == 6.0
+
+    def test_hedge_delay_uses_observed_quantile(self):
+        with patch("services.llm_latency.settings.llm_hedge_min_samples", 3):
+            assert hedge_delay("p/m") == 0.05
+            for s in (0.2, 0.3, 0.4):
+                llm_latency.record("p/m", s)
+            assert hedge_delay("p/m") == 0.4
+
+
+class TestHedgedProvider:
+    def test_fast_primary_never_hedges(self):
+        primary, standby = FakeProvider("a"), FakeProvider("b")
+        assert run_agenerate(HedgedProvider(primary, [standby], accept=looks_like_json)) == VALID_REPLY
+        assert standby.calls == 0
+        assert llm_latency.snapshot()["a"]["samples"] == 1
+
+    def test_slow_primary_loses_to_standby(self):
+        primary = FakeProvider("a", delay=2.0)
+        standby = FakeProvider("b", ['{"summary": "standby"}'])
+        assert run_agenerate(HedgedProvider(primary, [standby], accept=looks_like_json)) == '{"summary": "standby"}'
+        assert primary.cancelled
+        assert "a" not in llm_latency.snapshot()  # cancelled calls are not samples
+
+    def test_invalid_json_brings_in_standby_immediately(self):
+        primary = FakeProvider("a", ["I cannot help with that"])
+        standby = FakeProvider("b")
+        assert run_agenerate(HedgedProvider(primary, [standby], accept=looks_like_json)) == VALID_REPLY
+
+    def test_falls_back_to_text_then_raises(self):
+        garbled = FakeProvider("a", ["not json"])
+        failing = FakeProvider("b", [RuntimeError("503")])
+        assert run_agenerate(HedgedProvider(garbled, [failing], accept=looks_like_json)) == "not json"
+
+        with pytest.raises(RuntimeError, match="503"):
+            run_agenerate(HedgedProvider(FakeProvider("c", [RuntimeError("503")]), [failing]))
+
+    def test_standby_answer_is_attributed_and_cached_under_its_model(self, db_session, monkeypatch):
+        from api.routes.analyze import _analyze_introspected
+
+        monkeypatch.setattr(LLMAnalyzer, "_instance", None)
+        with patch("services.llm_analyzer.get_provider", return_value=MagicMock()):
+            LLMAnalyzer()
+        provider = HedgedProvider(FakeProvider("a", delay=2.0), [FakeProvider("b")], accept=looks_like_json)
+        introspection = QueryIntrospectionResult(
+            sql="SELECT 1", explain=None, table_schemas=[], table_names=[], db_type="postgresql"
+        )
+
+        result = asyncio.run(
+            _analyze_introspected(AnalyzeRequest(sql="SELECT 1"), db_session, introspection, provider)
+        )
+        assert result.model == "b"
+        assert analysis_cache.lookup(db_session, analysis_cache.cache_key(introspection, "b")) is not None
+        assert analysis_cache.lookup(db_session, analysis_cache.cache_key(introspection, "a")) is None
+
+
+class TestResolveProvider:
+    def setup_method(self):
+        invalidate_active_config()
+
+    def teardown_method(self):
+        invalidate_active_config()
+
+    def test_standby_configs_wrap_active_provider(self, db_session):
+        from api.routes.analyze import _resolve_provider
+
+        db_session.add_all([
+            LLMConfig(name="main", provider="openai", encrypted_api_key=encrypt("sk-a"), is_active=True),
+            LLMConfig(name="spare", provider="anthropic", encrypted_api_key=encrypt("sk-b"), is_active=False),
+        ])
+        db_session.commit()
+
+        body = AnalyzeRequest(sql="SELECT 1", model="gpt-4.1")
+        with patch("api.routes.analyze.settings.llm_hedge_enabled", True):
+            provider = _resolve_provider(body, db_session)
+        assert isinstance(provider, HedgedProvider)
+        assert provider.label == "openai/gpt-4.1"
+        assert [p.label for p in provider.standbys] == ["anthropic/claude-sonnet-4-6"]
+
+        assert not isinstance(_resolve_provider(body, db_session), HedgedProvider)
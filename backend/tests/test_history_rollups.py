@@ -0,0 +1,74 @@
+"""Tests for the incremental dashboard rollups behind /analyze/stats."""
+
+from datetime import datetime, timedelta
+
+from api.models.orm import DailyAnalysisRollup, DailyTableRollup, QueryHistory
+from api.models.schemas import AnalysisResult, ConfigurationItem, SuggestionItem
+from services.history_rollups import dashboard_stats, rebuild_rollups, record_analysis
+from services.query_history import backfill_fingerprints, rebuild_suggestion_index
+
+
+def _result(high: int = 0, low: int = 0, tables: list[str] | None = None) -> AnalysisResult:
+    return AnalysisResult(
+        query_id="q",
+        indexes=[SuggestionItem(explanation="x", estimated_impact="high")] * high,
+        rewrites=[SuggestionItem(explanation="y", estimated_impact="low")] * low,
+        configuration=[ConfigurationItem(
+            parameter="work_mem", current_value="4MB", recommended_value="64MB",
+            explanation="z", estimated_impact="high",
+        )],
+        tables_analyzed=tables or [],
+    )
+
+
+class TestRecordAnalysis:
+    def test_increments_same_day(self, db_session):
+        today = datetime.utcnow().date()
+        record_analysis(db_session, today, _result(high=1, low=2), ["orders"])
+        record_analysis(db_session, today, _result(high=2), ["Orders", "users"])
+        db_session.commit()
+
+        day = db_session.get(DailyAnalysisRollup, today)
+        assert (day.analysis_count, day.suggestion_count, day.high_impact_count) == (2, 7, 5)
+        assert db_session.get(DailyTableRollup, (today, "orders")).count == 2
+
+    def test_dashboard_reads_rollups(self, db_session):
+        today = datetime.utcnow().date()
+        record_analysis(db_session, today - timedelta(days=1), _result(high=1), ["orders"])
+        # No parsed tables: falls back to what the LLM reported
+        record_analysis(db_session, today, _result(low=1, tables=["orders", "users"]), [])
+        record_analysis(db_session, today - timedelta(days=3), _result(), [])
+        db_session.commit()
+
+        stats = dashboard_stats(db_session)
+        assert stats.total_queries == 3
+        assert stats.total_suggestions == 5
+        assert stats.high_impact_count == 4
+        assert stats.streak_days == 2
+        assert stats.top_categories[0].category == "configuration"
+        assert [(t.table_name, t.count) for t in stats.most_analyzed_tables] == [("orders", 2), ("users", 1)]
+        assert [q.count for q in stats.queries_by_date] == [1, 1, 1]
+
+    def test_rebuild_from_existing_history(self, db_session):
+        db_session.add_all([
+            QueryHistory(id="a", sql_query="SELECT 1", created_at=datetime.utcnow(),
+                         llm_response=_result(high=1, tables=["t"]).model_dump_json()),
+            QueryHistory(id="b", sql_query="SELECT 2", created_at=datetime.utcnow(), llm_response="not json"),
+        ])
+        db_session.commit()
+
+        # Same order as the startup data migrations
+        backfill_fingerprints(db_session)
+        rebuild_suggestion_index(db_session)
+        assert rebuild_rollups(db_session) == 2
+        assert rebuild_rollups(db_session) == 0  # already populated
+        stats = dashboard_stats(db_session)
+        assert (stats.total_queries, stats.total_suggestions, stats.high_impact_count) == (2, 2, 2)
+        assert [(t.table_name, t.count) for t in stats.most_analyzed_tables] == [("t", 1)]
+        assert stats.queries_by_date[-1].date == datetime.utcnow().date().isoformat()
+
+
+def test_stats_endpoint(client):
+    resp = client.get("/api/v1/analyze/stats")
+    assert resp.status_code == 200
+    assert resp.json()["total_queries"] == 0
@@ -0,0 +1,145 @@
+"""Tests for background analysis jobs (/analyze?async=true)."""
+
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from api.models.orm import AnalysisJob
+from api.models.schemas import AnalysisResult
+from services.job_queue import AnalysisJobQueue, analysis_jobs
+
+
+@pytest.fixture()
+def job_client(client, db_session, monkeypatch):
+    monkeypatch.setattr(analysis_jobs, "_session_factory", lambda: db_session)
+    return client
+
+
+def _wait_for(client, job_id: str, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/v1/analyze/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed", "cancelled"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class TestAnalysisJobs:
+    def test_async_analyze_returns_job_then_result(self, job_client):
+        mock_result = AnalysisResult(query_id="x", summary="Background analysis")
+        with patch("api.routes.analyze.LLMAnalyzer") as MockAnalyzer:
+            instance = MockAnalyzer.return_value
+            instance.model_label.return_value = "test-model"
+            instance.aanalyze = AsyncMock(return_value=mock_result)
+            resp = job_client.post("/api/v1/analyze?async=true", json={"sql": "SELECT * FROM users"})
+            assert resp.status_code == 202
+            assert resp.json()["status"] == "queued"
+            job = _wait_for(job_client, resp.json()["job_id"])
+
+        assert job["status"] == "succeeded"
+        assert job["result"]["summary"] == "Background analysis"
+        assert job["queue_wait_ms"] is not None
+
+        stats = job_client.get("/api/v1/analyze/jobs/stats").json()
+        assert stats["succeeded"] >= 1
+        assert stats["queued_total"] == 0
+
+    def test_cancel_queued_job(self, client, db_session):
+        job = AnalysisJobQueue._create_job(db_session)
+        resp = client.post(f"/api/v1/analyze/jobs/{job.id}/cancel")
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "cancelled"
+        # A cancelled job is never claimed by a worker
+        assert AnalysisJobQueue._mark_running(db_session, job.id) is None
+
+    def test_running_job_cannot_be_cancelled(self, client, db_session):
+        job = AnalysisJobQueue._create_job(db_session)
+        assert AnalysisJobQueue._mark_running(db_session, job.id) is not None
+        resp = client.post(f"/api/v1/analyze/jobs/{job.id}/cancel")
+        assert resp.status_code == 409
+
+    def test_unknown_job_is_404(self, client):
+        assert client.get("/api/v1/analyze/jobs/nope").status_code == 404
+        assert client.post("/api/v1/analyze/jobs/nope/cancel").status_code == 404
+
+    def test_recover_fails_orphaned_jobs(self, db_session):
+        orphan, live = AnalysisJobQueue._create_job(db_session), AnalysisJobQueue._create_job(db_session)
+        AnalysisJobQueue._mark_running(db_session, orphan.id)
+        AnalysisJobQueue._mark_running(db_session, live.id)
+        db_session.get(AnalysisJob, orphan.id).started_at = datetime.utcnow() - timedelta(days=1)
+        db_session.commit()
+
+        assert analysis_jobs.recover(db_session) == 1
+        db_session.expire_all()
+        assert db_session.get(AnalysisJob, orphan.id).status == "failed"
+        assert db_session.get(AnalysisJob, live.id).status == "running"
+
+        # A job failed as orphaned is not flipped back when its runner finishes later
+        AnalysisJobQueue._finish(db_session, orphan.id, "succeeded", "{}", None)
+        db_session.expire_all()
+        assert db_session.get(AnalysisJob, orphan.id).status == "failed"
+
+    def test_submit_does_not_fail_old_live_jobs(self, db_session):
+        old = AnalysisJobQueue._create_job(db_session)
+        db_session.get(AnalysisJob, old.id).created_at = datetime.utcnow() - timedelta(days=1)
+        db_session.commit()
+        AnalysisJobQueue._create_job(db_session)
+        db_session.expire_all()
+        assert db_session.get(AnalysisJob, old.id).status == "queued"
+
+    def test_cancelled_jobs_do_not_fill_the_queue(self, db_session):
+        import asyncio
+
+        async def never_runs(db):
+            raise AssertionError("cancelled job ran")
+
+        async def scenario() -> None:
+            queue = AnalysisJobQueue(workers=1, max_queue=1, session_factory=lambda: db_session)
+            blocker = asyncio.Event()
+
+            async def blocking(db):
+                await blocker.wait()
+                return AnalysisResult(query_id="x")
+
+            await queue.submit(db_session, blocking)
+            await asyncio.sleep(0.02)  # the only worker is now busy
+            job = await queue.submit(db_session, never_runs)
+            queue.cancel(db_session, job.id)
+            await queue.submit(db_session, blocking)  # would raise QueueFullError before
+            blocker.set()
+            await queue.shutdown()
+
+        asyncio.run(scenario())
+
+
+def test_background_jobs_yield_llm_quota_to_interactive_calls(db_session):
+    import asyncio
+
+    from services.llm_scheduler import LLMScheduler
+
+    scheduler = LLMScheduler()
+    order: list[str] = []
+
+    async def job_runner(db):
+        await scheduler.acquire("p:k", 1)
+        order.append("job")
+        return AnalysisResult(query_id="x")
+
+    async def scenario() -> None:
+        with patch("services.llm_scheduler.settings.llm_requests_per_minute", 600):
+            scheduler.acquire_sync("p:k", 1)
+        scheduler._quotas["p:k"].requests.tokens = 0  # saturated: next slot in 0.1s
+        queue = AnalysisJobQueue(workers=1, max_queue=5, session_factory=lambda: db_session)
+        await queue.submit(db_session, job_runner)
+        await asyncio.sleep(0.02)  # the job is now waiting for quota
+        await scheduler.acquire("p:k", 1)
+        order.append("interactive")
+        while "job" not in order:
+            await asyncio.sleep(0.02)
+        await queue.shutdown()
+
+    asyncio.run(scenario())
+    assert order == ["interactive", "job"]
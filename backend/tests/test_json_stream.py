@@ -0,0 +1,44 @@
+"""Tests for incremental parsing of streamed LLM output."""
+
+import json
+
+from services.json_stream import AnalysisStreamParser
+
+_RESPONSE = {
+    "summary": 'Seq scan on "orders" {big}',
+    "bottlenecks": [{"plan_node": "Seq Scan", "explanation": "brace } in text", "estimated_impact": "high"}],
+    "indexes": [
+        {"sql": "CREATE INDEX a ON t (x)", "explanation": '[nested] "quote" \\ done', "estimated_impact": "high"},
+        {"sql": "CREATE INDEX b ON t (y)", "explanation": "second", "estimated_impact": "low"},
+    ],
+    "rewrites": [],
+}
+
+
+def _feed_all(text: str, step: int) -> list:
+    parser = AnalysisStreamParser()
+    events = []
+    for i in range(0, len(text), step):
+        events.extend(parser.feed(text[i:i + step]))
+    assert parser.text == text
+    return events
+
+
+class TestAnalysisStreamParser:
+    def test_emits_items_regardless_of_chunking(self):
+        text = json.dumps(_RESPONSE, indent=2)
+        for step in (1, 7, len(text)):
+            events = _feed_all(text, step)
+            assert [e[0] for e in events] == ["summary", "bottlenecks", "indexes", "indexes"]
+            assert events[0][1] == _RESPONSE["summary"]
+            assert events[2][1]["sql"] == "CREATE INDEX a ON t (x)"
+
+    def test_item_emitted_as_soon_as_it_closes(self):
+        parser = AnalysisStreamParser()
+        assert parser.feed('{"summary": "s", "indexes": [{"sql": "x"') == [("summary", "s")]
+        assert parser.feed('}, {"sql": "y"') == [("indexes", {"sql": "x"})]
+
+    def test_skips_markdown_fence_and_nested_values(self):
+        text = '```json\n{"configuration": [{"parameter": "work_mem", "meta": {"a": [1, 2]}}]}\n```'
+        events = _feed_all(text, 3)
+        assert events == [("configuration", {"parameter": "work_mem", "meta": {"a": [1, 2]}})]
@@ -1,9 +1,13 @@
 """Tests for LLM response parsing in LLMAnalyzer."""
 
+import asyncio
 import json
+from unittest.mock import MagicMock, patch
 
 from api.models.schemas import AnalysisResult
-from services.llm_analyzer import _parse_configuration_list, _parse_suggestion_list
+from services.llm_analyzer import LLMAnalyzer, _parse_configuration_list, _parse_suggestion_list
+from services.llm_providers.base import BaseLLMProvider
+from services.query_introspector import QueryIntrospectionResult
 
 
 class TestParseSuggestionList:
@@ -77,3 +81,45 @@ class TestMarkdownFenceStripping:
         raw = '{"summary": "test"}'
         match = _FENCE_RE.match(raw)
         assert match is None
+
+
+class _FakeProvider(BaseLLMProvider):
+    _model = "fake-model"
+
+    def generate(self, system_prompt: str, user_message: str, max_tokens: int) -> str:
+        return '```json\n{"summary": "Seq scan on users", "indexes": [{"sql": "CREATE INDEX ...", "explanation": "x", "estimated_impact": "high"}]}\n```'
+
+
+class TestAsyncAnalyze:
+    def _introspection(self):
+        return QueryIntrospectionResult(
+            sql="SELECT * FROM users", explain=None, table_schemas=[], table_names=["users"]
+        )
+
+    def test_default_agenerate_runs_sync_generate(self):
+        text = asyncio.run(_FakeProvider().agenerate("sys", "user", 100))
+        assert "Seq scan" in text
+
+    def test_aanalyze_matches_analyze(self, monkeypatch):
+        monkeypatch.setattr(LLMAnalyzer, "_instance", None)
+        with patch("services.llm_analyzer.get_provider", return_value=MagicMock()):
+            analyzer = LLMAnalyzer()
+        provider = _FakeProvider()
+        sync_result = analyzer.analyze(self._introspection(), "q1", provider_override=provider)
+        async_result = asyncio.run(
+            analyzer.aanalyze(self._introspection(), "q1", provider_override=provider)
+        )
+        assert async_result == sync_result
+        assert async_result.indexes[0].estimated_impact == "high"
+
+    def test_unusable_response_is_flagged_degraded(self, monkeypatch):
+        monkeypatch.setattr(LLMAnalyzer, "_instance", None)
+        with patch("services.llm_analyzer.get_provider", return_value=MagicMock()):
+            analyzer = LLMAnalyzer()
+        for raw in ("", "Sorry, I can't help with that"):
+            result = analyzer._parse(raw, self._introspection(), "q1", "fake-model")
+            assert result.degraded and "fake-model" in result.summary
+
+        # A real answer that happens to open like the placeholder text is not degraded
+        result = analyzer._parse('{"summary": "The model (orders) lacks an index"}', self._introspection(), "q1", "m")
+        assert not result.degraded
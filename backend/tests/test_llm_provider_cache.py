@@ -0,0 +1,67 @@
+"""Tests for provider client reuse and the active LLM config cache."""
+
+from api.models.orm import LLMConfig
+from core.encryption import encrypt
+from services.llm_config_cache import get_active_config, invalidate_active_config
+from services.llm_providers import clear_provider_cache, get_provider
+
+
+class TestProviderRegistry:
+    def setup_method(self):
+        clear_provider_cache()
+
+    def test_same_key_and_model_reuses_instance(self):
+        a = get_provider("anthropic", api_key="sk-ant-one", model="claude-sonnet-4-6")
+        b = get_provider("anthropic", api_key="sk-ant-one", model="claude-sonnet-4-6")
+        assert a is b
+
+    def test_different_key_or_model_builds_new_instance(self):
+        a = get_provider("anthropic", api_key="sk-ant-one", model="claude-sonnet-4-6")
+        assert get_provider("anthropic", api_key="sk-ant-two", model="claude-sonnet-4-6") is not a
+        assert get_provider("anthropic", api_key="sk-ant-one", model="claude-opus-4-6") is not a
+
+    def test_quota_key_is_per_api_key_not_model(self):
+        a = get_provider("anthropic", api_key="sk-ant-one", model="claude-sonnet-4-6")
+        b = get_provider("anthropic", api_key="sk-ant-one", model="claude-opus-4-6")
+        c = get_provider("anthropic", api_key="sk-ant-two", model="claude-sonnet-4-6")
+        assert a.quota_key == b.quota_key != c.quota_key
+        assert a.quota_key.startswith("anthropic:") and "sk-ant" not in a.quota_key
+        assert a._client.max_retries == 0  # the scheduler owns 429 retries
+
+    def test_clear_drops_instances(self):
+        a = get_provider("openai", api_key="sk-one", model="gpt-4.1")
+        clear_provider_cache()
+        assert get_provider("openai", api_key="sk-one", model="gpt-4.1") is not a
+
+
+class TestActiveConfigCache:
+    def setup_method(self):
+        invalidate_active_config()
+
+    def teardown_method(self):
+        invalidate_active_config()
+
+    def test_cached_until_invalidated(self, db_session):
+        db_session.add(LLMConfig(
+            name="a", provider="openai", encrypted_api_key=encrypt("sk-first"), is_active=True,
+        ))
+        db_session.commit()
+        assert get_active_config(db_session).api_key == "sk-first"
+
+        db_session.query(LLMConfig).update({"encrypted_api_key": encrypt("sk-second")})
+        db_session.commit()
+        assert get_active_config(db_session).api_key == "sk-first"
+
+        invalidate_active_config()
+        assert get_active_config(db_session).api_key == "sk-second"
+
+    def test_no_active_config(self, db_session):
+        assert get_active_config(db_session) is None
+
+    def test_activate_endpoint_invalidates(self, client, db_session):
+        assert get_active_config(db_session) is None
+        created = client.post("/api/v1/llm-settings", json={
+            "name": "k", "provider": "openai", "api_key": "sk-activated-1234",
+        }).json()
+        client.post(f"/api/v1/llm-settings/{created['id']}/activate")
+        assert get_active_config(db_session).api_key == "sk-activated-1234"
@@ -0,0 +1,157 @@
+"""Tests for provider health tracking, circuit breakers and the routed provider."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from services.llm_analyzer import looks_like_json
+from services.llm_health import ProviderHealthRegistry, llm_health
+from services.llm_latency import llm_latency
+from services.llm_providers.base import responder_scope
+from services.llm_providers.routed import NoHealthyProviderError, RoutedProvider, backoff_delay
+from tests.conftest import VALID_REPLY, FakeProvider, run_agenerate
+
+@pytest.fixture(autouse=True)
+def _no_backoff(reset_llm_state):
+    with patch("services.llm_providers.routed.settings.llm_retry_base_delay_s", 0.0):
+        yield
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures_then_probes(self):
+        health = ProviderHealthRegistry(window=10)
+        for _ in range(3):
+            health.record("p/m", "error", "503")
+        assert health.snapshot()["p/m"]["state"] == "open"
+        assert not health.allow("p/m")
+
+        with patch("services.llm_health.settings.llm_breaker_cooldown_s", 0.0):
+            assert health.allow("p/m")        # the half-open probe
+            assert not health.allow("p/m")    # only one at a time
+            health.record("p/m", "ok")
+        assert health.snapshot()["p/m"]["state"] == "closed"
+
+    def test_failed_probe_reopens(self):
+        health = ProviderHealthRegistry(window=10)
+        with patch("services.llm_health.settings.llm_breaker_failure_threshold", 1), \
+             patch("services.llm_health.settings.llm_breaker_cooldown_s", 0.0):
+            health.record("p/m", "empty")
+            assert health.allow("p/m")
+            health.record("p/m", "empty")
+        snap = health.snapshot()["p/m"]
+        assert (snap["state"], snap["empty_rate"]) == ("open", 1.0)
+
+    def test_error_rate_trips_without_a_streak(self):
+        health = ProviderHealthRegistry(window=10)
+        for outcome in ["ok", "error"] * 5:
+            health.record("p/m", outcome)
+        assert health.snapshot()["p/m"]["state"] == "open"
+
+    def test_rank_prefers_fast_then_healthy(self):
+        a, b, c = FakeProvider("a", [VALID_REPLY]), FakeProvider("b", [VALID_REPLY]), FakeProvider("c", [VALID_REPLY])
+        llm_latency.record("a", 5.0)
+        llm_latency.record("b", 1.0)
+        assert llm_health.rank([a, b, c]) == [b, a, c]   # unknown latency keeps configured order
+        for _ in range(3):
+            llm_health.record("b", "error")
+        assert llm_health.rank([a, b, c]) == [a, c, b]
+
+
+class TestRoutedProvider:
+    def test_retries_onto_next_provider(self):
+        primary = FakeProvider("a", [RuntimeError("503")])
+        standby = FakeProvider("b", [VALID_REPLY])
+        assert run_agenerate(RoutedProvider([primary, standby], accept=looks_like_json)) == VALID_REPLY
+        snap = llm_health.snapshot()
+        assert snap["a"]["error_rate"] == 1.0 and snap["b"]["calls"] == 1
+
+    def test_reports_the_candidate_that_answered(self):
+        primary, standby = FakeProvider("a", [RuntimeError("503")]), FakeProvider("b", [VALID_REPLY])
+        with responder_scope() as responders:
+            RoutedProvider([primary, standby], accept=looks_like_json).generate("sys", "user", 100)
+        assert responders == [standby]
+
+    def test_empty_response_is_retried_and_counted(self):
+        flaky = FakeProvider("a", ["", VALID_REPLY])
+        assert run_agenerate(RoutedProvider([flaky], accept=looks_like_json)) == VALID_REPLY
+        assert flaky.calls == 2
+        assert llm_health.snapshot()["a"]["empty_rate"] == 0.5
+
+    def test_open_circuit_is_skipped(self):
+        broken, healthy = FakeProvider("a", [VALID_REPLY]), FakeProvider("b", [VALID_REPLY])
+        for _ in range(3):
+            llm_health.record("a", "error", "timeout")
+        assert RoutedProvider([broken, healthy]).generate("sys", "user", 100) == VALID_REPLY
+        assert broken.calls == 0
+
+    def test_gives_up_with_last_error_or_fallback(self):
+        with pytest.raises(RuntimeError, match="429"):
+            run_agenerate(RoutedProvider([FakeProvider("a", [RuntimeError("429")])]))
+        garbled = FakeProvider("b", ["not json"])
+        assert run_agenerate(RoutedProvider([garbled], accept=looks_like_json)) == "not json"
+        assert garbled.calls == 3
+
+    def test_all_circuits_open(self):
+        for _ in range(3):
+            llm_health.record("a", "error")
+        with pytest.raises(NoHealthyProviderError):
+            run_agenerate(RoutedProvider([FakeProvider("a", [VALID_REPLY])]))
+
+    def test_backoff_is_jittered_and_capped(self):
+        with patch("services.llm_providers.routed.settings.llm_retry_base_delay_s", 1.0), \
+             patch("services.llm_providers.routed.settings.llm_retry_max_delay_s", 4.0):
+            delays = [backoff_delay(5) for _ in range(50)]
+        assert all(0 <= d <= 4.0 for d in delays)
+        assert len(set(delays)) > 1
+
+
+def test_health_endpoint(client):
+    llm_health.record("openai/gpt-4.1", "error", "RateLimitError: 429")
+    body = client.get("/api/v1/llm-settings/health").json()
+    assert body == [{
+        "label": "openai/gpt-4.1", "calls": 1, "error_rate": 1.0, "empty_rate": 0.0, "state": "closed",
+        "consecutive_failures": 1, "last_error": "RateLimitError: 429", "p50_s": None,
+    }]
+
+
+def test_resolve_provider_routes_across_configs(db_session):
+    from api.models.orm import LLMConfig
+    from api.models.schemas import AnalyzeRequest
+    from api.routes.analyze import _resolve_provider
+    from core.encryption import encrypt
+    from services.llm_config_cache import invalidate_active_config
+
+    invalidate_active_config()
+    db_session.add_all([
+        LLMConfig(name="main", provider="openai", encrypted_api_key=encrypt("sk-a"), is_active=True),
+        LLMConfig(name="spare", provider="anthropic", encrypted_api_key=encrypt("sk-b"), is_active=False),
+    ])
+    db_session.commit()
+    body = AnalyzeRequest(sql="SELECT 1", model="gpt-4.1")
+    try:
+        # Off by default: the active config and the chosen model are used as-is
+        assert not isinstance(_resolve_provider(body, db_session), RoutedProvider)
+        with patch("api.routes.analyze.settings.llm_routing_enabled", True):
+            provider = _resolve_provider(body, db_session)
+    finally:
+        invalidate_active_config()
+    assert isinstance(provider, RoutedProvider)
+    assert [p.label for p in provider.candidates] == ["openai/gpt-4.1", "anthropic/claude-sonnet-4-6"]
+
+
+def test_cancelled_probe_is_released():
+    async def scenario() -> None:
+        routed = RoutedProvider([FakeProvider("a", delay=10)])
+        task = asyncio.ensure_future(routed.agenerate("sys", "user", 100))
+        await asyncio.sleep(0.01)
+        assert llm_health.snapshot()["a"]["state"] == "half_open"
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    for _ in range(3):
+        llm_health.record("a", "error")
+    with patch("services.llm_health.settings.llm_breaker_cooldown_s", 0.0):
+        asyncio.run(scenario())
+        assert llm_health.allow("a")  # the next call may probe again
@@ -0,0 +1,114 @@
+"""Tests for the provider-aware LLM call scheduler."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from services.llm_health import llm_health, tracked_agenerate
+from services.llm_scheduler import (
+    LLMScheduler,
+    Priority,
+    TokenBucket,
+    estimate_tokens,
+    llm_priority,
+    llm_scheduler,
+    retry_after,
+)
+from tests.conftest import FakeProvider
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, headers: dict):
+        super().__init__("429 Too Many Requests")
+        self.response = SimpleNamespace(headers=headers)
+
+
+def _fake(replies: list) -> FakeProvider:
+    return FakeProvider(replies=replies, quota_key="fake:abc")
+
+
+pytestmark = pytest.mark.usefixtures("reset_llm_state")
+
+
+class TestBudgets:
+    def test_token_bucket_refills_continuously(self):
+        bucket = TokenBucket(per_minute=60)
+        now = time.monotonic()
+        bucket.take(60)
+        assert bucket.wait_time(1, now) == pytest.approx(1.0, abs=0.01)
+        assert bucket.wait_time(1, now + 2) == 0.0
+        assert bucket.wait_time(500, now + 600) == 0.0  # oversized calls wait for a full bucket only
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("x" * 400, "y" * 400, 1000) == 1200
+
+    def test_provider_overrides(self):
+        with patch("services.llm_scheduler.settings.llm_provider_rate_limits", {"groq": [30, 6000]}), \
+             patch("services.llm_scheduler.settings.llm_requests_per_minute", 0):
+            scheduler = LLMScheduler()
+            scheduler.acquire_sync("groq:k", 100)
+            scheduler.acquire_sync("openai:k", 100)
+        snap = scheduler.snapshot()
+        assert snap["groq:k"]["requests_available"] == pytest.approx(29, abs=0.1)
+        assert snap["groq:k"]["tokens_available"] == pytest.approx(5900, abs=1)
+        assert snap["openai:k"]["requests_available"] is None
+
+
+def test_interactive_calls_go_first():
+    async def scenario() -> list[str]:
+        scheduler = LLMScheduler()
+        with patch("services.llm_scheduler.settings.llm_requests_per_minute", 600):
+            scheduler.acquire_sync("p:k", 1)
+        quota = scheduler._quotas["p:k"]
+        quota.requests.tokens = 0  # saturated: next slot in 0.1s
+        order: list[str] = []
+
+        async def call(name: str, priority: Priority) -> None:
+            with llm_priority(priority):
+                await scheduler.acquire("p:k", 1)
+            order.append(name)
+
+        batch = [asyncio.ensure_future(call(f"batch{i}", Priority.BATCH)) for i in range(2)]
+        await asyncio.sleep(0)
+        interactive = asyncio.ensure_future(call("interactive", Priority.INTERACTIVE))
+        await asyncio.gather(*batch, interactive)
+        return order
+
+    assert asyncio.run(scenario())[0] == "interactive"
+
+
+class TestRateLimits:
+    def test_retry_after_headers(self):
+        assert retry_after(RateLimited({"retry-after-ms": "1500"})) == 1.5
+        assert retry_after(RateLimited({"retry-after": "2"})) == 2.0
+        with patch("services.llm_scheduler.settings.llm_rate_limit_default_pause_s", 7.0):
+            assert retry_after(RateLimited({})) == 7.0
+        assert retry_after(RuntimeError("boom")) is None
+
+    def test_429_is_waited_out_not_failed(self):
+        provider = _fake([RateLimited({"retry-after": "0.05"}), "ok"])
+        started = time.monotonic()
+        assert asyncio.run(tracked_agenerate(provider, "s", "u", 10)) == "ok"
+        assert time.monotonic() - started >= 0.05
+        assert provider.calls == 2
+        snap = llm_scheduler.snapshot()["fake:abc"]
+        assert (snap["admitted"], snap["rate_limited"]) == (2, 1)
+        assert llm_health.snapshot()["fake/m"]["error_rate"] == 0.0
+
+    def test_gives_up_after_retries(self):
+        provider = _fake([RateLimited({"retry-after": "0"})] * 3)
+        with patch("services.llm_scheduler.settings.llm_rate_limit_retries", 1):
+            with pytest.raises(RateLimited):
+                asyncio.run(tracked_agenerate(provider, "s", "u", 10))
+        assert provider.calls == 2
+
+
+def test_quotas_endpoint(client):
+    llm_scheduler.acquire_sync("openai:abc", 10)
+    body = client.get("/api/v1/llm-settings/quotas").json()
+    assert [(q["key"], q["admitted"], q["queued"]) for q in body] == [("openai:abc", 1, 0)]
@@ -0,0 +1,128 @@
+"""Tests for streaming slow-query / auto_explain log ingestion."""
+
+import io
+import json
+
+from services.log_parser import aggregate_log, detect_format
+
+_PG_STDERR = """\
+2024-05-01 10:00:00.001 UTC [101] app@shop LOG:  duration: 120.500 ms  statement: SELECT * FROM orders
+\tWHERE user_id = 42
+2024-05-01 10:00:01.001 UTC [101] app@shop LOG:  connection authorized: user=app
+2024-05-01 10:00:02.001 UTC [102] app@shop LOG:  duration: 80.000 ms  statement: SELECT * FROM orders WHERE user_id = 7
+2024-05-01 10:00:03.001 UTC [103] app@shop LOG:  duration: 300.000 ms  plan:
+\t{
+\t  "Query Text": "SELECT * FROM orders WHERE user_id = 9",
+\t  "Plan": {"Node Type": "Seq Scan", "Relation Name": "orders"}
+\t}
+2024-05-01 10:00:04.001 UTC [104] app@shop LOG:  duration: 5.000 ms  execute S_1: SELECT 1 FROM users
+"""
+
+_MYSQL_SLOW = """\
+/usr/sbin/mysqld, Version: 8.0.36 (MySQL Community Server - GPL). started with:
+Tcp port: 3306  Unix socket: /var/run/mysqld/mysqld.sock
+Time                 Id Command    Argument
+# Time: 2024-05-01T10:00:00.000000Z
+# User@Host: app[app] @ localhost []  Id:     8
+# Query_time: 2.500000  Lock_time: 0.000010 Rows_sent: 1  Rows_examined: 50000
+use shop;
+SET timestamp=1714557600;
+SELECT * FROM orders
+WHERE user_id = 42;
+# Time: 2024-05-01T10:00:05.000000Z
+# User@Host: app[app] @ localhost []  Id:     8
+# Query_time: 0.500000  Lock_time: 0.000010 Rows_sent: 1  Rows_examined: 50000
+SET timestamp=1714557605;
+SELECT * FROM orders WHERE user_id = 7;
+"""
+
+
+def _csv_row(message: str) -> str:
+    fields = ["2024-05-01 10:00:00.001 UTC", "app", "shop", "101", "", "s", "1", "SELECT", "", "", "0",
+              "LOG", "00000", message, "", "", "", "", "", "", "", "", "psql", "client backend"]
+    return ",".join('"' + f.replace('"', '""') + '"' if f else "" for f in fields) + "\n"
+
+
+class TestLogParser:
+    def test_postgres_stderr_aggregates_per_fingerprint(self):
+        fmt, agg = aggregate_log(io.StringIO(_PG_STDERR))
+        assert fmt == "postgres"
+        assert agg.statements == 4
+        top = agg.top(5)
+        orders = top[0]
+        assert orders.count == 3
+        assert orders.total_duration_ms == 500.5
+        assert orders.max_duration_ms == 300.0
+        assert json.loads(orders.plan)[0]["Plan"]["Node Type"] == "Seq Scan"
+        assert orders.sql == "SELECT * FROM orders WHERE user_id = 9"
+        assert top[1].sql == "SELECT 1 FROM users"
+
+    def test_ingestion_bypasses_the_parse_cache(self):
+        from services import sql_normalizer
+
+        sql_normalizer.clear_parse_cache()
+        _, agg = aggregate_log(io.StringIO(_PG_STDERR))
+        assert sql_normalizer.parse_cache_snapshot()["entries"] == 0
+        orders = agg.top(1)[0]
+        assert orders.fingerprint == sql_normalizer.fingerprint_sql("SELECT * FROM orders WHERE user_id = 1", "postgresql")
+
+    def test_postgres_csvlog_with_multiline_message(self):
+        log = _csv_row("duration: 10.0 ms  statement: SELECT *\nFROM users WHERE id = 1") + _csv_row(
+            "duration: 30.0 ms  statement: SELECT * FROM users WHERE id = 2"
+        ) + _csv_row("checkpoint starting: time")
+        fmt, agg = aggregate_log(io.StringIO(log, newline=""))
+        assert fmt == "postgres_csv"
+        [entry] = agg.top(5)
+        assert entry.count == 2
+        assert entry.max_duration_ms == 30.0
+
+    def test_mysql_slow_log(self):
+        fmt, agg = aggregate_log(io.StringIO(_MYSQL_SLOW))
+        assert fmt == "mysql_slow"
+        [entry] = agg.top(5)
+        assert entry.count == 2
+        assert entry.total_duration_ms == 3000.0
+        assert entry.sql == "SELECT * FROM orders\nWHERE user_id = 42;"
+        assert entry.plan is None
+
+    def test_fingerprint_cap_counts_dropped(self):
+        lines = [
+            f"2024-05-01 UTC LOG:  duration: 1.0 ms  statement: SELECT * FROM t{i}\n" for i in range(5)
+        ]
+        _, agg = aggregate_log(iter(lines), "postgres", max_fingerprints=2)
+        assert len(agg.entries) == 2
+        assert agg.dropped == 3
+
+    def test_comma_heavy_stderr_is_not_csvlog(self):
+        cols = ", ".join(f"c{i}" for i in range(30))
+        log = f"2024-05-01 10:00:00.001 UTC [101] app@shop LOG:  duration: 9.0 ms  statement: SELECT {cols} FROM t\n"
+        fmt, agg = aggregate_log(io.StringIO(log))
+        assert fmt == "postgres"
+        assert agg.statements == 1
+
+        values = ", ".join(f"({i}, 'x')" for i in range(20))
+        fmt, _ = detect_format([f"INSERT INTO t VALUES {values}\n"])
+        assert fmt == "postgres"
+
+    def test_detect_format_keeps_every_line(self):
+        lines = iter(["# Time: x\n", "a\n", "b\n"])
+        fmt, stream = detect_format(lines)
+        assert fmt == "mysql_slow"
+        assert list(stream) == ["# Time: x\n", "a\n", "b\n"]
+
+
+class TestLogIngestAPI:
+    def test_upload_returns_replayable_analyze_requests(self, client):
+        resp = client.post(
+            "/api/v1/analyze/logs?top_k=1",
+            files={"file": ("postgresql.log", _PG_STDERR.encode(), "text/plain")},
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["db_type"] == "postgresql"
+        assert data["fingerprints"] == 2
+        [entry] = data["entries"]
+        replay = entry["analyze_request"]
+        assert replay["client_db_type"] == "postgresql"
+        assert replay["client_explain"]["execution_time_ms"] == 300.0
+        assert "Seq Scan" in replay["client_explain"]["raw_plan"]
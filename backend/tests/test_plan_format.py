@@ -0,0 +1,98 @@
+"""Tests for the compact plan rendering used in prompts."""
+
+import json
+
+from connectors.base import ExplainResult
+from services.plan_format import compact_plan
+from services.prompt_builder import PromptBuilder
+from services.query_introspector import QueryIntrospectionResult
+
+
+def _scan(relation: str, rows: int, actual_rows: int, time_ms: float, loops: int = 1, **extra) -> dict:
+    return {
+        "Node Type": "Seq Scan", "Parent Relationship": "Outer", "Parallel Aware": False,
+        "Async Capable": False, "Relation Name": relation, "Alias": relation,
+        "Startup Cost": 0.0, "Total Cost": 155.0, "Plan Rows": rows, "Plan Width": 36,
+        "Actual Startup Time": 0.01, "Actual Total Time": time_ms, "Actual Rows": actual_rows,
+        "Actual Loops": loops, "Shared Hit Blocks": 40, "Shared Read Blocks": 0,
+        "Shared Dirtied Blocks": 0, "Shared Written Blocks": 0, "Local Hit Blocks": 0,
+        "Temp Read Blocks": 0, "Temp Written Blocks": 0, **extra,
+    }
+
+
+_PLAN = [{
+    "Plan": {
+        "Node Type": "Hash Join", "Parallel Aware": False, "Async Capable": False, "Join Type": "Left",
+        "Startup Cost": 30.0, "Total Cost": 420.5, "Plan Rows": 100, "Plan Width": 72,
+        "Actual Startup Time": 1.0, "Actual Total Time": 12.0, "Actual Rows": 5000, "Actual Loops": 1,
+        "Inner Unique": False, "Hash Cond": "(o.user_id = u.id)", "Rows Removed by Join Filter": 0,
+        "Shared Hit Blocks": 80, "Shared Read Blocks": 12,
+        "Plans": [
+            _scan("orders", 5000, 5000, 7.0, Filter="(status = 'paid'::text)", **{"Rows Removed by Filter": 120}),
+            {
+                "Node Type": "Hash", "Parent Relationship": "Inner", "Parallel Aware": False,
+                "Startup Cost": 20.0, "Total Cost": 20.0, "Plan Rows": 800, "Plan Width": 36,
+                "Actual Startup Time": 2.0, "Actual Total Time": 2.0, "Actual Rows": 800, "Actual Loops": 1,
+                "Hash Buckets": 1024, "Hash Batches": 1, "Peak Memory Usage": 60,
+                "Plans": [_scan("users", 800, 800, 1.5)],
+            },
+        ],
+    },
+    "Planning Time": 0.2,
+    "Triggers": [],
+    "Execution Time": 12.5,
+}]
+
+
+def test_one_line_per_node_with_derived_fields():
+    lines = compact_plan(json.dumps(_PLAN, indent=2)).splitlines()
+    header = lines[0]
+    assert header.startswith("Hash Left Join (est rows=100 cost=420.5)")
+    assert "actual rows=5000 loops=1 time=12.000ms self=3.000ms" in header  # 12 - (7 + 2)
+    assert "[rows x50 under-estimated]" in header
+    assert "buffers: shared hit=80 shared read=12" in header
+    assert header.endswith("| Hash Cond: (o.user_id = u.id)")
+    assert lines[1].startswith("  -> Seq Scan on orders (est rows=5000")
+    assert lines[1].endswith("| Filter: (status = 'paid'::text); Rows Removed by Filter: 120")
+    assert lines[3].startswith("    -> Seq Scan on users")
+    assert len(lines) == 4
+    text = "\n".join(lines)
+    for noise in ("Parallel Aware", "Async Capable", "Plan Width", "Inner Unique", "Join Filter", "Temp"):
+        assert noise not in text
+
+
+def test_never_executed_node():
+    inner = _scan("users", 1000, 0, 0.0, loops=0)
+    inner.update({"Node Type": "Index Scan", "Index Name": "users_pkey", "Parent Relationship": "Inner"})
+    plan = [{"Plan": {
+        "Node Type": "Nested Loop", "Join Type": "Inner", "Total Cost": 900.0, "Plan Rows": 10,
+        "Actual Total Time": 4.0, "Actual Rows": 0, "Actual Loops": 1,
+        "Plans": [_scan("orders", 10, 0, 4.0), inner],
+    }}]
+    lines = compact_plan(json.dumps(plan)).splitlines()
+    assert "self=0.000ms" in lines[0]  # 4.0 - 4.0; the inner side adds nothing
+    assert "(never executed)" in lines[2]
+    assert "loops=" not in lines[2] and "estimated" not in lines[2]
+
+
+def test_several_times_smaller_than_indented_json():
+    raw = json.dumps(_PLAN, indent=2)
+    assert len(compact_plan(raw)) * 3 < len(raw)
+
+
+def test_non_json_plans_pass_through():
+    mysql = "-> Table scan on users  (cost=1.2 rows=10) (actual time=0.1..0.2 rows=10 loops=1)"
+    assert compact_plan(mysql) == mysql
+    assert compact_plan("[not json") == "[not json"
+
+
+def test_prompt_uses_compact_plan():
+    raw = json.dumps(_PLAN, indent=2)
+    introspection = QueryIntrospectionResult(
+        sql="SELECT * FROM orders o LEFT JOIN users u ON o.user_id = u.id",
+        explain=ExplainResult(raw_plan=raw, planning_time_ms=0.2, execution_time_ms=12.5),
+        table_schemas=[], table_names=["orders", "users"], db_type="postgresql",
+    )
+    _, user_message = PromptBuilder().build(introspection)
+    assert "Hash Left Join (est rows=100" in user_message
+    assert '"Node Type"' not in user_message
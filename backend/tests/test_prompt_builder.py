@@ -1,7 +1,7 @@
 """Tests for the PromptBuilder."""
 
 from connectors.base import ColumnStat, ExplainResult, IndexInfo, TableSchema
-from services.prompt_builder import PromptBuilder
+from services.prompt_builder import PromptBuilder, split_cacheable_prefix
 from services.query_introspector import QueryIntrospectionResult
 
 
@@ -62,3 +62,36 @@ class TestPromptBuilder:
         introspection = _make_introspection(db_type=None)
         system_prompt, _ = self.builder.build(introspection)
         assert "Detect the SQL dialect" in system_prompt
+
+
+def _schema(name: str) -> TableSchema:
+    return TableSchema(
+        table_name=name,
+        columns=[{"column_name": "id", "data_type": "integer", "is_nullable": "NO"}],
+        row_count=10,
+        indexes=[],
+        column_stats=[],
+    )
+
+
+class TestCacheableLayout:
+    def test_schema_prefix_is_stable_across_queries(self):
+        builder = PromptBuilder()
+        a = _make_introspection(sql="SELECT * FROM users JOIN orders USING (id)",
+                                table_schemas=[_schema("users"), _schema("orders")])
+        b = _make_introspection(sql="SELECT 1 FROM orders, users",
+                                explain=ExplainResult(raw_plan="Hash Join", planning_time_ms=1, execution_time_ms=2),
+                                table_schemas=[_schema("orders"), _schema("users")])
+        prefix_a, rest_a = split_cacheable_prefix(builder.build(a)[1])
+        prefix_b, rest_b = split_cacheable_prefix(builder.build(b)[1])
+
+        assert prefix_a == prefix_b
+        assert prefix_a.index("Table: orders") < prefix_a.index("Table: users")
+        assert rest_a.startswith("## SQL Query") and "Hash Join" in rest_b
+        assert prefix_a + rest_a == builder.build(a)[1]
+
+    def test_query_only_message_has_no_prefix(self):
+        assert split_cacheable_prefix("## SQL Query\n```sql\nSELECT 1\n```") == (
+            "", "## SQL Query\n```sql\nSELECT 1\n```"
+        )
+
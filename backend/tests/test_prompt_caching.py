@@ -0,0 +1,73 @@
+"""Tests for provider prompt caching and token usage reporting."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.llm_providers import clear_provider_cache, get_provider
+from services.llm_usage import llm_usage, openai_usage
+
+_USER = "## Table Schemas & Statistics\n```\nTable: users\n```\n\n## SQL Query\n```sql\nSELECT 1\n```"
+
+
+@pytest.fixture(autouse=True)
+def _clean():
+    clear_provider_cache()
+    llm_usage.clear()
+    yield
+    llm_usage.clear()
+
+
+def _anthropic_message() -> SimpleNamespace:
+    return SimpleNamespace(
+        content=[SimpleNamespace(text='{"summary": "ok"}')],
+        usage=SimpleNamespace(input_tokens=50, output_tokens=20,
+                              cache_read_input_tokens=1500, cache_creation_input_tokens=0),
+    )
+
+
+class TestAnthropicCaching:
+    def test_breakpoints_after_system_and_schema(self):
+        provider = get_provider("anthropic", api_key="sk-ant", model="claude-sonnet-4-6")
+        provider._client = MagicMock()
+        provider._client.messages.create.return_value = _anthropic_message()
+
+        assert provider.generate("system", _USER, 100) == '{"summary": "ok"}'
+        kwargs = provider._client.messages.create.call_args.kwargs
+        assert kwargs["system"] == [{"type": "text", "text": "system", "cache_control": {"type": "ephemeral"}}]
+        schema, query = kwargs["messages"][0]["content"]
+        assert schema["cache_control"] == {"type": "ephemeral"} and "Table: users" in schema["text"]
+        assert "cache_control" not in query and query["text"].startswith("## SQL Query")
+
+        usage = llm_usage.snapshot()["anthropic/claude-sonnet-4-6"]
+        assert (usage["input_tokens"], usage["cached_tokens"], usage["output_tokens"]) == (1550, 1500, 20)
+        assert usage["cache_hit_ratio"] == pytest.approx(1500 / 1550)
+
+    def test_caching_disabled_sends_plain_strings(self):
+        provider = get_provider("anthropic", api_key="sk-ant", model="claude-sonnet-4-6")
+        with patch("services.llm_providers.anthropic_provider.settings.llm_prompt_caching", False):
+            request = provider._request("system", _USER, 100)
+        assert request["system"] == "system"
+        assert request["messages"][0]["content"] == _USER
+
+
+def test_openai_style_cached_tokens():
+    openai = SimpleNamespace(usage=SimpleNamespace(
+        prompt_tokens=2000, completion_tokens=300, prompt_tokens_details=SimpleNamespace(cached_tokens=1792),
+    ))
+    deepseek = SimpleNamespace(usage=SimpleNamespace(
+        prompt_tokens=2000, completion_tokens=300, prompt_cache_hit_tokens=1024,
+    ))
+    assert openai_usage(openai) == {"input_tokens": 2000, "output_tokens": 300, "cached_tokens": 1792}
+    assert openai_usage(deepseek)["cached_tokens"] == 1024
+    assert openai_usage(SimpleNamespace()) == {}
+
+
+def test_usage_endpoint(client):
+    llm_usage.record("openai/gpt-4.1", input_tokens=1000, output_tokens=100, cached_tokens=500)
+    body = client.get("/api/v1/llm-settings/usage").json()
+    assert body == [{
+        "label": "openai/gpt-4.1", "calls": 1, "input_tokens": 1000, "output_tokens": 100,
+        "cached_tokens": 500, "cache_write_tokens": 0, "cache_hit_ratio": 0.5,
+    }]
@@ -0,0 +1,98 @@
+"""Tests for fingerprinted query history and its grouped view."""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, inspect, text
+
+from api.models.orm import QueryHistory
+from api.models.schemas import AnalysisResult, SuggestionItem
+from services.query_history import (
+    backfill_fingerprints,
+    history_row,
+    plan_execution_time_ms,
+    suggestion_count,
+)
+
+
+def _result(indexes: int = 0) -> AnalysisResult:
+    item = SuggestionItem(explanation="add index", estimated_impact="high")
+    return AnalysisResult(query_id="q", indexes=[item] * indexes)
+
+
+def _add(db, sql: str, minutes_ago: int, indexes: int = 0, plan: str | None = None) -> QueryHistory:
+    row = history_row(f"id-{sql}-{minutes_ago}", None, sql, "postgresql", plan, None, _result(indexes))
+    row.created_at = datetime.utcnow() - timedelta(minutes=minutes_ago)
+    db.add(row)
+    db.commit()
+    return row
+
+
+class TestDerivedColumns:
+    def test_plan_execution_time(self):
+        assert plan_execution_time_ms('[{"Plan": {}, "Execution Time": 12.5}]') == 12.5
+        assert plan_execution_time_ms("Seq Scan on t\nExecution Time: 3.25 ms") == 3.25
+        assert plan_execution_time_ms(
+            "-> Filter: (t.a = 1)  (cost=1.0 rows=1) (actual time=0.05..7.75 rows=1 loops=1)"
+        ) == 7.75
+        assert plan_execution_time_ms("not a plan") is None
+        assert plan_execution_time_ms(None) is None
+
+    def test_history_row_fingerprints_literals_away(self):
+        a = history_row("a", None, "SELECT * FROM t WHERE id = 1", "postgresql", None, None, _result(2))
+        b = history_row("b", None, "SELECT * FROM t WHERE id = 99", "postgresql", None, 4.0, _result())
+        assert a.fingerprint == b.fingerprint
+        assert a.suggestion_count == 2 == suggestion_count(_result(2))
+        assert b.execution_time_ms == 4.0
+
+    def test_backfill_fills_legacy_rows(self, db_session):
+        db_session.add(QueryHistory(
+            id="legacy", sql_query="SELECT 1 FROM t WHERE x = 5",
+            llm_response=_result(3).model_dump_json(),
+            explain_plan='[{"Execution Time": 2.0}]',
+        ))
+        db_session.commit()
+        assert backfill_fingerprints(db_session) == 1
+        row = db_session.get(QueryHistory, "legacy")
+        assert row.fingerprint and row.suggestion_count == 3 and row.execution_time_ms == 2.0
+
+
+class TestHistoryGroups:
+    def test_groups_by_fingerprint(self, client, db_session):
+        _add(db_session, "SELECT * FROM orders WHERE id = 1", 30, indexes=1)
+        _add(db_session, "SELECT * FROM orders WHERE id = 2", 10, indexes=2,
+             plan='[{"Execution Time": 8.0}]')
+        _add(db_session, "SELECT * FROM users", 20)
+
+        resp = client.get("/api/v1/analyze/history/groups")
+        assert resp.status_code == 200
+        groups = resp.json()
+        assert [g["analysis_count"] for g in groups] == [2, 1]
+        orders = groups[0]
+        assert orders["latest_sql"] == "SELECT * FROM orders WHERE id = 2"
+        assert orders["total_suggestions"] == 3
+        assert orders["latest_suggestion_count"] == 2
+        assert orders["latest_execution_time_ms"] == 8.0
+
+    def test_limit(self, client, db_session):
+        _add(db_session, "SELECT * FROM a", 2)
+        _add(db_session, "SELECT * FROM b", 1)
+        groups = client.get("/api/v1/analyze/history/groups?limit=1").json()
+        assert [g["latest_sql"] for g in groups] == ["SELECT * FROM b"]
+
+
+def test_init_db_adds_missing_columns(monkeypatch):
+    import core.database as database
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE query_history (id VARCHAR(36) PRIMARY KEY, connection_id VARCHAR(36), "
+            "sql_query TEXT NOT NULL, explain_plan TEXT, llm_response TEXT, created_at DATETIME)"
+        ))
+    monkeypatch.setattr(database, "engine", engine)
+    database.init_db()
+
+    columns = {c["name"] for c in inspect(engine).get_columns("query_history")}
+    assert {"fingerprint", "suggestion_count", "execution_time_ms"} <= columns
+    indexes = {i["name"] for i in inspect(engine).get_indexes("query_history")}
+    assert "ix_query_history_fingerprint_created_at" in indexes
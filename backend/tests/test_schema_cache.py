@@ -0,0 +1,71 @@
+"""Tests for the versioned schema cache."""
+
+from unittest.mock import MagicMock
+
+from connectors.base import TableSchema
+from services.schema_cache import SchemaCache
+
+
+def _connector(versions: dict[str, str] | None) -> MagicMock:
+    connector = MagicMock()
+    connector.get_table_versions.return_value = versions
+    connector.get_table_schemas.side_effect = lambda names: [
+        TableSchema(n, [], 0, [], []) for n in names
+    ]
+    return connector
+
+
+class TestSchemaCache:
+    def test_second_lookup_is_a_hit(self):
+        cache = SchemaCache(max_entries=10)
+        connector = _connector({"users": "v1"})
+        first = cache.get_schemas("c1", connector, ["users"])
+        second = cache.get_schemas("c1", connector, ["users"])
+        assert first[0] is second[0]
+        assert connector.get_table_schemas.call_count == 1
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+
+    def test_changed_version_refetches_only_that_table(self):
+        cache = SchemaCache(max_entries=10)
+        connector = _connector({"a": "v1", "b": "v1"})
+        cache.get_schemas("c1", connector, ["a", "b"])
+        connector.get_table_versions.return_value = {"a": "v1", "b": "v2"}
+        cache.get_schemas("c1", connector, ["a", "b"])
+        connector.get_table_schemas.assert_called_with(["b"])
+        assert cache.stats.stale == 1
+
+    def test_absent_tables_are_cached(self):
+        cache = SchemaCache(max_entries=10)
+        connector = _connector({})
+        cache.get_schemas("c1", connector, ["cte_name"])
+        cache.get_schemas("c1", connector, ["cte_name"])
+        assert connector.get_table_schemas.call_count == 1
+
+    def test_unsupported_versions_bypass_cache(self):
+        cache = SchemaCache(max_entries=10)
+        connector = _connector(None)
+        cache.get_schemas("c1", connector, ["users"])
+        cache.get_schemas("c1", connector, ["users"])
+        assert connector.get_table_schemas.call_count == 2
+        assert cache.snapshot()["entries"] == 0
+
+    def test_lru_eviction(self):
+        cache = SchemaCache(max_entries=2)
+        connector = _connector({"a": "1", "b": "1", "c": "1"})
+        cache.get_schemas("c1", connector, ["a"])
+        cache.get_schemas("c1", connector, ["b"])
+        cache.get_schemas("c1", connector, ["a"])  # a is now most recent
+        cache.get_schemas("c1", connector, ["c"])  # evicts b
+        assert cache.stats.evictions == 1
+        cache.get_schemas("c1", connector, ["a"])
+        assert cache.stats.hits == 2
+
+    def test_keys_are_per_connection(self):
+        cache = SchemaCache(max_entries=10)
+        connector = _connector({"users": "v1"})
+        cache.get_schemas("c1", connector, ["users"])
+        cache.get_schemas("c2", connector, ["users"])
+        assert cache.stats.hits == 0
+        cache.invalidate("c1")
+        assert cache.snapshot()["entries"] == 1
@@ -0,0 +1,84 @@
+"""Tests for batched table-schema collection."""
+
+import threading
+from unittest.mock import MagicMock
+
+from connectors.base import TableSchema
+from connectors.mysql import _group_index_rows
+from connectors.postgresql import _column_stat_from_row
+from services.query_introspector import QueryIntrospector
+
+
+def _schema(name: str) -> TableSchema:
+    return TableSchema(name, [], 0, [], [])
+
+
+class TestIntrospectorSchemaFetch:
+    def test_uses_bulk_fetch(self):
+        connector = MagicMock()
+        connector.get_table_schemas.return_value = [_schema("orders"), _schema("users")]
+        result = QueryIntrospector(connector).introspect(
+            "SELECT * FROM users JOIN orders ON users.id = orders.user_id"
+        )
+        connector.get_table_schemas.assert_called_once_with(["orders", "users"])
+        connector.get_table_schema.assert_not_called()
+        assert [ts.table_name for ts in result.table_schemas] == ["orders", "users"]
+
+    def test_falls_back_per_table(self):
+        connector = MagicMock()
+        connector.get_table_schemas.side_effect = RuntimeError("permission denied")
+        connector.get_table_schema.side_effect = lambda t: _schema(t)
+        result = QueryIntrospector(connector).introspect("SELECT * FROM a, b")
+        connector.reset.assert_called_once()
+        assert [ts.table_name for ts in result.table_schemas] == ["a", "b"]
+
+    def test_catalog_fetch_overlaps_explain(self):
+        catalog_started = threading.Event()
+        overlapped: list[bool] = []
+
+        def slow_schemas(names):
+            catalog_started.set()
+            return [_schema(n) for n in names]
+
+        def slow_explain(sql, timeout_ms):
+            # Sequential execution would leave the catalog fetch unstarted here
+            overlapped.append(catalog_started.wait(timeout=2))
+            return MagicMock(raw_plan="plan")
+
+        primary, catalog = MagicMock(), MagicMock()
+        primary.explain_analyze.side_effect = slow_explain
+        catalog.get_table_schemas.side_effect = slow_schemas
+
+        result = QueryIntrospector(primary, catalog_connector=catalog).introspect(
+            "SELECT * FROM users"
+        )
+        assert overlapped == [True]
+        primary.get_table_schemas.assert_not_called()
+        catalog.explain_analyze.assert_not_called()
+        assert result.table_schemas[0].table_name == "users"
+
+
+class TestRowHelpers:
+    def test_mysql_groups_multi_column_index(self):
+        rows = [
+            {"Key_name": "PRIMARY", "Non_unique": 0, "Index_type": "BTREE", "Column_name": "id"},
+            {"Key_name": "idx_ab", "Non_unique": 1, "Index_type": "BTREE", "Column_name": "a"},
+            {"Key_name": "idx_ab", "Non_unique": 1, "Index_type": "BTREE", "Column_name": "b"},
+        ]
+        indexes = _group_index_rows(rows, "t")
+        assert [i.index_name for i in indexes] == ["PRIMARY", "idx_ab"]
+        assert indexes[0].is_unique is True
+        assert indexes[1].columns == ["a", "b"]
+        assert indexes[1].index_type == "btree"
+
+    def test_pg_column_stat_parses_mcv(self):
+        stat = _column_stat_from_row({
+            "column_name": "status",
+            "null_frac": 0.1,
+            "avg_width": 6,
+            "n_distinct": 3,
+            "most_common_vals": "{active,deleted}",
+            "most_common_freqs": [0.9, 0.1],
+        })
+        assert stat.most_common_vals == ["active", "deleted"]
+        assert stat.n_distinct == 3.0
@@ -0,0 +1,128 @@
+"""Tests for coalescing identical in-flight calls."""
+
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        calls: list[int] = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def main():
+            return await asyncio.gather(*(flight.run("k", work) for _ in range(5)))
+
+        assert asyncio.run(main()) == ["result"] * 5
+        assert calls == [1]
+        assert flight.leaders == 1
+        assert flight.followers == 4
+
+    def test_distinct_keys_run_separately(self):
+        flight = SingleFlight()
+
+        async def main():
+            return await asyncio.gather(
+                flight.run("a", lambda: asyncio.sleep(0, "a")),
+                flight.run("b", lambda: asyncio.sleep(0, "b")),
+            )
+
+        assert asyncio.run(main()) == ["a", "b"]
+        assert flight.leaders == 2
+
+    def test_errors_reach_every_waiter_and_key_is_released(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def main():
+            results = await asyncio.gather(
+                flight.run("k", fail), flight.run("k", fail), return_exceptions=True
+            )
+            again = await flight.run("k", lambda: asyncio.sleep(0, "ok"))
+            return results, again
+
+        results, again = asyncio.run(main())
+        assert all(isinstance(r, ValueError) for r in results)
+        assert again == "ok"
+
+    def test_cancelled_caller_does_not_cancel_shared_work(self):
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        async def main():
+            first = asyncio.ensure_future(flight.run("k", work))
+            second = asyncio.ensure_future(flight.run("k", work))
+            await asyncio.sleep(0)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+        assert asyncio.run(main()) == "done"
+
+
+def test_coalesced_analysis_uses_its_own_session():
+    from unittest.mock import MagicMock, patch
+
+    from api.models.schemas import AnalysisResult, AnalyzeRequest
+    from api.routes import analyze as routes
+    from services.query_introspector import QueryIntrospectionResult
+
+    flight_session, request_session = MagicMock(), MagicMock()
+    seen: list = []
+
+    async def fake_run(body, db):
+        seen.append(db)
+        introspection = QueryIntrospectionResult(sql=body.sql, explain=None, table_schemas=[], table_names=[])
+        return introspection, AnalysisResult(query_id="x")
+
+    with patch.object(routes, "_flight_session_factory", lambda: flight_session), \
+         patch.object(routes, "_run_analysis", fake_run), \
+         patch.object(routes, "_persist_result"):
+        asyncio.run(routes._analyze(AnalyzeRequest(sql="SELECT 1", connection_id="c1"), request_session))
+
+    assert seen == [flight_session]
+    flight_session.close.assert_called_once()
+
+
+def test_different_literals_are_not_coalesced():
+    from unittest.mock import MagicMock, patch
+
+    from api.models.schemas import AnalysisResult, AnalyzeRequest
+    from api.routes import analyze as routes
+    from services.query_introspector import QueryIntrospectionResult
+
+    analyzed: list[str] = []
+
+    async def fake_run(body, db):
+        analyzed.append(body.sql)
+        await asyncio.sleep(0.01)
+        introspection = QueryIntrospectionResult(sql=body.sql, explain=None, table_schemas=[], table_names=[])
+        return introspection, AnalysisResult(query_id="x", summary=body.sql)
+
+    async def main():
+        return await asyncio.gather(*(
+            routes._analyze(AnalyzeRequest(sql=sql, connection_id="c1"), MagicMock())
+            for sql in ("SELECT * FROM t WHERE id = 1", "SELECT * FROM t WHERE id = 2")
+        ))
+
+    with patch.object(routes, "_flight_session_factory", MagicMock), \
+         patch.object(routes, "_run_analysis", fake_run), \
+         patch.object(routes, "_persist_result"):
+        results = asyncio.run(main())
+
+    assert sorted(analyzed) == ["SELECT * FROM t WHERE id = 1", "SELECT * FROM t WHERE id = 2"]
+    assert [r.summary for r in results] == ["SELECT * FROM t WHERE id = 1", "SELECT * FROM t WHERE id = 2"]
@@ -0,0 +1,85 @@
+"""Tests for the memoized SQL parse / fingerprint service."""
+
+from unittest.mock import patch
+
+import pytest
+
+from services import sql_normalizer
+from services.sql_normalizer import analyze_sql, clear_parse_cache, fingerprint_sql, normalize_sql
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_parse_cache()
+    yield
+    clear_parse_cache()
+
+
+class TestFingerprint:
+    def test_literals_stripped(self):
+        a = fingerprint_sql("SELECT * FROM users WHERE id = 1 AND name = 'bob'")
+        b = fingerprint_sql("select *  from users where id = 42 and name = 'alice'")
+        assert a == b
+        assert "?" in normalize_sql("SELECT * FROM users WHERE id = 1")
+
+    def test_structure_changes_fingerprint(self):
+        assert fingerprint_sql("SELECT * FROM users WHERE id = 1") != fingerprint_sql(
+            "SELECT * FROM users WHERE email = 'x'"
+        )
+
+    def test_unparseable_falls_back_to_whitespace(self):
+        parsed = analyze_sql("SELEC broken FROM ((")
+        assert parsed.tree is None
+        assert parsed.normalized == "selec broken from (("
+
+
+class TestMetadata:
+    SQL = (
+        "SELECT o.id, u.email FROM sales.orders o "
+        "JOIN public.users u ON o.user_id = u.id "
+        "WHERE o.status = 'open' AND o.total > 100"
+    )
+
+    def test_schema_qualified_and_bare_tables(self):
+        parsed = analyze_sql(self.SQL, "postgresql")
+        assert parsed.tables == ("public.users", "sales.orders")
+        assert parsed.table_names == ("orders", "users")
+        assert parsed.dialect == "postgres"
+
+    def test_columns_predicates_join_keys(self):
+        parsed = analyze_sql(self.SQL, "postgresql")
+        assert "o.status" in parsed.columns
+        assert parsed.join_keys == (("o.user_id", "u.id"),)
+        assert "o.status = ?" in parsed.predicates
+        assert "o.total > ?" in parsed.predicates
+        assert "o.user_id = u.id" in parsed.predicates
+
+    def test_regex_fallback_keeps_schema(self):
+        parsed = analyze_sql("SELECT FROM ((( FROM app.events JOIN logs")
+        assert parsed.table_names == ("events", "logs")
+
+
+class TestParseCache:
+    def test_hit_returns_same_object(self):
+        before = sql_normalizer.stats.hits
+        first = analyze_sql("SELECT 1 FROM t")
+        assert analyze_sql("SELECT 1 FROM t") is first
+        assert sql_normalizer.stats.hits == before + 1
+
+    def test_dialect_is_part_of_key(self):
+        assert analyze_sql("SELECT 1 FROM t", "mysql") is not analyze_sql("SELECT 1 FROM t", "postgresql")
+
+    def test_lru_eviction(self):
+        with patch.object(sql_normalizer.settings, "sql_parse_cache_max_entries", 2):
+            a = analyze_sql("SELECT * FROM a")
+            analyze_sql("SELECT * FROM b")
+            analyze_sql("SELECT * FROM a")  # refresh a
+            analyze_sql("SELECT * FROM c")  # evicts b
+            assert analyze_sql("SELECT * FROM a") is a
+            assert sql_normalizer.parse_cache_snapshot()["entries"] == 2
+
+    def test_stats_endpoint(self, client):
+        analyze_sql("SELECT * FROM stats_probe")
+        stats = client.get("/api/v1/analyze/parse-cache-stats").json()
+        assert stats["entries"] >= 1
+        assert stats["misses"] >= 1
@@ -0,0 +1,144 @@
+"""Tests for the internal store's SQLite tuning and startup report."""
+
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, inspect
+
+from core.database import Base, configure_sqlite, storage_report
+
+
+def _file_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'store.db'}")
+    configure_sqlite(engine)
+    return engine
+
+
+class TestSqlitePragmas:
+    def test_applied_per_connection(self, tmp_path):
+        report = storage_report(_file_engine(tmp_path))
+        assert report["dialect"] == "sqlite"
+        assert report["journal_mode"] == "wal"
+        assert report["busy_timeout"] == 5000
+        assert report["synchronous"] == 1   # NORMAL
+        assert report["temp_store"] == 2    # MEMORY
+        assert report["mmap_size"] == 256 * 1024 * 1024
+
+    def test_follows_settings(self, tmp_path):
+        with patch("core.database.settings.sqlite_busy_timeout_ms", 250), \
+             patch("core.database.settings.sqlite_synchronous", "FULL"):
+            report = storage_report(_file_engine(tmp_path))
+        assert report["busy_timeout"] == 250
+        assert report["synchronous"] == 2   # FULL
+
+    def test_non_sqlite_engine_untouched(self):
+        engine = create_engine("postgresql://u:p@localhost/db")
+        configure_sqlite(engine)
+        # Pool configuration only; no connection attempted
+        report = storage_report(engine)
+        assert report["dialect"] == "postgresql"
+        assert "journal_mode" not in report
+
+
+def test_secondary_indexes_declared(tmp_path):
+    import api.models.orm  # noqa: F401
+
+    engine = _file_engine(tmp_path)
+    Base.metadata.create_all(bind=engine)
+    insp = inspect(engine)
+    indexed = {
+        table: {col for ix in insp.get_indexes(table) for col in ix["column_names"]}
+        for table in ("query_history", "analytics_logs", "llm_configs")
+    }
+    assert "created_at" in indexed["query_history"]
+    assert "created_at" in indexed["analytics_logs"]
+    assert "is_active" in indexed["llm_configs"]
+
+
+class TestServerBackedStore:
+    def test_pool_options_for_postgres(self):
+        from core.database import engine_options
+
+        opts = engine_options("postgresql+psycopg2://u:p@db/optimizeql")
+        assert opts["pool_pre_ping"] is True
+        assert opts["pool_size"] == 5 and opts["max_overflow"] == 10
+        assert opts["pool_recycle"] == 1800
+        assert engine_options("sqlite:///./x.db") == {"connect_args": {"check_same_thread": False}}
+
+    def test_day_bucket_is_portable(self):
+        from sqlalchemy import column, select
+        from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+        from core.database import day_bucket
+
+        stmt = select(day_bucket(column("created_at")))
+        assert "CAST(created_at AS DATE)" in str(stmt.compile(dialect=postgresql.dialect()))
+        assert "DATE(created_at)" in str(stmt.compile(dialect=sqlite.dialect()))
+        assert "DATE(created_at)" in str(stmt.compile(dialect=mysql.dialect()))
+
+
+def test_data_migrations_run_once(tmp_path):
+    from sqlalchemy.orm import sessionmaker
+
+    from core.migrations import run_migrations
+
+    engine = _file_engine(tmp_path)
+    calls: list[str] = []
+    steps = [("0001_a", lambda db: calls.append("a")), ("0002_b", lambda db: calls.append("b"))]
+    factory = sessionmaker(bind=engine)
+
+    assert run_migrations(engine, factory, steps[:1]) == ["0001_a"]
+    assert run_migrations(engine, factory, steps) == ["0002_b"]
+    assert run_migrations(engine, factory, steps) == []
+    assert calls == ["a", "b"]
+
+
+def test_concurrent_startups_migrate_once(tmp_path):
+    import threading
+
+    from sqlalchemy import text
+    from sqlalchemy.orm import sessionmaker
+
+    from core.migrations import run_migrations
+
+    engine = _file_engine(tmp_path)
+    with engine.begin() as conn:  # analysis_jobs as an older version created it
+        conn.execute(text("CREATE TABLE analysis_jobs (id VARCHAR(36) PRIMARY KEY, status VARCHAR(20))"))
+    calls: list[str] = []
+    errors: list[Exception] = []
+    steps = [("0001_a", lambda db: calls.append("a"))]
+
+    def start() -> None:
+        try:
+            run_migrations(engine, sessionmaker(bind=engine), steps)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=start) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == [] and calls == ["a"]
+
+
+def test_column_added_concurrently_is_not_an_error(tmp_path):
+    from unittest.mock import patch
+
+    from sqlalchemy import inspect
+
+    from core.database import Base
+    from core.migrations import add_missing_columns
+
+    engine = _file_engine(tmp_path)
+    Base.metadata.create_all(bind=engine)
+    real = inspect(engine)
+
+    class Stale:  # reports every table as missing its last column
+        def has_table(self, name):
+            return real.has_table(name)
+
+        def get_columns(self, name):
+            return real.get_columns(name)[:-1]
+
+    with patch("core.migrations.inspect", return_value=Stale()):
+        add_missing_columns(engine)
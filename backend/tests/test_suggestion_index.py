@@ -0,0 +1,68 @@
+"""Tests for the normalized suggestion / query-table index and its filter endpoints."""
+
+from api.models.orm import QueryHistory, QueryTable, Suggestion
+from api.models.schemas import AnalysisResult, SuggestionItem
+from services.query_history import index_rows, rebuild_suggestion_index
+
+
+def _result() -> AnalysisResult:
+    return AnalysisResult(
+        query_id="q",
+        indexes=[
+            SuggestionItem(sql="CREATE INDEX ON orders (user_id)", explanation="fk",
+                           estimated_impact="High", index_type="btree"),
+            SuggestionItem(explanation="covering", estimated_impact="low", index_type="covering"),
+        ],
+        bottlenecks=[SuggestionItem(explanation="seq scan", estimated_impact="high", root_cause="missing_index")],
+        tables_analyzed=["orders", "users"],
+    )
+
+
+def _store(db, query_id: str, tables: list[str], connection_id: str | None = None) -> None:
+    db.add(QueryHistory(id=query_id, sql_query="SELECT 1", connection_id=connection_id,
+                        llm_response=_result().model_dump_json()))
+    db.add_all(index_rows(query_id, _result(), tables, "postgresql"))
+    db.commit()
+
+
+class TestIndexRows:
+    def test_splits_result(self):
+        rows = index_rows("q1", _result(), ["Orders", "users"])
+        tables = [r.table_name for r in rows if isinstance(r, QueryTable)]
+        suggestions = [r for r in rows if isinstance(r, Suggestion)]
+        assert tables == ["orders", "users"]
+        assert [s.category for s in suggestions] == ["indexes", "indexes", "bottlenecks"]
+        assert suggestions[0].estimated_impact == "high"
+        assert suggestions[0].tables == "orders"          # from the suggestion's own SQL
+        assert suggestions[1].tables == "orders,users"    # no SQL → the query's tables
+
+    def test_rebuild_from_history(self, db_session):
+        db_session.add(QueryHistory(id="old", sql_query="SELECT * FROM orders JOIN users ON orders.uid = users.id",
+                                    llm_response=_result().model_dump_json()))
+        db_session.add(QueryHistory(id="bad", sql_query="SELECT 1", llm_response="{"))
+        db_session.commit()
+        assert rebuild_suggestion_index(db_session) == 1
+        assert rebuild_suggestion_index(db_session) == 0
+        assert db_session.query(Suggestion).filter_by(query_id="old").count() == 3
+
+
+class TestFilterEndpoints:
+    def test_high_impact_index_suggestions_on_table(self, client, db_session):
+        _store(db_session, "a", ["orders"])
+        _store(db_session, "b", ["users"])
+        resp = client.get("/api/v1/analyze/suggestions?category=indexes&impact=high&table=orders")
+        assert resp.status_code == 200
+        body = resp.json()
+        assert [(s["query_id"], s["index_type"]) for s in body] == [("a", "btree")]
+        assert body[0]["tables"] == ["orders"]
+
+    def test_root_cause_filter(self, client, db_session):
+        _store(db_session, "a", ["orders"])
+        body = client.get("/api/v1/analyze/suggestions?root_cause=missing_index").json()
+        assert [s["category"] for s in body] == ["bottlenecks"]
+
+    def test_history_filtered_by_table(self, client, db_session):
+        _store(db_session, "a", ["orders"])
+        _store(db_session, "b", ["users"])
+        history = client.get("/api/v1/analyze/history?table=users").json()
+        assert [h["id"] for h in history] == ["b"]
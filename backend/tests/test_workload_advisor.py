@@ -0,0 +1,149 @@
+"""Tests for the pg_stat_statements workload advisor."""
+
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from api.models.schemas import AnalysisResult
+from connectors.base import StatementStat
+from connectors.postgresql import _statement_stat_from_row
+from services.workload_advisor import is_analyzable, rank_workload
+
+
+def _stat(statement_id: str, query: str, total: float, calls: int = 10) -> StatementStat:
+    return StatementStat(statement_id, query, calls, total, total / calls, rows=calls)
+
+
+_STATS = [
+    _stat("1", "SELECT * FROM orders WHERE user_id = $1", 900.0),
+    _stat("2", "BEGIN", 5000.0),
+    _stat("3", "SELECT * FROM users WHERE id = $1", 100.0),
+    _stat("4", "UPDATE users SET seen = now() WHERE id = $1", 400.0),
+]
+
+
+class TestRanking:
+    def test_ranks_by_total_time_and_skips_utility_statements(self):
+        top, total = rank_workload(_STATS, top_k=2)
+        assert [s.statement_id for s in top] == ["1", "4"]
+        assert total == 6400.0
+        assert round(top[0].share_of_total, 4) == round(900 / 6400, 4)
+
+    def test_is_analyzable(self):
+        assert is_analyzable("  with x as (select 1) select * from x")
+        assert not is_analyzable("SET search_path = public")
+        assert not is_analyzable("   ")
+
+    def test_pg_row_aggregates_mean_from_totals(self):
+        stat = _statement_stat_from_row({
+            "statement_id": "42", "query": "SELECT 1", "calls": 4, "total_exec_time_ms": 10.0,
+            "rows": 4, "shared_blks_hit": 8, "shared_blks_read": None,
+            "shared_blks_dirtied": 0, "shared_blks_written": 0,
+        })
+        assert stat.mean_exec_time_ms == 2.5
+        assert stat.shared_blks_read == 0
+
+
+class TestWorkloadAPI:
+    def _connection_id(self, client, db_type: str = "postgresql") -> str:
+        return client.post("/api/v1/connections", json={
+            "name": "Prod", "db_type": db_type, "host": "localhost", "port": 5432,
+            "database": "app", "username": "u", "password": "p",
+        }).json()["id"]
+
+    def test_report_analyzes_top_k_and_is_stored(self, client):
+        connection_id = self._connection_id(client)
+        connector = MagicMock()
+        connector.get_statement_stats.return_value = _STATS
+
+        @contextmanager
+        def pooled(self, connection_id, block=True):
+            yield connector
+
+        async def fake_analyze(introspection, query_id, provider_override=None):
+            return AnalysisResult(query_id=query_id, summary=introspection.sql)
+
+        with (
+            patch("api.routes.analyze.ConnectionManager.pooled_connector", pooled),
+            patch("api.routes.analyze._introspect_live", return_value=None),
+            patch("api.routes.analyze._warm_schema_cache"),
+            patch("api.routes.analyze.LLMAnalyzer") as MockAnalyzer,
+        ):
+            MockAnalyzer.return_value.model_label.return_value = "test-model"
+            MockAnalyzer.return_value.aanalyze = AsyncMock(side_effect=fake_analyze)
+            resp = client.post("/api/v1/analyze/workload", json={
+                "connection_id": connection_id, "top_k": 2, "cache": "bypass",
+            })
+
+        assert resp.status_code == 200
+        report = resp.json()
+        assert report["source"] == "pg_stat_statements"
+        assert report["statements_sampled"] == 4
+        assert [e["rank"] for e in report["entries"]] == [1, 2]
+        assert report["entries"][0]["analysis"]["summary"] == _STATS[0].query
+
+        listed = client.get(f"/api/v1/analyze/workload?connection_id={connection_id}").json()
+        assert [r["id"] for r in listed] == [report["id"]]
+        stored = client.get(f"/api/v1/analyze/workload/{report['id']}").json()
+        assert stored["entries"][1]["statement"]["statement_id"] == "4"
+
+    def test_mysql_report_analyzes_literal_samples(self, client):
+        connection_id = self._connection_id(client, db_type="mysql")
+        digest = _stat("d1", "SELECT * FROM `t` WHERE `id` = ?", 50.0)
+        digest.sample_query = "SELECT * FROM t WHERE id = 7"
+        connector = MagicMock()
+        connector.get_statement_stats.return_value = [digest]
+
+        @contextmanager
+        def pooled(self, connection_id, block=True):
+            yield connector
+
+        async def fake_analyze(introspection, query_id, provider_override=None):
+            return AnalysisResult(query_id=query_id, summary=introspection.sql)
+
+        with (
+            patch("api.routes.analyze.ConnectionManager.pooled_connector", pooled),
+            patch("api.routes.analyze._introspect_live", return_value=None),
+            patch("api.routes.analyze._warm_schema_cache"),
+            patch("api.routes.analyze.LLMAnalyzer") as MockAnalyzer,
+        ):
+            MockAnalyzer.return_value.model_label.return_value = "test-model"
+            MockAnalyzer.return_value.aanalyze = AsyncMock(side_effect=fake_analyze)
+            report = client.post("/api/v1/analyze/workload", json={
+                "connection_id": connection_id, "cache": "bypass",
+            }).json()
+
+        assert report["source"] == "performance_schema"
+        assert report["entries"][0]["analysis"]["summary"] == "SELECT * FROM t WHERE id = 7"
+
+    def test_unknown_connection_and_report(self, client):
+        resp = client.post("/api/v1/analyze/workload", json={"connection_id": "missing"})
+        assert resp.status_code == 404
+        assert client.get("/api/v1/analyze/workload/missing").status_code == 404
+
+
+class TestMySQLDigests:
+    def test_digest_row_converts_picoseconds(self):
+        from connectors.mysql import _statement_stat_from_digest
+
+        stat = _statement_stat_from_digest({
+            "digest": "abc", "digest_text": "SELECT * FROM `t` WHERE `id` = ?", "calls": 4,
+            "sum_timer_wait": 8_000_000_000, "rows_sent": 4, "rows_examined": 400,
+            "no_index_used": 4, "tmp_disk_tables": 1,
+        })
+        assert stat.total_exec_time_ms == 8.0
+        assert stat.mean_exec_time_ms == 2.0
+        assert stat.no_index_used == 4
+
+    def test_sample_closest_to_mean_wait_wins(self):
+        from connectors.mysql import _pick_samples
+
+        digests = [{"digest": "abc", "sum_timer_wait": 300, "calls": 3}]  # mean 100
+        samples = [
+            {"digest": "abc", "sql_text": "SELECT * FROM t WHERE id = 1", "timer_wait": 500},
+            {"digest": "abc", "sql_text": "SELECT * FROM t WHERE id = 2", "timer_wait": 90},
+            {"digest": "abc", "sql_text": "SELECT * FROM t WHERE id = 3 AND x IN (", "timer_wait": 100},
+            {"digest": "zzz", "sql_text": "SELECT 1", "timer_wait": 100},
+        ]
+        # The third sample hit the text-length cap, so it is not usable
+        picked = _pick_samples(digests, samples, max_text_length=38)
+        assert picked == {"abc": "SELECT * FROM t WHERE id = 2"}